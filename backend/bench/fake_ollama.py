@@ -0,0 +1,75 @@
+# backend/bench/fake_ollama.py
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Ollama /api/chat 흉내 (벤치마크용)
+# - 프롬프트 평가: 글자 수에 비례한 지연, 생성: 토큰마다 고정 지연
+# - parallel: 동시에 생성할 수 있는 요청 수 (Ollama OLLAMA_NUM_PARALLEL), 나머지는 대기
+# - 응답의 *_duration/*_count 필드도 실제 Ollama 형식으로 채움
+
+
+@dataclass
+class FakeOllamaConfig:
+    token_ms: float = 20.0
+    tokens: int = 120
+    prompt_ms_per_1k_chars: float = 40.0
+    parallel: int = 4
+
+
+def _prompt_chars(body: Dict[str, Any]) -> int:
+    return sum(len(m.get("content") or "") for m in body.get("messages") or [])
+
+
+def create_app(cfg: FakeOllamaConfig) -> FastAPI:
+    app = FastAPI()
+    slots = asyncio.Semaphore(cfg.parallel)
+    words = ["청년", " 정책", " 안내", "입니다", ".", " "]
+
+    def final(prompt_chars: int, prompt_ns: int, eval_ns: int, started: float) -> Dict[str, Any]:
+        return {
+            "done": True,
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": 0,
+            "prompt_eval_count": max(1, prompt_chars // 2),
+            "prompt_eval_duration": prompt_ns,
+            "eval_count": cfg.tokens,
+            "eval_duration": eval_ns,
+        }
+
+    async def generate(body: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        started = time.perf_counter()
+        chars = _prompt_chars(body)
+        async with slots:
+            t0 = time.perf_counter()
+            await asyncio.sleep(cfg.prompt_ms_per_1k_chars * chars / 1000 / 1000)
+            t1 = time.perf_counter()
+            for i in range(cfg.tokens):
+                await asyncio.sleep(cfg.token_ms / 1000)
+                yield {"message": {"role": "assistant", "content": words[i % len(words)]}, "done": False}
+            t2 = time.perf_counter()
+        yield final(chars, int((t1 - t0) * 1e9), int((t2 - t1) * 1e9), started)
+
+    @app.post("/api/chat")
+    async def chat(req: Request) -> Any:
+        body = await req.json()
+        if body.get("stream", True):
+            async def lines() -> AsyncIterator[str]:
+                async for data in generate(body):
+                    yield json.dumps(data, ensure_ascii=False) + "\n"
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        parts = []
+        async for data in generate(body):
+            if not data["done"]:
+                parts.append(data["message"]["content"])
+        return JSONResponse({"message": {"role": "assistant", "content": "".join(parts)}, **data})
+
+    return app
@@ -0,0 +1,42 @@
+# backend/bench/hash_embedder.py
+from __future__ import annotations
+
+import re
+import unicodedata
+import zlib
+from typing import List, Sequence, Union
+
+import numpy as np
+
+# 벤치마크용 소형 임베더 (모델 다운로드 없음, 결정적)
+# - 글자 2/3-gram을 해시해서 고정 차원 벡터에 더함(부호 해시) → 정규화
+# - 검색 품질이 아니라 "임베딩 단계에 CPU 시간이 드는" 흐름을 재현하는 용도
+HASH_DIM = 384
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = HASH_DIM):
+        self.dim = dim
+
+    def _vec(self, text: str) -> np.ndarray:
+        t = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "").lower()).strip()
+        v = np.zeros(self.dim, dtype="float32")
+        for n in (2, 3):
+            for i in range(len(t) - n + 1):
+                h = zlib.crc32(t[i:i + n].encode("utf-8"))
+                v[h % self.dim] += 1.0 if (h >> 31) & 1 else -1.0
+        return v
+
+    def encode(
+        self,
+        texts: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **_: object,
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        items: List[str] = [texts] if single else list(texts)
+        out = np.stack([self._vec(t) for t in items]) if items else np.zeros((0, self.dim), dtype="float32")
+        if normalize_embeddings and len(out):
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
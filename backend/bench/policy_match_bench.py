@@ -0,0 +1,143 @@
+# backend/bench/policy_match_bench.py
+"""
+정책 매칭 마이크로 벤치마크 (오프라인)
+
+backend/ 에서 실행:
+    python -m bench.policy_match_bench
+    python -m bench.policy_match_bench --sizes 3 100 1000 --max-ratio 3   # 회귀 게이트 (초과 시 exit 1)
+
+- data/policy_catalog.json에 합성 정책(정책명/별칭/반쪽 키워드)을 붙여 카탈로그 크기를 키움
+- 같은 메시지 묶음에 대해 메시지당 비용 비교
+  - automaton: PolicyCatalog.match (Aho-Corasick, 한 번 훑기)
+  - linear   : 예전 방식 — 정책마다 any(k in t for k in 키워드)
+- --max-ratio: 가장 큰 카탈로그 / 가장 작은 카탈로그의 automaton 메시지당 비용 비율 상한
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench.run_bench import POLICY_QUESTIONS  # noqa: E402
+from src.app.services.policy_catalog import PolicyCatalog  # noqa: E402
+
+CATALOG_PATH = BACKEND_DIR / "data/policy_catalog.json"
+
+# 합성 정책명 재료 (서울 청년정책 이름 느낌으로)
+PREFIXES = ["서울", "청년", "희망", "미래", "드림", "행복", "동행", "새출발", "마음", "꿈"]
+TOPICS = ["월세", "주거", "취업", "창업", "교통", "문화", "자산", "마음건강", "교육", "면접", "이사", "구직"]
+SUFFIXES = ["지원", "수당", "바우처", "통장", "패스", "장려금", "프로그램", "센터", "대출", "쿠폰"]
+
+EXTRA_MESSAGES = [
+    "월세 지원 받을 수 있나요?",
+    "면접 정장 대여 같은 것도 있어요?",
+    "서울 사는 27살인데 받을 수 있는 지원금 알려주세요",
+    "창업 준비 중인데 도움 되는 제도 있을까요",
+    "그냥 궁금한 게 있어서요",
+]
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="정책 카탈로그 매칭 비용 (카탈로그 크기별)")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[3, 30, 300, 3000], help="카탈로그 정책 수")
+    ap.add_argument("--messages", type=int, default=2000, help="크기마다 매칭할 메시지 수")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", type=Path, default=None, help="결과를 JSON으로 저장")
+    ap.add_argument("--max-ratio", type=float, default=None, help="automaton 메시지당 비용 (최대/최소 크기) 상한")
+    return ap.parse_args()
+
+
+def synthetic_catalog(base: Dict[str, Any], size: int, rng: random.Random) -> Dict[str, Any]:
+    data = json.loads(json.dumps(base))
+    policies: List[Dict[str, Any]] = data["policies"][:size]
+    names = {p["name"] for p in policies}
+    i = 0
+    while len(policies) < size:
+        name = f"{rng.choice(PREFIXES)}{rng.choice(TOPICS)}{rng.choice(SUFFIXES)}"
+        if name in names:
+            name = f"{name}{i}"
+        names.add(name)
+        topic = rng.choice(TOPICS)
+        policies.append({
+            "id": f"synthetic_{i}",
+            "name": name,
+            "aliases": [name[:4], f"{topic}{i}"],
+            "keywords": [f"{topic}{rng.choice(SUFFIXES)}{i}", f"{name[-3:]}{i}"],
+            "doc_ids": [],
+        })
+        i += 1
+    data["policies"] = policies
+    return data
+
+
+def linear_matcher(data: Dict[str, Any]) -> Callable[[str], Tuple[Optional[str], bool]]:
+    # 예전 detect_policy_intent/_needs_policy_confirmation 방식을 카탈로그 크기만큼 늘린 것
+    groups = [(p["id"], [p["name"].lower(), *(a.lower() for a in p["aliases"]), *(k.lower() for k in p["keywords"])])
+              for p in data["policies"]]
+    generic = [g.lower() for g in data.get("generic_keywords") or []]
+
+    def match(text: str) -> Tuple[Optional[str], bool]:
+        t = (text or "").strip().lower()
+        is_generic = any(k in t for k in generic)
+        for pid, keys in groups:
+            if any(k in t for k in keys):
+                return pid, is_generic
+        return None, is_generic
+
+    return match
+
+
+def per_message_us(fn: Callable[[str], Any], messages: List[str]) -> float:
+    for m in messages[:50]:
+        fn(m)
+    t0 = time.perf_counter()
+    for m in messages:
+        fn(m)
+    return (time.perf_counter() - t0) / len(messages) * 1e6
+
+
+def main() -> int:
+    args = parse_args()
+    rng = random.Random(args.seed)
+    base = json.loads(CATALOG_PATH.read_text(encoding="utf-8"))
+    pool = POLICY_QUESTIONS + EXTRA_MESSAGES
+    messages = [rng.choice(pool) for _ in range(args.messages)]
+
+    rows = []
+    for size in sorted(args.sizes):
+        data = synthetic_catalog(base, size, rng)
+        t0 = time.perf_counter()
+        catalog = PolicyCatalog.from_dict(data)
+        compile_ms = (time.perf_counter() - t0) * 1000
+        rows.append({
+            "policies": len(catalog),
+            "patterns": catalog.n_patterns,
+            "compile_ms": round(compile_ms, 2),
+            "automaton_us": round(per_message_us(catalog.match, messages), 2),
+            "linear_us": round(per_message_us(linear_matcher(data), messages), 2),
+        })
+
+    print(f"{'policies':>9}{'patterns':>10}{'compile(ms)':>13}{'automaton(us/msg)':>19}{'linear(us/msg)':>16}")
+    for r in rows:
+        print(f"{r['policies']:>9}{r['patterns']:>10}{r['compile_ms']:>13.2f}{r['automaton_us']:>19.2f}{r['linear_us']:>16.2f}")
+
+    ratio = rows[-1]["automaton_us"] / max(rows[0]["automaton_us"], 1e-9)
+    print(f"\nautomaton cost ratio (largest/smallest catalog) = {ratio:.2f}")
+    if args.json:
+        args.json.write_text(json.dumps({"rows": rows, "ratio": ratio}, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    if args.max_ratio is not None and ratio > args.max_ratio:
+        print(f"[FAIL] ratio {ratio:.2f} > {args.max_ratio}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,348 @@
+# backend/bench/run_bench.py
+"""
+/chat 부하 벤치마크 (오프라인)
+
+backend/ 에서 실행:
+    python -m bench.run_bench --sessions 40 --concurrency 8 --questions 3
+    python -m bench.run_bench --json bench_result.json --max-p95-ms 3000   # 회귀 게이트 (초과 시 exit 1)
+    python -m bench.run_bench --smoke   # CI용: 세션 2개, 정책 질문 전부, 절반은 스트리밍 → 오류가 하나라도 있으면 exit 1
+
+- 실제 uvicorn 서버(스레드)로 src.app.main:app을 띄우고 httpx로 동시 세션을 흘려보냄
+- 각 세션: PRIMARY_QUESTIONS 온보딩 전체 → 정책 질문 N개
+- LLM은 fake_ollama(토큰 지연 설정 가능), 임베딩은 HashingEmbedder, 토큰 수는 StubTokenizer
+  → 네트워크/모델 다운로드 없음 (localhost 밖으로 나가는 연결은 막아 두어서 숨은 다운로드가 있으면 바로 실패)
+- 실패한 요청(HTTP 오류, 스트림 error 이벤트)이 하나라도 있으면 exit 1
+- 인덱스는 data/processed-data/chunks.jsonl을 HashingEmbedder로 임시 디렉터리에 새로 빌드
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import faiss
+import httpx
+import numpy as np
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bench.fake_ollama import FakeOllamaConfig, create_app  # noqa: E402
+from bench.hash_embedder import HashingEmbedder  # noqa: E402
+from bench.stub_tokenizer import StubTokenizer  # noqa: E402
+from src.app.services.lexical import BM25Index  # noqa: E402
+from src.app.services.meta_store import write_meta_store  # noqa: E402
+from src.app.services.onboarding import PRIMARY_QUESTIONS  # noqa: E402
+
+CHUNKS_PATH = BACKEND_DIR / "data/processed-data/chunks.jsonl"
+
+# 온보딩 답변 (PRIMARY_QUESTIONS 순서, 선택지 있는 질문은 선택지 중에서 고름)
+AGE_ANSWERS = ["19", "24", "27", "31", "34", "모름"]
+
+POLICY_QUESTIONS = [
+    "청년일자리도약장려금 신청 조건이 어떻게 되나요?",
+    "청년일자리도약장려금 지원 금액은 얼마인가요?",
+    "청년일자리도약장려금 신청 기한은 언제까지인가요?",
+    "청년일자리도약장려금 지원 대상 나이 요건이 궁금해요",
+    "청년일자리도약장려금 지원 제외 대상은 누구인가요?",
+    "국민취업지원제도 참여하면 구직촉진수당 받을 수 있나요?",
+    "희망두배 청년통장 가입 조건 알려주세요",
+    "장려금 받을 수 있어요?",  # 정책명 확정 질문 경로
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _serve(app: Any, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def _block_external_network() -> None:
+    # 벤치는 오프라인이어야 함 → loopback/Unix 소켓 말고는 연결 거부 (tiktoken/HF 다운로드 같은 숨은 호출 검출)
+    real_connect = socket.socket.connect
+    real_getaddrinfo = socket.getaddrinfo
+    local_hosts = {"127.0.0.1", "::1", "localhost"}
+
+    def connect(self: socket.socket, address: Any) -> None:
+        if self.family in (socket.AF_INET, socket.AF_INET6) and address[0] not in local_hosts:
+            raise ConnectionRefusedError(f"bench is offline: blocked connection to {address}")
+        return real_connect(self, address)
+
+    def getaddrinfo(host: Any, *a: Any, **kw: Any) -> Any:
+        if host not in local_hosts and host is not None:
+            raise socket.gaierror(f"bench is offline: blocked lookup of {host}")
+        return real_getaddrinfo(host, *a, **kw)
+
+    socket.socket.connect = connect  # type: ignore[method-assign]
+    socket.getaddrinfo = getaddrinfo  # type: ignore[assignment]
+
+
+def _wait_ready(base_url: str, timeout_sec: float = 120.0) -> None:
+    # 앱은 인덱스/모델 로드 + 워밍업을 백그라운드로 하므로 /readyz가 200이 될 때까지 대기
+    deadline = time.monotonic() + timeout_sec
+    while httpx.get(f"{base_url}/readyz").status_code != 200:
+        assert time.monotonic() < deadline, f"app not ready after {timeout_sec}s"
+        time.sleep(0.1)
+
+
+def build_workdir(embedder: HashingEmbedder) -> Path:
+    """chunks.jsonl → 임시 data/processed-data (faiss.index + meta.bin + bm25.npz, 구버전 고정 경로 레이아웃)"""
+    work = Path(tempfile.mkdtemp(prefix="ypbench-"))
+    out = work / "data/processed-data"
+    out.mkdir(parents=True)
+
+    chunks = [json.loads(line) for line in CHUNKS_PATH.open(encoding="utf-8")]
+    vecs = embedder.encode([c["text"] for c in chunks]).astype("float32")
+    index = faiss.IndexIDMap2(faiss.IndexFlatIP(vecs.shape[1]))
+    index.add_with_ids(vecs, np.arange(len(chunks), dtype="int64"))
+    faiss.write_index(index, str(out / "faiss.index"))
+    write_meta_store(out / "meta.bin", chunks)
+    BM25Index.build((c["chunk_id"], c["text"]) for c in chunks).save(out / "bm25.npz")
+    print(f"[INFO] bench index: {len(chunks)} chunks, dim={vecs.shape[1]} → {out}")
+    return work
+
+
+def onboarding_answers(rng: random.Random) -> List[str]:
+    answers = []
+    for q in PRIMARY_QUESTIONS:
+        if q["id"] == "age":
+            answers.append(rng.choice(AGE_ANSWERS))
+        else:
+            answers.append(rng.choice(q["options"]))
+    return answers
+
+
+def pct(xs: List[float], p: float) -> float:
+    return float(np.percentile(xs, p)) if xs else 0.0
+
+
+def summarize(xs: List[float]) -> Dict[str, float]:
+    return {
+        "n": len(xs),
+        "mean": float(np.mean(xs)) if xs else 0.0,
+        "p50": pct(xs, 50),
+        "p95": pct(xs, 95),
+        "p99": pct(xs, 99),
+    }
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    rng: random.Random,
+    n_questions: int,
+    lat: Dict[str, List[float]],
+    stream: bool,
+) -> None:
+    sid: Optional[str] = None
+
+    async def send(kind: str, message: str) -> None:
+        nonlocal sid
+        t0 = time.perf_counter()
+        if stream and kind == "answer":
+            async with client.stream("POST", "/chat/stream", json={"message": message, "session_id": sid}) as r:
+                r.raise_for_status()
+                first = None
+                last = ""
+                async for line in r.aiter_lines():
+                    if first is None and line.startswith("event:"):
+                        first = time.perf_counter()
+                    if line.startswith("event: error"):
+                        raise RuntimeError(f"stream error event for {message!r}")
+                    if line.startswith("data:"):
+                        last = line
+            lat["ttft"].append(((first or time.perf_counter()) - t0) * 1000)
+            sid = json.loads(last[len("data:"):])["session_id"]
+        else:
+            r = await client.post("/chat", json={"message": message, "session_id": sid})
+            r.raise_for_status()
+            sid = r.json()["session_id"]
+        lat[kind].append((time.perf_counter() - t0) * 1000)
+
+    await send("onboarding", "시작")
+    for a in onboarding_answers(rng):
+        await send("onboarding", a)
+    for q in rng.sample(POLICY_QUESTIONS, k=min(n_questions, len(POLICY_QUESTIONS))):
+        await send("answer", q)
+
+
+async def drive(
+    base_url: str,
+    args: argparse.Namespace,
+    lat: Dict[str, List[float]],
+    errors: List[str],
+) -> float:
+    gate = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=300, limits=limits) as client:
+        async def one(i: int) -> None:
+            # --smoke: 홀수 세션은 스트리밍 → 두 경로 모두 확인
+            stream = args.stream or (args.smoke and i % 2 == 1)
+            async with gate:
+                try:
+                    await run_session(client, random.Random(args.seed + i), args.questions, lat, stream)
+                except Exception as e:
+                    # 실패한 세션은 거기서 중단, 나머지 세션은 계속
+                    errors.append(f"session {i}: {type(e).__name__}: {e}")
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.sessions)))
+        return time.perf_counter() - t0
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="/chat 부하 벤치마크 (fake Ollama + 해시 임베더, 오프라인)")
+    ap.add_argument("--sessions", type=int, default=40, help="전체 세션 수")
+    ap.add_argument("--concurrency", type=int, default=8, help="동시에 진행하는 세션 수")
+    ap.add_argument("--questions", type=int, default=3, help="세션당 정책 질문 수 (온보딩 이후)")
+    ap.add_argument("--stream", action="store_true", help="정책 질문을 /chat/stream으로 보냄 (TTFT 측정)")
+    ap.add_argument("--seed", type=int, default=0)
+    # fake Ollama
+    ap.add_argument("--token-ms", type=float, default=20.0, help="토큰당 생성 지연(ms)")
+    ap.add_argument("--tokens", type=int, default=120, help="답변 토큰 수")
+    ap.add_argument("--prompt-ms-per-1k", type=float, default=40.0, help="프롬프트 1천 자당 평가 지연(ms)")
+    ap.add_argument("--llm-parallel", type=int, default=4, help="fake Ollama 동시 생성 수")
+    # 앱 설정
+    ap.add_argument("--answer-cache", action="store_true", help="답변 캐시 켜기 (기본: 끔, 같은 질문 반복 때문에)")
+    ap.add_argument("--always-llm", action="store_true", help="추출형/저점수 LLM 생략 경로 끄기")
+    # HashingEmbedder 코사인은 bge-m3보다 낮게 나옴(관련 chunk가 0.2~0.35) → 게이트 임계값도 그 척도로
+    ap.add_argument("--min-score", type=float, default=0.25, help="MIN_TOP_SCORE_FOR_LLM (해시 임베더 척도)")
+    ap.add_argument("--fact-min-score", type=float, default=0.33, help="EXTRACTIVE_FACT_MIN_SCORE (해시 임베더 척도)")
+    # 결과
+    ap.add_argument("--json", type=Path, default=None, help="결과를 JSON으로 저장")
+    ap.add_argument("--max-p95-ms", type=float, default=None, help="answer p95가 이 값을 넘으면 exit 1")
+    ap.add_argument("--smoke", action="store_true", help="CI 스모크: 세션 2개, 정책 질문 전부, /chat + /chat/stream, 토큰 지연 0")
+    args = ap.parse_args()
+    if args.smoke:
+        args.sessions, args.concurrency, args.questions = 2, 2, len(POLICY_QUESTIONS)
+        args.token_ms, args.tokens = 0.0, 16
+    return args
+
+
+def configure_app(args: argparse.Namespace, ollama_url: str, embedder: HashingEmbedder) -> None:
+    # main import 전에 rag_service 설정을 벤치용으로 바꿔 둠 (main이 import 시점에 RAGService를 만듦)
+    os.environ.setdefault("LOG_LEVEL", "WARNING")  # 턴마다 남는 answer turn 로그 생략
+    # 임시 작업 디렉터리로 chdir하므로 정책 카탈로그는 절대 경로로
+    os.environ.setdefault("POLICY_CATALOG_PATH", str(BACKEND_DIR / "data/policy_catalog.json"))
+    from src.app.services import context_packer, rag_service
+
+    rag_service.load_query_embedder = lambda *_args: embedder
+    context_packer.use_encoding(StubTokenizer())
+    rag_service.OLLAMA_URL = ollama_url
+    rag_service.ANSWER_CACHE_ENABLED = args.answer_cache
+    rag_service.MIN_TOP_SCORE_FOR_LLM = args.min_score
+    rag_service.EXTRACTIVE_FACT_MIN_SCORE = args.fact_min_score
+    if args.always_llm:
+        rag_service.EXTRACTIVE_LOW_SCORE_ENABLED = False
+        rag_service.EXTRACTIVE_FACTS_ENABLED = False
+        rag_service.MIN_TOP_SCORE_FOR_LLM = -1.0
+
+
+def print_report(result: Dict[str, Any]) -> None:
+    print()
+    print(f"sessions={result['sessions']} concurrency={result['concurrency']} "
+          f"wall={result['wall_sec']:.2f}s throughput={result['throughput_rps']:.1f} req/s")
+    print(f"{'latency(ms)':<14}{'n':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for kind, s in result["latency_ms"].items():
+        print(f"{kind:<14}{s['n']:>6}{s['mean']:>10.1f}{s['p50']:>10.1f}{s['p95']:>10.1f}{s['p99']:>10.1f}")
+    print()
+    print(f"{'stage(ms)':<22}{'n':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for stage, s in result["stages_ms"].items():
+        print(f"{stage:<22}{s['n']:>6}{s['mean']:>10.2f}{s['p50']:>10.2f}{s['p95']:>10.2f}{s['p99']:>10.2f}")
+    print()
+    print(f"llm calls={result['llm']['calls']} bypassed={result['llm']['bypassed']}")
+
+
+def main() -> int:
+    args = parse_args()
+    _block_external_network()
+    embedder = HashingEmbedder()
+
+    work = build_workdir(embedder)
+    ollama = _serve(create_app(FakeOllamaConfig(
+        token_ms=args.token_ms,
+        tokens=args.tokens,
+        prompt_ms_per_1k_chars=args.prompt_ms_per_1k,
+        parallel=args.llm_parallel,
+    )), _free_port())
+    ollama_url = f"http://127.0.0.1:{ollama.config.port}/api/chat"
+
+    os.chdir(work)  # rag_service의 DATA_DIR(상대 경로)이 임시 인덱스를 가리키도록
+    configure_app(args, ollama_url, embedder)
+    from src.app import main as app_main
+
+    stages: Dict[str, List[float]] = defaultdict(list)
+    stages_lock = threading.Lock()
+
+    def on_turn(plan: Any) -> None:
+        with stages_lock:
+            for k, v in plan.timings.items():
+                stages[k].append(float(v))
+
+    app_main.rag.add_timing_listener(on_turn)
+    api = _serve(app_main.app, _free_port())
+    _wait_ready(f"http://127.0.0.1:{api.config.port}")
+
+    lat: Dict[str, List[float]] = defaultdict(list)
+    errors: List[str] = []
+    wall = asyncio.run(drive(f"http://127.0.0.1:{api.config.port}", args, lat, errors))
+
+    n_req = sum(len(v) for k, v in lat.items() if k != "ttft")
+    result = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "wall_sec": wall,
+        "requests": n_req,
+        "throughput_rps": n_req / wall if wall else 0.0,
+        "latency_ms": {k: summarize(v) for k, v in sorted(lat.items())},
+        "stages_ms": {k: summarize(v) for k, v in sorted(stages.items())},
+        "llm": app_main.rag.llm_stats.stats(),
+        "errors": errors,
+        "config": {k: (str(v) if isinstance(v, Path) else v) for k, v in vars(args).items()},
+    }
+
+    api.should_exit = True
+    ollama.should_exit = True
+    os.chdir(BACKEND_DIR)
+    shutil.rmtree(work, ignore_errors=True)
+
+    print_report(result)
+    if args.json is not None:
+        path = args.json if args.json.is_absolute() else BACKEND_DIR / args.json
+        path.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[OK] wrote: {path}")
+
+    if errors:
+        print(f"[FAIL] {len(errors)} failed session(s):")
+        for e in errors:
+            print(f"  - {e}")
+        return 1
+    p95 = result["latency_ms"].get("answer", {}).get("p95", 0.0)
+    if args.max_p95_ms is not None and p95 > args.max_p95_ms:
+        print(f"[FAIL] answer p95 {p95:.1f}ms > {args.max_p95_ms:.1f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+# backend/bench/stub_tokenizer.py
+from __future__ import annotations
+
+import re
+from typing import List
+
+# 벤치마크용 토큰 카운터 (tiktoken 인코딩 파일 다운로드 없음, 결정적)
+# - cl100k와 비슷한 규모로만 맞춤: 한글/기호는 글자당 1토큰, 영문/숫자는 4글자당 1토큰, 공백 묶음은 1토큰
+# - context_packer.use_encoding()으로 주입 → 프롬프트 예산 계산 흐름만 재현
+_PIECES = re.compile(r"[A-Za-z0-9]+|\s+|.", re.S)
+
+
+class StubTokenizer:
+    name = "bench-stub"
+
+    def encode(self, text: str) -> List[int]:
+        out: List[int] = []
+        for piece in _PIECES.findall(text or ""):
+            n = -(-len(piece) // 4) if piece[0].isascii() and piece[0].isalnum() else 1
+            out.extend([len(piece)] * n)
+        return out
@@ -1,49 +1,408 @@
+import argparse
+import hashlib
 import json
+import os
+import shutil
+import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict
+from typing import Any, List, Dict, Iterable, Iterator, Optional
 import numpy as np
 import faiss
-from sentence_transformers import SentenceTransformer
 
-CHUNKS_PATH = Path("data/processed-data/chunks.jsonl")
-INDEX_PATH = Path("data/processed-data/faiss.index")
-META_PATH = Path("data/processed-data/meta.json")
+# backend/ 를 import 경로에 추가 (앱과 같은 메타 저장 포맷/세대 포인터 사용)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.app.services.index_files import (  # noqa: E402
+    generation_file_names,
+    new_generation,
+    publish_generation,
+    read_pointer,
+)
+from src.app.services.lexical import BM25Index  # noqa: E402
+from src.app.services.meta_store import write_meta_store  # noqa: E402
+
+DATA_DIR = Path("data/processed-data")
+CHUNKS_PATH = DATA_DIR / "chunks.jsonl"
+META_PATH = DATA_DIR / "meta.bin"  # --meta-only(포인터 없는 구버전 레이아웃)용
+LEXICAL_PATH = DATA_DIR / "bm25.npz"  # --meta-only용, 세대 빌드는 bm25-<gen>.npz
+# 임베딩 중간 결과(벡터 .npy memmap + 진행 상황) — 중단되면 같은 입력으로 다시 실행할 때 이어서 진행
+EMBED_WORK_DIR = DATA_DIR / "embed-work"
+ADD_BLOCK_ROWS = 65536  # 인덱스에 벡터를 넣을 때 한 번에 float32로 올리는 행 수
 
 # 완전 무료 로컬 임베딩 모델 (성능 좋음, 다만 CPU면 느릴 수 있음)
 EMBED_MODEL = "BAAI/bge-m3"
 
-def load_chunks() -> List[Dict]:
-    items = []
+INDEX_TYPES = ["flat", "hnsw", "ivf_flat", "ivf_pq"]
+
+@dataclass
+class ChunkScan:
+    """
+    chunks.jsonl 한 번 훑은 결과 (본문은 들고 있지 않음, 필요할 때 offset으로 다시 읽음)
+    - i번째 원소 = 파일의 i번째 chunk
+    """
+    chunk_ids: List[str]
+    hashes: List[str]
+    offsets: np.ndarray  # 줄 시작 바이트 위치
+    lengths: np.ndarray  # 본문 글자 수 (길이순 배치 정렬용)
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+def text_hash(text: str) -> str:
+    # 임베딩은 text에만 의존 → text가 같으면 재임베딩 불필요
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def scan_chunks() -> ChunkScan:
+    chunk_ids: List[str] = []
+    hashes: List[str] = []
+    offsets: List[int] = []
+    lengths: List[int] = []
+    with CHUNKS_PATH.open("rb") as f:
+        pos = 0
+        for line in f:
+            if line.strip():
+                c = json.loads(line)
+                chunk_ids.append(c["chunk_id"])
+                hashes.append(text_hash(c["text"]))
+                offsets.append(pos)
+                lengths.append(len(c["text"]))
+            pos += len(line)
+    return ChunkScan(chunk_ids, hashes, np.asarray(offsets, dtype="int64"), np.asarray(lengths, dtype="int64"))
+
+def iter_chunks() -> Iterator[Dict]:
     with CHUNKS_PATH.open("r", encoding="utf-8") as f:
         for line in f:
-            items.append(json.loads(line))
-    return items
+            if line.strip():
+                yield json.loads(line)
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="chunks.jsonl → FAISS 인덱스 + 메타 생성")
+    ap.add_argument("--meta-only", action="store_true",
+                    help="임베딩/인덱스는 그대로 두고 meta.bin + bm25.npz만 chunks.jsonl에서 다시 생성 (구버전 고정 경로 레이아웃용)")
+    ap.add_argument("--incremental", action="store_true",
+                    help="직전 세대 대비 새/변경 chunk만 임베딩, 사라진 chunk는 인덱스에서 제거")
+    ap.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                    help="flat=전수검색(정확), hnsw/ivf_flat/ivf_pq=근사검색(대용량용)")
+    # HNSW
+    ap.add_argument("--hnsw-m", type=int, default=32, help="HNSW 그래프 이웃 수")
+    ap.add_argument("--ef-construction", type=int, default=200, help="HNSW 빌드 탐색 폭")
+    ap.add_argument("--ef-search", type=int, default=64, help="HNSW 검색 탐색 폭(인덱스 기본값으로 저장)")
+    # IVF
+    ap.add_argument("--nlist", type=int, default=0, help="IVF 클러스터 수 (0이면 4*sqrt(N) 자동)")
+    ap.add_argument("--nprobe", type=int, default=16, help="IVF 검색 시 볼 클러스터 수(인덱스 기본값으로 저장)")
+    ap.add_argument("--pq-m", type=int, default=64, help="IVF-PQ 서브벡터 수 (dim의 약수)")
+    ap.add_argument("--pq-nbits", type=int, default=8, help="IVF-PQ 서브벡터당 비트 수")
+    # 평가
+    ap.add_argument("--eval-queries", type=int, default=200, help="recall 평가에 쓸 쿼리 수 (0이면 생략)")
+    ap.add_argument("--eval-k", type=int, default=5, help="recall@k 의 k (RAG top_k와 맞춤)")
+    # 임베딩
+    ap.add_argument("--batch-size", type=int, default=32, help="임베딩 배치 크기 (길이순 정렬 후 자름)")
+    ap.add_argument("--checkpoint-every", type=int, default=20, help="이 배치 수마다 벡터 파일 flush + 진행 상황 저장")
+    ap.add_argument("--vector-dtype", choices=["float32", "float16"], default="float32",
+                    help="중간 벡터 파일 저장 형식 (float16이면 디스크 절반, 인덱스에는 float32로 넣음)")
+    return ap.parse_args()
+
+def auto_nlist(n: int) -> int:
+    # 학습 데이터가 클러스터당 최소 39개는 되어야 faiss 경고 없이 학습됨
+    return max(1, min(int(4 * np.sqrt(n)), n // 39))
+
+def add_blocks(index: faiss.Index, vecs: np.ndarray, ids: Optional[np.ndarray] = None) -> None:
+    """memmap 벡터를 ADD_BLOCK_ROWS 행씩 float32로 올려서 추가 → 전체 float32 사본을 만들지 않음"""
+    for start in range(0, len(vecs), ADD_BLOCK_ROWS):
+        block = np.ascontiguousarray(vecs[start:start + ADD_BLOCK_ROWS], dtype="float32")
+        if ids is None:
+            index.add(block)
+        else:
+            index.add_with_ids(block, ids[start:start + ADD_BLOCK_ROWS])
+
+def build_index(vecs: np.ndarray, ids: np.ndarray, args: argparse.Namespace) -> faiss.Index:
+    """
+    벡터 id(라벨)를 직접 지정하는 인덱스 생성 → 증분 빌드에서 id 단위로 추가/삭제 가능
+    - flat/hnsw는 IndexIDMap2로 감싸고, IVF 계열은 자체적으로 id를 지원
+    - vecs는 memmap이어도 됨 (블록 단위로 추가, IVF 학습은 표본만 메모리에 올림)
+    """
+    n, dim = vecs.shape
+
+    if args.index_type == "flat":
+        index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))   # cosine 유사도(정규화된 벡터)
+        add_blocks(index, vecs, ids)
+        return index
+
+    if args.index_type == "hnsw":
+        hnsw = faiss.IndexHNSWFlat(dim, args.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = args.ef_construction
+        hnsw.hnsw.efSearch = args.ef_search
+        index = faiss.IndexIDMap2(hnsw)
+        add_blocks(index, vecs, ids)
+        return index
+
+    nlist = args.nlist or auto_nlist(n)
+    quantizer = faiss.IndexFlatIP(dim)
+    if args.index_type == "ivf_flat":
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+    else:
+        assert dim % args.pq_m == 0, f"--pq-m({args.pq_m}) must divide dim({dim})"
+        assert n >= 2 ** args.pq_nbits, f"ivf_pq needs >= {2 ** args.pq_nbits} chunks to train (got {n}); use --pq-nbits smaller"
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, args.pq_m, args.pq_nbits, faiss.METRIC_INNER_PRODUCT)
+    # faiss도 클러스터당 256개 넘는 학습 데이터는 표본 추출하므로 그만큼만 올림
+    n_train = min(n, nlist * 256)
+    train_idx = np.sort(np.random.default_rng(0).choice(n, size=n_train, replace=False))
+    print(f"[INFO] training {args.index_type}: nlist={nlist}, train={n_train}")
+    index.train(np.ascontiguousarray(vecs[train_idx], dtype="float32"))
+    add_blocks(index, vecs, ids)
+    index.nprobe = min(args.nprobe, nlist)
+    return index
+
+def eval_recall(index: faiss.Index, vecs: np.ndarray, ids: np.ndarray, n_queries: int, k: int) -> None:
+    """
+    코퍼스 벡터 일부를 쿼리로 써서 전수검색(flat) 대비 recall@k / 지연시간 출력
+    """
+    n, dim = vecs.shape
+    k = min(k, n)
+    rng = np.random.default_rng(0)
+    qidx = rng.choice(n, size=min(n_queries, n), replace=False)
+    queries = np.ascontiguousarray(vecs[np.sort(qidx)], dtype="float32")
+
+    flat = faiss.IndexFlatIP(dim)
+    add_blocks(flat, vecs)
+
+    t0 = time.perf_counter()
+    _, gt = flat.search(queries, k)
+    t_flat = (time.perf_counter() - t0) / len(queries)
+
+    t0 = time.perf_counter()
+    _, got = index.search(queries, k)
+    t_ann = (time.perf_counter() - t0) / len(queries)
+
+    hit = sum(len(set(ids[g]) & set(a)) for g, a in zip(gt, got))
+    recall = hit / (len(queries) * k)
+    print(f"[EVAL] queries={len(queries)} recall@{k}={recall:.4f}")
+    print(f"[EVAL] per-query latency: flat={t_flat * 1000:.3f}ms, index={t_ann * 1000:.3f}ms")
+
+def _write_json(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp, path)
+
+def embed_chunks(scan: ChunkScan, positions: List[int], args: argparse.Namespace) -> np.ndarray:
+    """
+    positions(scan 기준 chunk 번호)의 임베딩 → EMBED_WORK_DIR/vectors.npy (memmap, i행 = positions[i])
+    - 본문 길이순으로 정렬해 배치를 자름 → 배치 안 길이가 비슷해서 패딩 낭비가 적음
+    - checkpoint_every 배치마다 flush + progress.json 저장, 같은 입력/설정으로 다시 실행하면 이어서 진행
+    """
+    n = len(positions)
+    fingerprint = hashlib.sha1(
+        "\n".join([EMBED_MODEL, args.vector_dtype, str(args.batch_size)] + [scan.hashes[i] for i in positions]).encode("utf-8")
+    ).hexdigest()
+    vec_path = EMBED_WORK_DIR / "vectors.npy"
+    progress_path = EMBED_WORK_DIR / "progress.json"
+
+    # 긴 것부터 (메모리 부족이면 처음 배치에서 바로 드러남)
+    order = sorted(range(n), key=lambda r: -int(scan.lengths[positions[r]]))
+    batches = [order[i:i + args.batch_size] for i in range(0, n, args.batch_size)]
+
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(EMBED_MODEL)
+    dim = model.get_sentence_embedding_dimension()
+
+    done = 0
+    if progress_path.exists() and vec_path.exists():
+        progress = json.loads(progress_path.read_text(encoding="utf-8"))
+        if progress.get("fingerprint") == fingerprint:
+            done = int(progress["done_batches"])
+            print(f"[INFO] resume embedding: {done}/{len(batches)} batches done")
+    if done:
+        vecs = np.lib.format.open_memmap(vec_path, mode="r+")
+    else:
+        shutil.rmtree(EMBED_WORK_DIR, ignore_errors=True)
+        EMBED_WORK_DIR.mkdir(parents=True)
+        vecs = np.lib.format.open_memmap(vec_path, mode="w+", dtype=args.vector_dtype, shape=(n, dim))
+
+    t0 = time.perf_counter()
+    rows_done = 0
+    with CHUNKS_PATH.open("rb") as f:
+        for b in range(done, len(batches)):
+            rows = batches[b]
+            texts = []
+            for r in rows:
+                f.seek(int(scan.offsets[positions[r]]))
+                texts.append(json.loads(f.readline())["text"])
+            out = model.encode(texts, batch_size=len(texts), normalize_embeddings=True)
+            vecs[rows] = out.astype(args.vector_dtype)
+            rows_done += len(rows)
+
+            if (b + 1) % args.checkpoint_every == 0 or b + 1 == len(batches):
+                vecs.flush()
+                _write_json(progress_path, {"fingerprint": fingerprint, "done_batches": b + 1, "total_batches": len(batches)})
+                dt = time.perf_counter() - t0
+                print(f"[INFO] embedded {b + 1}/{len(batches)} batches ({rows_done / dt:.1f} chunks/s)")
+
+    del vecs
+    return np.load(vec_path, mmap_mode="r")
+
+def write_flat_vectors(index: faiss.Index, path: Path, n_ids: int) -> bool:
+    """
+    flat 인덱스 벡터를 id 순서 float32 .npy로 저장 (API가 mmap으로 검색, mmap_index.py)
+    - 비어 있는 id 자리(증분 빌드로 삭제)는 0벡터
+    - flat이 아니면 아무것도 안 하고 False
+    """
+    idmap = faiss.downcast_index(index)
+    if not isinstance(idmap, faiss.IndexIDMap2):
+        return False
+    flat = faiss.downcast_index(idmap.index)
+    if not isinstance(flat, faiss.IndexFlat):
+        return False
+
+    labels = faiss.vector_to_array(idmap.id_map)
+    xb = faiss.rev_swig_ptr(flat.get_xb(), flat.ntotal * flat.d).reshape(flat.ntotal, flat.d)
+    tmp = path.with_name(path.name + ".tmp")
+    out = np.lib.format.open_memmap(tmp, mode="w+", dtype="float32", shape=(n_ids, flat.d))
+    for start in range(0, flat.ntotal, ADD_BLOCK_ROWS):
+        out[labels[start:start + ADD_BLOCK_ROWS]] = xb[start:start + ADD_BLOCK_ROWS]
+    out.flush()
+    del out
+    os.replace(tmp, path)
+    return True
+
+def write_lexical_index(path: Path) -> None:
+    # 하이브리드 검색용 BM25 역색인 — chunks.jsonl 전체(= 이번 세대 메타와 같은 chunk 집합)로 다시 만듦
+    t0 = time.perf_counter()
+    lexical = BM25Index.build((c["chunk_id"], c["text"]) for c in iter_chunks())
+    lexical.save(path)
+    print(f"[OK] bm25: docs={len(lexical)} ({time.perf_counter() - t0:.1f}s)")
+
+def save_generation(index: faiss.Index, rows: Iterable[Optional[Dict]], state: Dict[str, Any]) -> None:
+    """
+    세대 파일(index/meta/bm25/state)을 모두 쓴 뒤 포인터(index.json)를 교체 → 실행 중인 API는
+    항상 짝이 맞는 index/meta/bm25 묶음만 보게 됨
+    """
+    gen = new_generation()
+    names = generation_file_names(gen)
+
+    faiss.write_index(index, str(DATA_DIR / names["index"]))
+    write_meta_store(DATA_DIR / names["meta"], rows)
+    has_vectors = write_flat_vectors(index, DATA_DIR / names["vectors"], int(state["next_id"]))
+    write_lexical_index(DATA_DIR / names["bm25"])
+    (DATA_DIR / names["state"]).write_text(json.dumps(state, ensure_ascii=False), encoding="utf-8")
+    publish_generation(DATA_DIR, gen)
+
+    print(f"[OK] generation: {gen}")
+    print(f"[OK] saved: {DATA_DIR / names['index']}")
+    print(f"[OK] saved: {DATA_DIR / names['meta']}")
+    print(f"[OK] saved: {DATA_DIR / names['bm25']}")
+    if has_vectors:
+        print(f"[OK] saved: {DATA_DIR / names['vectors']} (mmap search)")
+    # 세대가 공개됐으니 임베딩 중간 파일은 필요 없음
+    shutil.rmtree(EMBED_WORK_DIR, ignore_errors=True)
+
+def full_build(args: argparse.Namespace, scan: ChunkScan) -> None:
+    vecs = embed_chunks(scan, list(range(len(scan))), args)
+    ids = np.arange(len(scan), dtype="int64")
+
+    t0 = time.perf_counter()
+    index = build_index(vecs, ids, args)
+    print(f"[INFO] built {args.index_type} index in {time.perf_counter() - t0:.1f}s (ntotal={index.ntotal})")
+
+    if args.index_type != "flat" and args.eval_queries > 0:
+        eval_recall(index, vecs, ids, args.eval_queries, args.eval_k)
+
+    state = {
+        "index_type": args.index_type,
+        "next_id": len(scan),
+        "chunks": {cid: [i, h] for i, (cid, h) in enumerate(zip(scan.chunk_ids, scan.hashes))},
+    }
+    del vecs
+    save_generation(index, iter_chunks(), state)
+
+def incremental_build(args: argparse.Namespace, scan: ChunkScan) -> None:
+    ptr = read_pointer(DATA_DIR)
+    if ptr is None or not ptr.get("state"):
+        print("[INFO] no previous generation → full build")
+        full_build(args, scan)
+        return
+
+    prev = json.loads((DATA_DIR / ptr["state"]).read_text(encoding="utf-8"))
+    index = faiss.read_index(str(DATA_DIR / ptr["index"]))
+    old: Dict[str, List] = prev["chunks"]
+    next_id = int(prev["next_id"])
+
+    current: Dict[str, List] = {}
+    to_embed: List[int] = []  # scan 기준 chunk 번호
+    to_embed_ids: List[int] = []
+    to_remove: List[int] = []
+    for pos, (cid, h) in enumerate(zip(scan.chunk_ids, scan.hashes)):
+        if cid in old:
+            vid, old_h = old[cid]
+            if old_h != h:
+                # 같은 id 자리에 새 벡터로 교체
+                to_remove.append(vid)
+                to_embed.append(pos)
+                to_embed_ids.append(vid)
+        else:
+            vid = next_id
+            next_id += 1
+            to_embed.append(pos)
+            to_embed_ids.append(vid)
+        current[cid] = [vid, h]
+
+    deleted = [vid for cid, (vid, _) in old.items() if cid not in current]
+    to_remove.extend(deleted)
+
+    print(f"[INFO] new/changed={len(to_embed)}, deleted={len(deleted)}")
+
+    if not to_embed and not to_remove and ptr.get("bm25"):
+        print("[OK] no changes")
+        return
+
+    if to_remove:
+        assert prev["index_type"] != "hnsw", "hnsw 인덱스는 벡터 삭제를 지원하지 않음 → 전체 재빌드 필요"
+        removed = index.remove_ids(np.asarray(to_remove, dtype="int64"))
+        print(f"[INFO] removed vectors: {removed}")
+
+    if to_embed:
+        vecs = embed_chunks(scan, to_embed, args)
+        add_blocks(index, vecs, np.asarray(to_embed_ids, dtype="int64"))
+        print(f"[INFO] added vectors: {len(to_embed)}")
+        del vecs
+
+    # 메타는 벡터 id 순서로 다시 씀(임베딩이 없어 빠름), 비어 있는 id 자리는 None
+    pos_by_vid = np.full(next_id, -1, dtype="int64")
+    for pos, cid in enumerate(scan.chunk_ids):
+        pos_by_vid[current[cid][0]] = pos
+
+    def rows() -> Iterator[Optional[Dict]]:
+        with CHUNKS_PATH.open("rb") as f:
+            for pos in pos_by_vid:
+                if pos < 0:
+                    yield None
+                    continue
+                f.seek(int(scan.offsets[pos]))
+                yield json.loads(f.readline())
+
+    state = {"index_type": prev["index_type"], "next_id": next_id, "chunks": current}
+    save_generation(index, rows(), state)
 
 def main():
+    args = parse_args()
     assert CHUNKS_PATH.exists(), f"missing: {CHUNKS_PATH}"
 
-    chunks = load_chunks()
-    texts = [c["text"] for c in chunks]
-    print(f"[INFO] chunks: {len(chunks)}")
+    scan = scan_chunks()
+    print(f"[INFO] chunks: {len(scan)}")
+    assert len(set(scan.chunk_ids)) == len(scan), "duplicate chunk_id in chunks.jsonl"
 
-    model = SentenceTransformer(EMBED_MODEL)
-    vecs = model.encode(
-        texts,
-        batch_size=32,
-        show_progress_bar=True,
-        normalize_embeddings=True
-    ).astype("float32")
-
-    dim = vecs.shape[1]
-    index = faiss.IndexFlatIP(dim)   # cosine 유사도(정규화된 벡터)
-    index.add(vecs)
-
-    faiss.write_index(index, str(INDEX_PATH))
-    with META_PATH.open("w", encoding="utf-8") as f:
-        json.dump(chunks, f, ensure_ascii=False)
-
-    print(f"[OK] saved: {INDEX_PATH}")
-    print(f"[OK] saved: {META_PATH}")
+    if args.meta_only:
+        write_meta_store(META_PATH, iter_chunks())
+        print(f"[OK] saved: {META_PATH}")
+        write_lexical_index(LEXICAL_PATH)
+        print(f"[OK] saved: {LEXICAL_PATH}")
+        return
+
+    if args.incremental:
+        incremental_build(args, scan)
+    else:
+        full_build(args, scan)
 
 if __name__ == "__main__":
     main()
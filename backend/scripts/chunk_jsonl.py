@@ -1,15 +1,22 @@
+import argparse
+import bisect
 import json
+import os
 import re
+import time
+from multiprocessing import Pool
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 import tiktoken
 
-IN_PATH = Path("data/processed-data/0154b536d619.jsonl")
+IN_DIR = Path("data/processed-data")  # preproces_pdf.py 산출물 (문서별 {doc_id}.jsonl)
+MANIFEST_NAME = "extract_manifest.json"  # preproces_pdf.py 와 같은 이름
 OUT_PATH = Path("data/processed-data/chunks.jsonl")
 
 CHUNK_TOKENS = 900
 OVERLAP_TOKENS = 150
 TOKEN_MODEL_FOR_COUNT = "gpt-4o-mini"  # 토큰 길이 대략 측정용
+SNAP_BACK_CHARS = 40  # 긴 문단을 토큰 위치로 자를 때, 이 범위 안의 공백으로 당겨서 단어 중간을 피함
 
 enc = tiktoken.encoding_for_model(TOKEN_MODEL_FOR_COUNT)
 
@@ -20,76 +27,126 @@ def split_paragraphs(text: str) -> List[str]:
     text = re.sub(r"\n{3,}", "\n\n", text.strip())
     return [p.strip() for p in text.split("\n\n") if p.strip()]
 
+def split_long_paragraph(p: str) -> List[str]:
+    """
+    CHUNK_TOKENS 넘는 문단(표 페이지 등)을 토큰 오프셋 기준으로 자름
+    - 한 번만 인코딩, 토큰별 글자 위치로 잘라서 문단 길이에 선형
+    """
+    text, offsets = enc.decode_with_offsets(enc.encode(p))
+    parts = []
+    pos = 0
+    k = CHUNK_TOKENS
+    while k < len(offsets):
+        cut = offsets[k]
+        space = text.rfind(" ", max(pos + 1, cut - SNAP_BACK_CHARS), cut + 1)
+        if space > pos:
+            cut = space
+        if cut > pos:
+            parts.append(text[pos:cut].strip())
+            pos = cut
+        # 다음 조각: 방금 자른 위치의 토큰부터 CHUNK_TOKENS 개 뒤
+        k = bisect.bisect_left(offsets, pos) + CHUNK_TOKENS
+    parts.append(text[pos:].strip())
+    return [x for x in parts if x]
+
 def chunk_paragraphs(paras: List[str]) -> List[str]:
     chunks = []
-    cur = []
+    cur: List[Tuple[str, int]] = []  # (문단, 토큰 수) — 토큰 수는 문단마다 한 번만 계산
     cur_t = 0
 
     for p in paras:
         pt = tok_len(p)
 
         if pt > CHUNK_TOKENS:
-            words = p.split()
-            buf = []
-            for w in words:
-                buf.append(w)
-                if tok_len(" ".join(buf)) >= CHUNK_TOKENS:
-                    chunks.append(" ".join(buf).strip())
-                    buf = []
-            if buf:
-                chunks.append(" ".join(buf).strip())
+            # 쌓아 둔 문단 먼저 내보내서 페이지 안 순서 유지
+            if cur:
+                chunks.append("\n\n".join(x for x, _ in cur).strip())
+                cur, cur_t = [], 0
+            chunks.extend(split_long_paragraph(p))
             continue
 
         if cur_t + pt <= CHUNK_TOKENS:
-            cur.append(p)
+            cur.append((p, pt))
             cur_t += pt
         else:
-            chunks.append("\n\n".join(cur).strip())
+            chunks.append("\n\n".join(x for x, _ in cur).strip())
 
-            carry = []
+            carry: List[Tuple[str, int]] = []
             carry_t = 0
-            for prev in reversed(cur):
-                t = tok_len(prev)
+            for prev, t in reversed(cur):
                 if carry_t + t > OVERLAP_TOKENS:
                     break
-                carry.append(prev)
+                carry.append((prev, t))
                 carry_t += t
-            carry = list(reversed(carry))
+            carry.reverse()
 
-            cur = carry + [p]
-            cur_t = sum(tok_len(x) for x in cur)
+            cur = carry + [(p, pt)]
+            cur_t = carry_t + pt
 
     if cur:
-        chunks.append("\n\n".join(cur).strip())
+        chunks.append("\n\n".join(x for x, _ in cur).strip())
 
     return [c for c in chunks if c]
 
+def chunk_page(line: str) -> List[Dict]:
+    rec = json.loads(line)
+    chs = chunk_paragraphs(split_paragraphs(rec["text"]))
+    return [
+        {
+            "chunk_id": f'{rec["doc_id"]}_p{rec["page"]}_c{i}',
+            "doc_id": rec["doc_id"],
+            "source": rec["source"],
+            "page": rec["page"],
+            "text": ch,
+        }
+        for i, ch in enumerate(chs)
+    ]
+
+def input_paths(in_dir: Path) -> List[Path]:
+    """추출 manifest에 있는 문서 순서대로, 없으면 폴더의 문서 JSONL 전체"""
+    manifest = in_dir / MANIFEST_NAME
+    if manifest.exists():
+        entries = json.loads(manifest.read_text(encoding="utf-8"))
+        paths = [in_dir / f'{e["doc_id"]}.jsonl' for _, e in sorted(entries.items())]
+        return [p for p in paths if p.exists()]
+    return sorted(p for p in in_dir.glob("*.jsonl") if p.resolve() != OUT_PATH.resolve())
+
+def iter_lines(paths: List[Path]):
+    for path in paths:
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield line
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="문서별 페이지 JSONL → chunks.jsonl")
+    ap.add_argument("inputs", nargs="*", type=Path, help=f"페이지 JSONL (기본: {IN_DIR} 의 추출 결과 전체)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="청킹 프로세스 수")
+    return ap.parse_args()
+
 def main():
-    assert IN_PATH.exists(), f"missing: {IN_PATH}"
+    args = parse_args()
+    paths = args.inputs or input_paths(IN_DIR)
+    assert paths, f"no page JSONL found in: {IN_DIR}"
+    for p in paths:
+        assert p.exists(), f"missing: {p}"
 
+    t0 = time.perf_counter()
     n_pages = 0
     n_chunks = 0
 
-    with IN_PATH.open("r", encoding="utf-8") as f_in, OUT_PATH.open("w", encoding="utf-8") as f_out:
-        for line in f_in:
-            rec = json.loads(line)
+    # 페이지 단위로 워커에 나눠 주고, imap 으로 입력 순서대로 받아 바로 기록 (전체를 메모리에 올리지 않음)
+    tmp_path = OUT_PATH.with_name(OUT_PATH.name + ".tmp")
+    with Pool(processes=max(1, args.workers)) as pool, tmp_path.open("w", encoding="utf-8") as f_out:
+        for chunks in pool.imap(chunk_page, iter_lines(paths), chunksize=16):
             n_pages += 1
-
-            paras = split_paragraphs(rec["text"])
-            chs = chunk_paragraphs(paras)
-
-            for i, ch in enumerate(chs):
-                out = {
-                    "chunk_id": f'{rec["doc_id"]}_p{rec["page"]}_c{i}',
-                    "doc_id": rec["doc_id"],
-                    "source": rec["source"],
-                    "page": rec["page"],
-                    "text": ch,
-                }
+            for out in chunks:
                 f_out.write(json.dumps(out, ensure_ascii=False) + "\n")
-                n_chunks += 1
+            n_chunks += len(chunks)
+    tmp_path.replace(OUT_PATH)
 
-    print(f"[OK] pages={n_pages}, chunks={n_chunks}")
+    dt = time.perf_counter() - t0
+    print(f"[OK] docs={len(paths)}, pages={n_pages}, chunks={n_chunks} ({dt:.1f}s, {n_pages / dt:.1f} pages/s)")
     print(f"[OK] wrote: {OUT_PATH}")
 
 if __name__ == "__main__":
@@ -0,0 +1,207 @@
+import argparse
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import faiss
+
+# backend/ 를 import 경로에 추가 (앱과 같은 인덱스/메타/임베더 코드 사용)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.app.services.embedders import (  # noqa: E402
+    ONNX_CONFIG_NAME,
+    ONNX_MODEL_NAME,
+    PARITY_REPORT_NAME,
+    OnnxEmbedder,
+    file_sha256,
+)
+from src.app.services.index_files import resolve_index_files  # noqa: E402
+from src.app.services.meta_store import ListMetaStore, MetaStore  # noqa: E402
+from src.app.services.rag_service import (  # noqa: E402
+    DATA_DIR,
+    EMBED_MODEL,
+    EMBED_ONNX_DIR,
+    INDEX_PATH,
+    LEGACY_META_JSON_PATH,
+    META_PATH,
+)
+
+# bge-m3(fp32 PyTorch) → ONNX(CLS 풀링 + 정규화 포함) → int8 동적 양자화 → 현재 인덱스 벡터와 parity 검사
+# - parity.json이 passed여야 API가 EMBED_BACKEND=onnx 로 이 모델을 로드함
+# - 인덱스를 다시 빌드했으면 --check-only 로 검사만 다시 돌리면 됨
+#
+# 필요 패키지(내보내기 시): torch, sentence-transformers, onnx, onnxruntime
+# 서빙 시에는 onnxruntime, tokenizers 만 있으면 됨
+
+# parity 통과 기준 (문서 벡터 기준: ONNX로 다시 임베딩한 벡터 vs 인덱스에 저장된 fp32 벡터)
+MIN_COS_MEAN = 0.99
+MIN_COS_P01 = 0.97   # 하위 1% 코사인
+MIN_TOPK_OVERLAP = 0.9
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="bge-m3 질문 임베더 ONNX(int8) 내보내기 + parity 검사")
+    ap.add_argument("--out-dir", type=Path, default=EMBED_ONNX_DIR)
+    ap.add_argument("--check-only", action="store_true", help="내보내기 없이 현재 인덱스 기준 parity 검사만")
+    ap.add_argument("--no-quantize", action="store_true", help="fp32 ONNX 그대로 사용 (비교용)")
+    ap.add_argument("--max-length", type=int, default=512, help="질문 최대 토큰 수 (질문용이라 짧게 잡아도 됨)")
+    ap.add_argument("--opset", type=int, default=17)
+    ap.add_argument("--threads", type=int, default=0, help="onnxruntime intra-op 스레드 (0=기본값)")
+    ap.add_argument("--samples", type=int, default=300, help="parity 검사에 쓸 chunk 수")
+    ap.add_argument("--k", type=int, default=5, help="top-k 겹침 비율의 k (RAG top_k와 맞춤)")
+    return ap.parse_args()
+
+def export(out_dir: Path, max_length: int, opset: int, quantize: bool) -> None:
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(EMBED_MODEL, device="cpu")
+    hf = st[0].auto_model.eval()
+    tokenizer = st[0].tokenizer
+
+    class ClsEmbed(torch.nn.Module):
+        # sentence-transformers bge-m3 구성(CLS 풀링 → Normalize)과 같은 출력
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            h = self.model(input_ids=input_ids, attention_mask=attention_mask).last_hidden_state[:, 0]
+            return torch.nn.functional.normalize(h, dim=-1)
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # fp32 그래프는 2GB를 넘어서 external data로 저장됨 → 별도 폴더에 두고 양자화 후 삭제
+    fp32_dir = out_dir / "fp32"
+    fp32_dir.mkdir(exist_ok=True)
+    fp32_path = fp32_dir / ONNX_MODEL_NAME
+
+    dummy = tokenizer(["청년 월세 지원 신청 기한", "만 34세"], padding=True, return_tensors="pt")
+    t0 = time.perf_counter()
+    with torch.no_grad():
+        torch.onnx.export(
+            ClsEmbed(hf),
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["embedding"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "seq"},
+                "attention_mask": {0: "batch", 1: "seq"},
+                "embedding": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+    print(f"[OK] exported fp32 onnx ({time.perf_counter() - t0:.1f}s)")
+
+    model_path = out_dir / ONNX_MODEL_NAME
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        t0 = time.perf_counter()
+        quantize_dynamic(str(fp32_path), str(model_path), weight_type=QuantType.QInt8)
+        print(f"[OK] quantized int8 ({time.perf_counter() - t0:.1f}s, {model_path.stat().st_size / 1e6:.0f}MB)")
+        shutil.rmtree(fp32_dir)
+    else:
+        for p in fp32_dir.iterdir():
+            shutil.move(str(p), out_dir / p.name)
+        fp32_dir.rmdir()
+
+    # tokenizer.json(fast tokenizer) — 서빙 때는 tokenizers 패키지만으로 로드
+    tokenizer.save_pretrained(str(out_dir))
+    cfg = {
+        "model": EMBED_MODEL,
+        "max_length": max_length,
+        "doc_max_length": st.max_seq_length,
+        "dim": st.get_sentence_embedding_dimension(),
+        "quantized": quantize,
+        "pad_token": tokenizer.pad_token,
+    }
+    (out_dir / ONNX_CONFIG_NAME).write_text(json.dumps(cfg, ensure_ascii=False, indent=2), encoding="utf-8")
+    # 모델이 바뀌었으니 이전 검사 결과는 무효
+    (out_dir / PARITY_REPORT_NAME).unlink(missing_ok=True)
+
+def reference_vectors(index: faiss.Index, ids: np.ndarray, vectors_path: Optional[Path] = None) -> np.ndarray:
+    # flat 세대는 저장된 vectors-<gen>.npy(id 순서)를 그대로 사용
+    if vectors_path is not None and vectors_path.exists():
+        return np.asarray(np.load(vectors_path, mmap_mode="r")[ids], dtype="float32")
+    # IVF는 id → 벡터 직접 조회 맵이 있어야 reconstruct 가능 (ivf_pq는 근사 복원이라 기준이 느슨해짐)
+    # 증분 빌드로 삭제가 있었으면 id가 0..n-1 연속이 아니라 Array 맵은 못 만듦 → Hashtable
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+    return np.stack([index.reconstruct(int(i)) for i in ids]).astype("float32")
+
+def check_parity(out_dir: Path, samples: int, k: int, threads: int) -> Dict:
+    files = resolve_index_files(DATA_DIR, INDEX_PATH, META_PATH, LEGACY_META_JSON_PATH)
+    index = faiss.read_index(str(files.index_path))
+    meta = MetaStore(files.meta_path) if files.meta_path.suffix == ".bin" else ListMetaStore(files.meta_path)
+
+    rows = [i for i in range(len(meta)) if meta.get(i) is not None]
+    rng = np.random.default_rng(0)
+    ids = np.sort(rng.choice(rows, size=min(samples, len(rows)), replace=False))
+    texts: List[str] = [meta.get(int(i))["text"] for i in ids]
+
+    # 인덱스 벡터는 sentence-transformers가 max_seq_length까지 보고 만든 것 → 같은 길이로 비교
+    cfg = json.loads((out_dir / ONNX_CONFIG_NAME).read_text(encoding="utf-8"))
+    embedder = OnnxEmbedder(out_dir, threads=threads, max_length=cfg.get("doc_max_length"))
+    assert embedder.dim == index.d, f"dim mismatch: onnx={embedder.dim}, index={index.d}"
+
+    t0 = time.perf_counter()
+    got = embedder.encode(texts, batch_size=16)
+    t_doc = (time.perf_counter() - t0) / len(texts)
+    ref = reference_vectors(index, ids, files.vectors_path)
+
+    cos = np.sum(got * ref, axis=1)
+    _, top_ref = index.search(ref, k)
+    _, top_got = index.search(got, k)
+    overlap = float(np.mean([len(set(a) & set(b)) / k for a, b in zip(top_ref, top_got)]))
+
+    # 질문 한 건 지연(배치 1) — 서빙 경로와 같은 조건
+    queries = ["청년 월세 지원 받을 수 있나요?", "구직활동지원금 신청 기한", "만 34세도 되나요"]
+    embedder.encode(queries[0])
+    t0 = time.perf_counter()
+    for q in queries * 5:
+        embedder.encode(q)
+    t_query = (time.perf_counter() - t0) / (len(queries) * 5)
+
+    report = {
+        "passed": bool(
+            cos.mean() >= MIN_COS_MEAN and np.quantile(cos, 0.01) >= MIN_COS_P01 and overlap >= MIN_TOPK_OVERLAP
+        ),
+        "model": embedder.model_name,
+        "model_sha256": file_sha256(out_dir / ONNX_MODEL_NAME),
+        "index_generation": files.generation,
+        "samples": len(ids),
+        "k": k,
+        "cos_mean": round(float(cos.mean()), 5),
+        "cos_p01": round(float(np.quantile(cos, 0.01)), 5),
+        "cos_min": round(float(cos.min()), 5),
+        "topk_overlap": round(overlap, 4),
+        "thresholds": {"cos_mean": MIN_COS_MEAN, "cos_p01": MIN_COS_P01, "topk_overlap": MIN_TOPK_OVERLAP},
+        "doc_embed_ms": round(t_doc * 1000, 2),
+        "query_embed_ms": round(t_query * 1000, 2),
+        "checked_at": time.time(),
+    }
+    meta.close()
+    return report
+
+def main():
+    args = parse_args()
+    if not args.check_only:
+        export(args.out_dir, args.max_length, args.opset, quantize=not args.no_quantize)
+
+    report = check_parity(args.out_dir, args.samples, args.k, args.threads)
+    (args.out_dir / PARITY_REPORT_NAME).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    print(f"[PARITY] samples={report['samples']} cos_mean={report['cos_mean']} cos_p01={report['cos_p01']} "
+          f"cos_min={report['cos_min']} top{args.k}_overlap={report['topk_overlap']}")
+    print(f"[PARITY] onnx latency: query={report['query_embed_ms']}ms, doc={report['doc_embed_ms']}ms/chunk")
+    print(f"[OK] wrote: {args.out_dir / PARITY_REPORT_NAME}")
+    if not report["passed"]:
+        print("[FAIL] parity below thresholds → EMBED_BACKEND=onnx 로는 로드되지 않음")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
-import re
-import json
+import argparse
 import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
 import fitz  # PyMuPDF
 
-# PDF "파일" 경로로 지정
-PDF_PATH = r"C:\Users\USER\Desktop\MY FILES\PROJECT\youth-chatbot\backend\data\raw-data\2026년 청년일자리도약장려금 사업운영 지침('26.1월).pdf"
+# backend/ 에서 실행 (다른 스크립트와 같은 상대 경로)
+RAW_DIR = Path("data/raw-data")
+OUT_DIR = Path("data/processed-data")
+MANIFEST_NAME = "extract_manifest.json"  # 입력 폴더 기준 상대 경로 → {doc_id, path, sha256, pages, records}
 
-OUT_DIR = Path("processed-data")  
-OUT_DIR.mkdir(parents=True, exist_ok=True)
+PAGES_PER_TASK = 8  # 워커 한 번에 처리할 페이지 수 (너무 작으면 IPC 오버헤드, 너무 크면 문서 끝에서 놀게 됨)
+MAX_OPEN_DOCS = 32  # 동시에 추출 중인 문서 수 상한 (문서마다 임시 파일 하나 → 파일 디스크립터 한도 대비)
 
 def normalize_text(text: str) -> str:
     text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
@@ -34,31 +43,233 @@ def normalize_text(text: str) -> str:
 def is_noise_page(text: str) -> bool:
     return len(text) < 50
 
+def doc_id_for(key: str) -> str:
+    # 입력 폴더 기준 상대 경로 기준 → 최상위 파일은 상대 경로 = 파일명이라 기존 id(0154b536d619 등) 그대로,
+    # 하위 폴더의 같은 이름 PDF끼리는 id가 갈림
+    return hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# ---- 워커 프로세스 ----
+# fitz.Document는 프로세스 간에 넘길 수 없어서 워커마다 열어 두고 재사용 (최근 문서 몇 개만)
+_open_docs: Dict[str, "fitz.Document"] = {}
+
+def _worker_doc(path: str) -> "fitz.Document":
+    doc = _open_docs.get(path)
+    if doc is None:
+        while len(_open_docs) >= 4:
+            _open_docs.pop(next(iter(_open_docs))).close()
+        doc = _open_docs[path] = fitz.open(path)
+    return doc
+
+def extract_pages(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """[start, end) 페이지(0부터) → [(페이지 번호(1부터), 정규화 텍스트)], 노이즈 페이지는 제외"""
+    doc = _worker_doc(path)
+    out = []
+    for i in range(start, end):
+        text = normalize_text(doc.load_page(i).get_text("text") or "")
+        if not is_noise_page(text):
+            out.append((i + 1, text))
+    return out
+
+# ---- 메인 프로세스 ----
+class DocWriter:
+    """
+    문서 하나의 JSONL을 페이지 순서대로 흘려 씀
+    - 배치 결과는 완료 순서가 뒤섞여 오므로, 앞 배치가 다 모일 때까지만 들고 있다가 이어진 만큼 바로 기록
+    - 임시 파일에 쓰고 문서가 끝나면 교체 → 중간에 죽어도 이전 산출물은 그대로
+    """
+
+    def __init__(self, pdf_path: Path, doc_id: str, n_pages: int, out_dir: Path):
+        self.pdf_path = pdf_path
+        self.doc_id = doc_id
+        self.n_pages = n_pages
+        self.out_path = out_dir / f"{doc_id}.jsonl"
+        self.tmp_path = out_dir / f"{doc_id}.jsonl.tmp"
+        self.f = self.tmp_path.open("w", encoding="utf-8")
+        self.pending: Dict[int, List[Tuple[int, str]]] = {}
+        self.next_start = 0
+        self.records = 0
+        self.t0 = time.perf_counter()
+
+    def add(self, start: int, pages: List[Tuple[int, str]]) -> None:
+        self.pending[start] = pages
+        while self.next_start in self.pending:
+            for page_no, text in self.pending.pop(self.next_start):
+                record = {
+                    "doc_id": self.doc_id,
+                    "source": self.pdf_path.name,
+                    "page": page_no,
+                    "text": text,
+                }
+                self.f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                self.records += 1
+            self.next_start = min(self.next_start + PAGES_PER_TASK, self.n_pages)
+
+    @property
+    def done(self) -> bool:
+        return self.next_start >= self.n_pages
+
+    def close(self) -> None:
+        self.f.close()
+        self.tmp_path.replace(self.out_path)
+
+    def abort(self) -> None:
+        self.f.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+def iter_pdfs(inputs: Iterable[Path]) -> List[Tuple[str, Path]]:
+    """[(manifest 키 = 입력 폴더 기준 상대 경로(파일 인자는 파일명), PDF 경로)]"""
+    pdfs = []
+    for p in inputs:
+        if p.is_dir():
+            pdfs.extend((x.relative_to(p).as_posix(), x) for x in sorted(p.rglob("*")) if x.suffix.lower() == ".pdf")
+        elif p.suffix.lower() == ".pdf":
+            pdfs.append((p.name, p))
+        else:
+            print(f"[WARN] not a PDF/dir, skipped: {p}")
+    keys = [k for k, _ in pdfs]
+    dup = sorted({k for k in keys if keys.count(k) > 1})
+    assert not dup, f"same relative path in several inputs: {', '.join(dup)}"
+    return pdfs
+
+def load_manifest(out_dir: Path) -> Dict[str, Dict]:
+    p = out_dir / MANIFEST_NAME
+    return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+
+def prune_manifest(out_dir: Path, manifest: Dict[str, Dict]) -> List[str]:
+    """
+    원본 PDF가 없어진 항목을 manifest와 문서 JSONL에서 삭제 (→ chunk_jsonl.py 입력에서 빠지고
+    build_faiss.py --incremental이 해당 chunk를 인덱스에서 지움)
+    - path가 없는 예전 항목은 RAW_DIR/키 로 확인
+    """
+    removed = [k for k, e in manifest.items() if not Path(e.get("path") or RAW_DIR / k).exists()]
+    live_ids = {e["doc_id"] for k, e in manifest.items() if k not in removed}
+    for k in removed:
+        doc_id = manifest.pop(k)["doc_id"]
+        if doc_id not in live_ids:
+            (out_dir / f"{doc_id}.jsonl").unlink(missing_ok=True)
+    return removed
+
+def save_manifest(out_dir: Path, manifest: Dict[str, Dict]) -> None:
+    p = out_dir / MANIFEST_NAME
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, p)
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="PDF 폴더 → 문서별 페이지 JSONL (병렬 추출, 변경 없는 파일은 건너뜀)")
+    ap.add_argument("inputs", nargs="*", type=Path, default=[RAW_DIR], help=f"PDF 파일 또는 폴더 (기본: {RAW_DIR})")
+    ap.add_argument("--out-dir", type=Path, default=OUT_DIR)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="추출 프로세스 수")
+    ap.add_argument("--force", action="store_true", help="내용 해시가 같아도 다시 추출")
+    return ap.parse_args()
+
 def main():
-    pdf_path = Path(PDF_PATH)
-    assert pdf_path.exists(), f"PDF not found: {pdf_path}"
-    assert pdf_path.suffix.lower() == ".pdf", f"Not a PDF file: {pdf_path}"
-
-    doc_id = hashlib.md5(pdf_path.name.encode("utf-8")).hexdigest()[:12]
-    out_file = OUT_DIR / f"{doc_id}.jsonl"
-
-    doc = fitz.open(pdf_path)  # ✅ str() 안 해도 됨
-    with out_file.open("w", encoding="utf-8") as f:
-        for i, page in enumerate(doc, start=1):
-            raw = page.get_text("text") or ""
-            text = normalize_text(raw)
-            if is_noise_page(text):
-                continue
-
-            record = {
-                "doc_id": doc_id,
-                "source": pdf_path.name,
-                "page": i,
-                "text": text,
-            }
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-    print(f"[OK] saved: {out_file}")
+    args = parse_args()
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+
+    pdfs = iter_pdfs(args.inputs)
+    assert pdfs, f"no PDF found in: {', '.join(map(str, args.inputs))}"
+
+    manifest = load_manifest(args.out_dir)
+    removed = prune_manifest(args.out_dir, manifest)
+    if removed:
+        save_manifest(args.out_dir, manifest)
+        print(f"[INFO] removed (source PDF gone): {', '.join(removed)}")
+
+    todo: List[Tuple[str, Path, str, str]] = []
+    for key, pdf in pdfs:
+        doc_id = doc_id_for(key)
+        sha = file_sha256(pdf)
+        prev: Optional[Dict] = manifest.get(key)
+        if not args.force and prev and prev.get("sha256") == sha and (args.out_dir / f"{doc_id}.jsonl").exists():
+            prev["path"] = str(pdf)
+            continue
+        todo.append((key, pdf, doc_id, sha))
+    save_manifest(args.out_dir, manifest)
+
+    print(f"[INFO] pdfs={len(pdfs)}, changed={len(todo)}, skipped={len(pdfs) - len(todo)}, workers={args.workers}")
+    if not todo:
+        print("[OK] nothing to extract")
+        return
+
+    t0 = time.perf_counter()
+    total_pages = 0
+    writers: Dict[str, DocWriter] = {}  # 추출 중인 문서만 (최대 MAX_OPEN_DOCS개)
+    n_ok = 0
+    failed: List[str] = []
+    queue = list(reversed(todo))
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {}
+
+        def start_docs() -> None:
+            # 끝난 문서 자리만큼 다음 문서를 열어서 페이지 배치 제출
+            nonlocal total_pages
+            while queue and len(writers) < MAX_OPEN_DOCS:
+                key, pdf, doc_id, sha = queue.pop()
+                try:
+                    with fitz.open(pdf) as doc:
+                        n_pages = doc.page_count
+                except Exception as e:
+                    print(f"[ERROR] cannot open {pdf}: {e}")
+                    failed.append(key)
+                    continue
+                if n_pages == 0:
+                    print(f"[WARN] empty PDF, skipped: {pdf}")
+                    continue
+                writers[key] = DocWriter(pdf, doc_id, n_pages, args.out_dir)
+                total_pages += n_pages
+                for start in range(0, n_pages, PAGES_PER_TASK):
+                    end = min(start + PAGES_PER_TASK, n_pages)
+                    futures[pool.submit(extract_pages, str(pdf), start, end)] = (key, sha, start)
+
+        start_docs()
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                key, sha, start = futures.pop(fut)
+                w = writers.get(key)
+                if w is None:  # 이미 실패 처리된 문서의 나머지 배치
+                    continue
+                try:
+                    pages = fut.result()
+                except Exception as e:
+                    # 이 문서만 실패 처리 (이전 산출물/manifest는 그대로), 나머지 문서는 계속
+                    print(f"[ERROR] {key} pages {start + 1}~: {e}")
+                    failed.append(key)
+                    del writers[key]
+                    w.abort()
+                    continue
+                w.add(start, pages)
+                if w.done:
+                    w.close()
+                    del writers[key]
+                    n_ok += 1
+                    dt = time.perf_counter() - w.t0
+                    manifest[key] = {
+                        "doc_id": w.doc_id,
+                        "path": str(w.pdf_path),
+                        "sha256": sha,
+                        "pages": w.n_pages,
+                        "records": w.records,
+                        "extracted_at": time.time(),
+                    }
+                    save_manifest(args.out_dir, manifest)
+                    print(f"[OK] {key} → {w.out_path} (pages={w.n_pages}, records={w.records}, {w.n_pages / dt:.1f} pages/s)")
+            start_docs()
+
+    dt = time.perf_counter() - t0
+    print(f"[OK] docs={n_ok}, pages={total_pages}, {dt:.1f}s, {total_pages / dt:.1f} pages/s")
+    if failed:
+        print(f"[ERROR] failed: {', '.join(failed)}")
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
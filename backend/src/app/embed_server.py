@@ -0,0 +1,157 @@
+# backend/src/app/embed_server.py
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from contextlib import suppress
+from pathlib import Path
+
+import numpy as np
+
+from .services.embed_batcher import EmbeddingBatcher
+from .services.embed_sidecar import SidecarError, recv_json, send_frame, send_json
+from .services.embedders import load_query_embedder
+from .services.rag_service import (
+    EMBED_BACKEND,
+    EMBED_BATCH_MAX_WAIT_MS,
+    EMBED_MODEL,
+    EMBED_ONNX_DIR,
+    EMBED_ONNX_THREADS,
+    EMBED_SIDECAR_SOCKET,
+    WARMUP_QUERY,
+)
+from .services.request_log import configure_logging
+
+# 질문 임베딩 사이드카 (backend/ 에서): python -m src.app.embed_server --socket /tmp/yp-embed.sock
+# API 쪽은 EMBED_SIDECAR_SOCKET=/tmp/yp-embed.sock 으로 실행 → 워커들이 모델을 따로 올리지 않음
+# - 모델(EMBED_BACKEND: torch | onnx)은 이 프로세스에 한 벌만, CPU 스레드도 여기서만 씀
+# - 워커들이 보낸 요청을 EmbeddingBatcher 하나로 모아서 encode (워커 간 배칭)
+# - 프로토콜은 services/embed_sidecar.py 참고
+
+DEFAULT_SOCKET = "/tmp/yp-embed.sock"
+SIDECAR_BATCH_MAX_SIZE = 32  # 워커 여러 개의 배치가 합쳐지므로 워커 쪽(EMBED_BATCH_MAX_SIZE)보다 크게
+
+# python -m 으로 실행하면 __name__이 "__main__" → 앱 로거(src.app) 아래 이름으로
+logger = logging.getLogger(f"{__package__}.embed_server")
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="API 워커들이 함께 쓰는 질문 임베딩 서버 (Unix 소켓)")
+    ap.add_argument("--socket", type=Path, default=Path(EMBED_SIDECAR_SOCKET or DEFAULT_SOCKET))
+    ap.add_argument("--max-batch-size", type=int, default=SIDECAR_BATCH_MAX_SIZE)
+    ap.add_argument("--max-wait-ms", type=float, default=EMBED_BATCH_MAX_WAIT_MS)
+    return ap.parse_args()
+
+
+class EmbedServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+    request_queue_size = 256  # 기본값 5면 워커들이 동시에 연결할 때 connect()가 EAGAIN
+
+    def __init__(self, path: Path, batcher: EmbeddingBatcher, dim: int):
+        self.batcher = batcher
+        self.dim = dim
+        super().__init__(str(path), EmbedHandler)
+
+
+class EmbedHandler(socketserver.BaseRequestHandler):
+    """연결 하나 = 워커 스레드 하나, 요청/응답을 순서대로 주고받음"""
+
+    server: EmbedServer
+
+    def handle(self) -> None:
+        # 워커가 끊으면(재시작/종료) 조용히 연결만 정리
+        with suppress(OSError, SidecarError, ValueError):
+            self._serve(self.request)
+
+    def _serve(self, sock: socket.socket) -> None:
+        while True:
+            req = recv_json(sock)
+
+            op = req.get("op")
+            if op == "info":
+                send_json(sock, {"ok": True, "model": EMBED_MODEL, "backend": EMBED_BACKEND, "dim": self.server.dim})
+                continue
+            if op != "encode":
+                send_json(sock, {"ok": False, "error": f"unknown op: {op}"})
+                continue
+
+            texts = [str(t) for t in req.get("texts") or []]
+            try:
+                rows = self.server.batcher.encode_many(texts)
+                vecs = np.stack(rows) if rows else np.zeros((0, self.server.dim), dtype="float32")
+            except Exception as e:
+                logger.exception("encode failed")
+                send_json(sock, {"ok": False, "error": str(e)})
+                continue
+            send_json(sock, {"ok": True, "rows": len(vecs), "dim": int(vecs.shape[1])})
+            send_frame(sock, memoryview(np.ascontiguousarray(vecs, dtype="float32")).cast("B"))
+
+
+def _claim_socket(path: Path) -> bool:
+    """남아 있는 소켓 파일 정리, 이미 다른 사이드카가 듣고 있으면 False"""
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return True
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(path))
+        return False
+    except OSError:
+        path.unlink()
+        return True
+    finally:
+        probe.close()
+
+
+def main() -> int:
+    args = parse_args()
+    configure_logging(__package__)
+    if not _claim_socket(args.socket):
+        logger.error("another embed server is already listening on %s", args.socket)
+        return 2
+
+    t0 = time.perf_counter()
+    embedder = load_query_embedder(EMBED_BACKEND, EMBED_MODEL, EMBED_ONNX_DIR, EMBED_ONNX_THREADS)
+    batcher = EmbeddingBatcher(
+        lambda texts: embedder.encode(texts, batch_size=len(texts), normalize_embeddings=True),
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+    )
+    dim = int(batcher.encode(WARMUP_QUERY).shape[0])
+    logger.info(
+        "embedder loaded and warmed up",
+        extra={"backend": EMBED_BACKEND, "dim": dim, "load_ms": round((time.perf_counter() - t0) * 1000, 2)},
+    )
+
+    server = EmbedServer(args.socket, batcher, dim)
+    # 같은 사용자/그룹의 API 워커만 접속
+    os.chmod(args.socket, 0o660)
+
+    def stop(signum: int, _frame: object) -> None:
+        # serve_forever()를 도는 스레드에서 shutdown()을 부르면 멈춤 → 별도 스레드
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    logger.info("embed server listening on %s", args.socket)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        batcher.close()
+        with suppress(FileNotFoundError):
+            args.socket.unlink()
+    logger.info("embed server stopped: %s", batcher.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,21 +1,250 @@
 # backend/src/app/main.py
 from __future__ import annotations
 
-from fastapi import FastAPI
+import asyncio
+import hmac
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import FastAPI, Header, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 
 from schema import ChatRequest, ChatResponse
 
-from .services.session_store import InMemorySessionStore, ChatMessage
+from .services.session_store import (
+    InMemorySessionStore,
+    ChatMessage,
+    SessionConflictError,
+    SessionState,
+    SessionStore,
+)
+from .services.sqlite_session_store import SqliteSessionStore
 from .services.onboarding import (
     needs_onboarding,
     get_next_primary_question,
     apply_primary_answer,
 )
-from .services.followup_questions import detect_policy_intent
-from .services.rag_service import RAGService
+from .services.context_packer import token_counter_status
+from .services.followup_questions import detect_policy
+from .services.policy_catalog import get_policy_catalog
+from .services.rag_service import AnswerPlan, LLMStreamInterrupted, RAGService
+from .services.metrics import CONTENT_TYPE, REGISTRY
+from .services.request_log import (
+    REQUEST_ID_HEADER,
+    configure_logging,
+    elapsed_ms,
+    new_request_id,
+    request_id_var,
+    run_in_executor,
+)
+
+configure_logging(__package__)
+logger = logging.getLogger(__name__)
+
+# 인덱스 세대(index.json) 감시 주기(초), 0이면 감시 안 함 → /admin/index/reload로만 교체
+INDEX_WATCH_INTERVAL_SEC = 30
+# /admin/* 는 X-Admin-Token 헤더가 이 값과 같을 때만 허용, 비어 있으면(기본) /admin/* 전체 비활성화(404)
+# (인덱스 교체는 INDEX_WATCH_INTERVAL_SEC 감시로도 되므로 토큰 없이 운영 가능)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# 세션 저장소: memory(기본, 워커 1개용) | sqlite(같은 노드의 여러 워커가 세션 공유)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+SESSION_SQLITE_PATH = os.getenv("SESSION_SQLITE_PATH", "data/sessions.sqlite3")
+# sqlite 저장소 호출(get_or_create/save)을 돌리는 스레드 수 — 쓰기 잠금 대기(최대 5초)가 이벤트 루프를 막지 않도록
+SESSION_STORE_WORKERS = 8
+
+# 부팅 단계(인덱스/모델 로드, 워밍업) 실패 시 재시도 간격(초) — 인덱스 빌드 전/Ollama 기동 전에 떠도 스스로 준비됨
+BOOT_RETRY_SEC = 5
+
+
+def _make_store() -> SessionStore:
+    if SESSION_BACKEND == "sqlite":
+        return SqliteSessionStore(SESSION_SQLITE_PATH)
+    assert SESSION_BACKEND == "memory", f"unknown SESSION_BACKEND: {SESSION_BACKEND}"
+    return InMemorySessionStore()
+
+
+store = _make_store()
+_store_executor = ThreadPoolExecutor(max_workers=SESSION_STORE_WORKERS, thread_name_prefix="session-store")
+
+
+async def _store_call(fn: Callable[..., Any], *args: Any) -> Any:
+    # 메모리 저장소는 락 한 번이라 그대로, sqlite는 디스크 I/O + 잠금 대기가 있어서 스레드에서
+    if isinstance(store, SqliteSessionStore):
+        return await run_in_executor(_store_executor, fn, *args)
+    return fn(*args)
+
+
+rag = RAGService()  # 가벼운 생성만, 인덱스/모델은 lifespan의 _boot()에서 로드
+policy_catalog = get_policy_catalog()  # 정책 카탈로그 → 매처 컴파일 (파일 오류면 여기서 바로 실패)
+logger.info("policy catalog loaded: %s policies, %s patterns", len(policy_catalog), policy_catalog.n_patterns)
+
+# /readyz 상태: starting → loading → warming → warming_llm → ready
+boot: Dict[str, Any] = {"stage": "starting", "error": None, "timings_ms": {}, "token_counter": None}
+
+# ---- 지표 (/metrics) ----
+HTTP_REQUESTS = REGISTRY.counter("yp_http_requests_total", "HTTP requests", ("path", "status"))
+HTTP_SECONDS = REGISTRY.histogram("yp_http_request_seconds", "HTTP request latency (non-streaming part)", ("path",))
+STAGE_SECONDS = REGISTRY.histogram("yp_answer_stage_seconds", "Answer pipeline stage latency", ("stage",))
+ANSWER_OUTCOMES = REGISTRY.counter(
+    "yp_answer_outcomes_total",
+    "Answer turns by outcome (confirm, low_score, fact:*, cache, embed_unavailable, prompt_error, llm, llm_error, llm_timeout)",
+    ("outcome",),
+)
+LLM_TOKENS = REGISTRY.counter("yp_llm_tokens_total", "Tokens processed by Ollama", ("phase",))
+SESSION_CONFLICTS = REGISTRY.counter("yp_session_conflicts_total", "Session saves rejected by version check")
+
+# plan.timings 키(ms) → stage 라벨 (토큰 수 등 시간이 아닌 값은 제외)
+_STAGE_KEYS = {
+    "embed_ms": "embed",
+    "dense_ms": "dense_search",
+    "lexical_ms": "lexical_search",
+    "fuse_ms": "fuse",
+    "prompt_ms": "prompt_build",
+    "llm_ms": "llm",
+    "ttft_ms": "llm_first_token",
+    "prompt_eval_ms": "llm_prompt_eval",
+    "eval_ms": "llm_eval",
+}
+
+
+def _record_turn(plan: AnswerPlan) -> None:
+    for key, stage in _STAGE_KEYS.items():
+        if key in plan.timings:
+            STAGE_SECONDS.observe(plan.timings[key] / 1000.0, stage=stage)
+    ANSWER_OUTCOMES.inc(outcome=plan.outcome or "unknown")
+    if "prompt_eval_tokens" in plan.timings:
+        LLM_TOKENS.inc(plan.timings["prompt_eval_tokens"], phase="prompt_eval")
+        LLM_TOKENS.inc(plan.timings.get("eval_tokens", 0), phase="eval")
+    logger.info("answer turn: %s", plan.outcome, extra={"outcome": plan.outcome, "timings_ms": {k: round(v, 2) for k, v in plan.timings.items()}})
+
+
+rag.add_timing_listener(_record_turn)
+
+
+def _stat_gauge(name: str, help: str, stats: Callable[[], Dict[str, Any]], key: str) -> None:
+    REGISTRY.gauge(name, help, lambda: float(stats().get(key) or 0.0))
+
+
+_stat_gauge("yp_sessions_live", "Live sessions in the session store", store.stats, "live_sessions")
+_stat_gauge("yp_sessions_bytes", "Approximate bytes held by the session store", store.stats, "bytes_held")
+_stat_gauge("yp_query_cache_hit_ratio", "Query embedding cache hit ratio", rag.query_cache.stats, "hit_rate")
+_stat_gauge("yp_query_cache_entries", "Query embedding cache entries", rag.query_cache.stats, "entries")
+_stat_gauge("yp_answer_cache_hit_ratio", "Answer cache hit ratio", rag.answer_cache.stats, "hit_rate")
+_stat_gauge("yp_answer_cache_entries", "Answer cache entries", rag.answer_cache.stats, "entries")
+_stat_gauge("yp_embed_batch_avg_size", "Average query embedding micro-batch size", rag.embed_batcher.stats, "avg_batch_size")
+_stat_gauge("yp_embed_sidecar_up", "1 while query embeddings go to the embed sidecar", rag.embedder_stats, "up")
+_stat_gauge("yp_embed_fallback_batches", "Query embedding batches encoded in-process because the sidecar was unavailable", rag.embedder_stats, "fallback_batches")
+REGISTRY.gauge(
+    "yp_token_counter_fallback",
+    "1 if the token encoding could not be loaded and prompt budgets use the byte estimate",
+    lambda: float(token_counter_status()["fallback"]),
+)
+REGISTRY.gauge("yp_ready", "1 once index/model are loaded and warmed up", lambda: float(boot["stage"] == "ready"))
+
+
+async def _boot() -> None:
+    """
+    인덱스/임베딩 모델 로드 → 임베딩/검색 워밍업 → Ollama 모델 preload 순서로 진행, 끝나면 ready
+    - 로드가 끝나면 요청은 받지만(/chat 503 해제), /readyz는 워밍업까지 끝나야 200
+    - 단계가 실패하면 BOOT_RETRY_SEC 뒤 그 단계부터 다시
+    """
+    t_boot = time.perf_counter()
+    timings: Dict[str, float] = boot["timings_ms"]
+    while True:
+        try:
+            if not rag.loaded:
+                boot["stage"] = "loading"
+                t0 = time.perf_counter()
+                await run_in_executor(None, rag.load)
+                timings["load"] = elapsed_ms(t0)
+                boot["token_counter"] = token_counter_status()
+            if "warm_search" not in timings:
+                boot["stage"] = "warming"
+                warm = await run_in_executor(None, rag.warm_up_local)
+                timings.update({k: round(v, 2) for k, v in warm.items()})
+            boot["stage"] = "warming_llm"
+            t0 = time.perf_counter()
+            await rag.warm_up_llm()
+            timings["warm_llm"] = elapsed_ms(t0)
+            break
+        except Exception as e:
+            boot["error"] = f"{type(e).__name__}: {e}"
+            logger.warning("boot stage %s failed; retrying in %ss", boot["stage"], BOOT_RETRY_SEC, exc_info=True)
+            await asyncio.sleep(BOOT_RETRY_SEC)
+
+    timings["total"] = elapsed_ms(t_boot)
+    boot.update(stage="ready", error=None)
+    logger.info("ready", extra={"boot_ms": timings, "generation": rag.index_generation})
+
+
+def _require_loaded() -> None:
+    if not rag.loaded:
+        raise HTTPException(status_code=503, detail="warming up", headers={"Retry-After": str(BOOT_RETRY_SEC)})
+
+
+async def _reload_index(force: bool = False) -> Dict[str, Any]:
+    # 새 세대 로드는 스레드에서 → 그동안에도 요청은 이전 세대로 계속 처리됨
+    return await run_in_executor(None, rag.reload_index, force)
+
+
+async def _watch_index() -> None:
+    while True:
+        await asyncio.sleep(INDEX_WATCH_INTERVAL_SEC)
+        if not rag.loaded:
+            continue
+        try:
+            status = await _reload_index()
+        except Exception:
+            logger.exception("index reload failed; keeping generation %s", rag.index_generation)
+            continue
+        if status["reloaded"]:
+            logger.info("index reloaded: %s -> %s", status["previous_generation"], status["generation"])
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    tasks = [asyncio.create_task(_boot())]
+    if INDEX_WATCH_INTERVAL_SEC > 0:
+        tasks.append(asyncio.create_task(_watch_index()))
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await rag.aclose()
+    _store_executor.shutdown(wait=True)
+
+
+app = FastAPI(title="Youth Policy Chatbot API", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def request_context(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """요청 ID를 contextvar에 심어 로그에 남기고, 경로별 요청 수/지연을 기록"""
+    rid = new_request_id(request.headers.get(REQUEST_ID_HEADER))
+    token = request_id_var.set(rid)
+    t0 = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers[REQUEST_ID_HEADER] = rid
+        return response
+    finally:
+        # 라우트 템플릿 기준 (세션 id 등으로 라벨이 늘어나지 않게), 없는 경로는 하나로 묶음
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        HTTP_REQUESTS.inc(path=path, status=str(status))
+        HTTP_SECONDS.observe(time.perf_counter() - t0, path=path)
+        request_id_var.reset(token)
 
-app = FastAPI(title="Youth Policy Chatbot API")
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,56 +254,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-store = InMemorySessionStore()
-rag = RAGService()
-
 
-@app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest) -> ChatResponse:
-    state = store.get_or_create(req.session_id)
+async def _start_turn(req: ChatRequest) -> tuple[SessionState, str]:
+    state = await _store_call(store.get_or_create, req.session_id)
 
     user_text = (req.message or "").strip()
     if user_text:
         state.messages.append(ChatMessage(role="user", content=user_text))
+    return state, user_text
+
+
+async def _save(state: SessionState) -> None:
+    # 같은 세션을 다른 요청이 먼저 저장함 → 이번 턴은 반영하지 않고 클라이언트가 다시 보내도록
+    try:
+        await _store_call(store.save, state)
+    except SessionConflictError as e:
+        SESSION_CONFLICTS.inc()
+        logger.warning("session save conflict", extra={"session_id": state.session_id})
+        raise HTTPException(status_code=409, detail="session was updated by another request; retry") from e
 
+
+async def _onboarding_response(state: SessionState, user_text: str) -> Optional[ChatResponse]:
     # 1) 온보딩(프로필 수집): 옵션은 여기서만 제공
-    if needs_onboarding(state):
-        if state.pending_question_id is not None and user_text:
-            accepted, err = apply_primary_answer(state, user_text)
-            if not accepted:
-                q = get_next_primary_question(state)
-                store.save(state)
-                return ChatResponse(
-                    session_id=state.session_id,
-                    mode="onboarding",
-                    answer=f"{err}\n\n{q['text']}",
-                    options=q["options"],
-                    debug_profile=state.profile.__dict__,
-                )
-
-        q = get_next_primary_question(state)
-        store.save(state)
-        return ChatResponse(
-            session_id=state.session_id,
-            mode="onboarding",
-            answer=q["text"],
-            options=q["options"],
-            debug_profile=state.profile.__dict__,
-        )
+    if not needs_onboarding(state):
+        return None
 
-    # 2) 온보딩 이후: 무조건 상담사 자연어 답변 (옵션 없음)
-    intent = detect_policy_intent(user_text)
+    if state.pending_question_id is not None and user_text:
+        accepted, err = apply_primary_answer(state, user_text)
+        if not accepted:
+            q = get_next_primary_question(state)
+            await _save(state)
+            return ChatResponse(
+                session_id=state.session_id,
+                mode="onboarding",
+                answer=f"{err}\n\n{q['text']}",
+                options=q["options"],
+                debug_profile=state.profile.__dict__,
+            )
 
-    answer_text = rag.answer(
+    q = get_next_primary_question(state)
+    await _save(state)
+    return ChatResponse(
+        session_id=state.session_id,
+        mode="onboarding",
+        answer=q["text"],
+        options=q["options"],
+        debug_profile=state.profile.__dict__,
+    )
+
+
+def _answer_kwargs(state: SessionState, user_text: str) -> Dict[str, Any]:
+    return dict(
         question=user_text,
-        intent=intent,
+        policy_match=detect_policy(user_text),  # 정책 매칭은 메시지당 여기서 한 번
         profile=state.profile.__dict__,
         followups=state.followups.__dict__,
-        history=[{"role": m.role, "content": m.content} for m in state.messages][-12:],
+        history=[{"role": m.role, "content": m.content} for m in state.messages],  # 창은 pack_history가 정함
     )
 
+
+async def _finish_turn(state: SessionState, answer_text: str) -> ChatResponse:
     state.messages.append(ChatMessage(role="assistant", content=answer_text))
-    store.save(state)
+    await _save(state)
 
     return ChatResponse(
         session_id=state.session_id,
@@ -83,3 +324,136 @@ def chat(req: ChatRequest) -> ChatResponse:
         options=None,
         debug_profile={**state.profile.__dict__, **state.followups.__dict__},
     )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest) -> ChatResponse:
+    _require_loaded()
+    state, user_text = await _start_turn(req)
+
+    onboarding = await _onboarding_response(state, user_text)
+    if onboarding is not None:
+        return onboarding
+
+    # 2) 온보딩 이후: 무조건 상담사 자연어 답변 (옵션 없음)
+    answer_text = await rag.answer(**_answer_kwargs(state, user_text))
+    return await _finish_turn(state, answer_text)
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest) -> StreamingResponse:
+    """
+    /chat과 같은 흐름을 Server-Sent Events로 내려줌
+    - event: token → {"delta": "..."} (LLM 토큰이 도착하는 대로)
+    - event: done  → ChatResponse 전체 (스트림 종료)
+    - 온보딩/정책 확정 질문처럼 LLM을 거치지 않는 응답은 done 이벤트 하나로 끝남
+    - 세션 저장 충돌(409)은 이미 응답이 시작된 뒤라 event: error → {"status", "detail"}로 알림
+    - 토큰이 나가다가 LLM이 끊기면 event: error → {"status": 502, "detail", "answer": 안내 문구}
+      (끊긴 부분 답변은 대화 기록에 넣지 않고 안내 문구를 기록)
+    """
+    _require_loaded()
+    state, user_text = await _start_turn(req)
+
+    async def turn() -> AsyncIterator[str]:
+        onboarding = await _onboarding_response(state, user_text)
+        if onboarding is not None:
+            yield _sse("done", onboarding.model_dump())
+            return
+
+        plan = await rag.plan_answer(**_answer_kwargs(state, user_text))
+        if plan.messages is None:
+            yield _sse("done", (await _finish_turn(state, rag.short_circuit_answer(plan))).model_dump())
+            return
+
+        parts = []
+        try:
+            async for piece in rag.stream_answer(plan):
+                parts.append(piece)
+                yield _sse("token", {"delta": piece})
+        except LLMStreamInterrupted:
+            await _finish_turn(state, plan.fallback)
+            yield _sse("error", {"status": 502, "detail": "llm stream interrupted", "answer": plan.fallback})
+            return
+
+        # 스트림이 끝까지 흘렀을 때만 대화 기록에 반영
+        yield _sse("done", (await _finish_turn(state, "".join(parts).strip())).model_dump())
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for ev in turn():
+                yield ev
+        except HTTPException as e:
+            yield _sse("error", {"status": e.status_code, "detail": e.detail})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _check_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest((token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="forbidden")
+
+
+@app.get("/admin/index")
+async def admin_index(x_admin_token: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    _check_admin(x_admin_token)
+    _require_loaded()
+    return rag.index_status()
+
+
+@app.post("/admin/index/reload")
+async def admin_index_reload(force: bool = False, x_admin_token: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    """
+    디스크의 현재 인덱스 세대를 백그라운드로 로드한 뒤 원자적으로 교체 (재시작 없음)
+    - 로드 실패 시 기존 세대 그대로 유지
+    """
+    _check_admin(x_admin_token)
+    _require_loaded()
+    try:
+        return await _reload_index(force)
+    except Exception as e:
+        logger.exception("index reload failed")
+        raise HTTPException(status_code=500, detail=f"reload failed: {e}") from e
+
+
+@app.get("/admin/llm")
+async def admin_llm(x_admin_token: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    # prompt_eval_share가 높으면 프롬프트 처리(캐시 미적중)가 병목
+    _check_admin(x_admin_token)
+    return rag.llm_stats.stats()
+
+
+@app.get("/healthz")
+async def healthz() -> Dict[str, Any]:
+    # liveness: 이벤트 루프가 돌고 있으면 200 (로드/워밍업 중에도)
+    return {"status": "ok", "stage": boot["stage"]}
+
+
+@app.get("/readyz")
+async def readyz(response: Response) -> Dict[str, Any]:
+    # readiness: 로드 + 워밍업(임베딩, 검색, Ollama preload)이 끝나야 200 → 그 전엔 트래픽을 보내지 않도록
+    ready = boot["stage"] == "ready"
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, **boot}
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    # Prometheus 텍스트 포맷 (스크레이프 대상)
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@app.get("/admin/sessions")
+async def admin_sessions(x_admin_token: Optional[str] = Header(default=None)) -> Dict[str, Any]:
+    _check_admin(x_admin_token)
+    return store.stats()
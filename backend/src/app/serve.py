@@ -0,0 +1,119 @@
+# backend/src/app/serve.py
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from contextlib import suppress
+from typing import Any, Dict
+
+import uvicorn
+
+# 프리포크 실행 (backend/ 에서): python -m src.app.serve --workers 4 --port 8000
+# - 부모: 앱 import + 인덱스 스냅샷 로드(mmap 인덱스/메타, BM25 배열) → 소켓 bind → 워커 fork
+# - 워커: 부모가 올려 둔 인덱스를 그대로 씀 (mmap은 OS 페이지 캐시, 나머지는 copy-on-write로 공유)
+#         임베딩 모델 로드/워밍업은 워커마다 lifespan(_boot)에서 — torch/onnxruntime 스레드풀은 fork 후 쓸 수 없음
+#         (EMBED_SIDECAR_SOCKET 을 쓰면 모델은 embed_server.py 한 곳에만 올라감)
+# - 죽은 워커는 다시 fork, SIGTERM/SIGINT는 워커에 전달하고 모두 끝날 때까지 대기
+# uvicorn --workers 는 워커마다 새 프로세스(spawn)라 인덱스를 워커 수만큼 따로 읽음
+
+RESPAWN_DELAY_SEC = 1.0  # 워커가 바로 죽는 경우(설정 오류 등) 재시작 폭주 방지
+
+# python -m 으로 실행하면 __name__이 "__main__" → 앱 로거(src.app) 아래 이름으로
+logger = logging.getLogger(f"{__package__}.serve")
+
+
+def parse_args() -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="인덱스를 미리 로드한 뒤 fork하는 멀티 워커 API 서버")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8000)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--log-level", default="info", help="uvicorn 로그 레벨")
+    return ap.parse_args()
+
+
+def _bind(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app: Any, sock: socket.socket, log_level: str) -> None:
+    # 부모의 시그널 핸들러를 되돌림 → uvicorn이 자기 핸들러(graceful shutdown)를 설치
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    uvicorn.Server(uvicorn.Config(app, log_level=log_level, lifespan="on")).run(sockets=[sock])
+
+
+def main() -> int:
+    args = parse_args()
+    from .main import SESSION_BACKEND, app, rag
+
+    if args.workers > 1 and SESSION_BACKEND == "memory":
+        logger.error("SESSION_BACKEND=memory keeps sessions per worker; use SESSION_BACKEND=sqlite with --workers > 1")
+        return 2
+
+    t0 = time.perf_counter()
+    rag.load_index()
+    logger.info(
+        "index preloaded before fork",
+        extra={"generation": rag.index_generation, "load_ms": round((time.perf_counter() - t0) * 1000, 2)},
+    )
+    sock = _bind(args.host, args.port)
+
+    children: Dict[int, int] = {}  # pid → 워커 번호
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, sock, args.log_level)
+            except BaseException:
+                logger.exception("worker %s crashed", slot)
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = slot
+
+    def stop(signum: int, _frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            with suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for slot in range(args.workers):
+        spawn(slot)
+    logger.info("serving on %s:%s with %s workers: %s", args.host, args.port, args.workers, sorted(children))
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        logger.warning("worker %s (pid %s) exited with status %s; restarting", slot, pid, status)
+        time.sleep(RESPAWN_DELAY_SEC)
+        if not stopping:
+            spawn(slot)
+
+    sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
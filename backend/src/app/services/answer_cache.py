@@ -0,0 +1,116 @@
+# backend/src/app/services/answer_cache.py
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+import numpy as np
+
+from .embedding_cache import normalize_query
+
+
+def bucket_age(age: Any) -> Any:
+    # 청년정책 요건은 보통 나이 구간 경계(19/34/39세 등)로 갈리므로 5세 단위 구간이면 충분
+    if not isinstance(age, int) or age < 0:
+        return age
+    lo = (age // 5) * 5
+    return f"{lo}~{lo + 4}세"
+
+
+@dataclass
+class _Entry:
+    key: Hashable
+    stored_at: float
+    vec: np.ndarray
+    answer: str
+
+
+class AnswerCache:
+    """
+    RAG 최종 답변 캐시
+    - 1차 키(key): (intent, 프로필 구간, 검색된 chunk_id 목록) → 같은 근거/같은 대상일 때만 후보
+      (이전 대화가 없는 턴만 캐시, 답변도 키의 프로필 구간으로만 생성 — rag_service.plan_answer)
+    - 2차 조건: 질문 임베딩 코사인 유사도 ≥ similarity_threshold (비슷한 질문 재사용)
+    - TTL 지나면 무시/삭제, 전체 건수는 max_entries로 제한(LRU)
+    - 인덱스 세대(generation)가 바뀌면 invalidate()로 전부 폐기, 다른 세대로 만든 답변은 조회/저장 안 함
+    """
+
+    def __init__(self, similarity_threshold: float, ttl_sec: float, max_entries: int):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self.generation: Optional[str] = None
+        self._entries: "OrderedDict[Tuple[Hashable, str], _Entry]" = OrderedDict()
+        self._buckets: Dict[Hashable, Set[Tuple[Hashable, str]]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _drop(self, ek: Tuple[Hashable, str]) -> None:
+        entry = self._entries.pop(ek)
+        bucket = self._buckets.get(entry.key)
+        if bucket is not None:
+            bucket.discard(ek)
+            if not bucket:
+                del self._buckets[entry.key]
+
+    def invalidate(self, generation: Optional[str] = None) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+            self.generation = generation
+
+    def lookup(self, key: Hashable, question: str, vec: np.ndarray, generation: Optional[str]) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            # 다른 세대 인덱스로 검색한 요청은 캐시를 쓰지 않음 (세대 전환은 invalidate로만)
+            if generation != self.generation:
+                self.misses += 1
+                return None
+
+            exact = (key, normalize_query(question))
+            best: Optional[Tuple[float, Tuple[Hashable, str]]] = None
+            for ek in list(self._buckets.get(key, ())):
+                entry = self._entries[ek]
+                if now - entry.stored_at > self.ttl_sec:
+                    self._drop(ek)
+                    continue
+                sim = 1.0 if ek == exact else float(np.dot(entry.vec, vec))
+                if sim >= self.similarity_threshold and (best is None or sim > best[0]):
+                    best = (sim, ek)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best[1])
+            self.hits += 1
+            return self._entries[best[1]].answer
+
+    def store(self, key: Hashable, question: str, vec: np.ndarray, answer: str, generation: Optional[str]) -> None:
+        if not answer:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+
+            ek = (key, normalize_query(question))
+            if ek in self._entries:
+                self._drop(ek)
+            self._entries[ek] = _Entry(key=key, stored_at=time.monotonic(), vec=vec, answer=answer)
+            self._buckets.setdefault(key, set()).add(ek)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "generation": self.generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
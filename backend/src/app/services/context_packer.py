@@ -0,0 +1,229 @@
+# backend/src/app/services/context_packer.py
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence
+
+import tiktoken
+
+from .lexical import tokenize
+
+logger = logging.getLogger(__name__)
+
+# 토큰 수 측정용 인코딩
+# - llama3 계열 토크나이저는 cl100k BPE에 토큰을 더한 것 → cl100k로 세면 같거나 약간 많게 나옴(예산 안전 측)
+# - tiktoken은 인코딩 파일이 캐시(TIKTOKEN_CACHE_DIR)에 없으면 내려받음 → 오프라인 호스트는 캐시에 미리 넣어 둘 것
+# - 그래도 못 불러오면 UTF-8 바이트 수로 추정 (한글은 cl100k에서 글자(3바이트)당 1~2토큰 → 바이트/2면 예산 안전 측)
+TOKEN_ENCODING = "cl100k_base"
+TOKEN_FALLBACK_BYTES_PER_TOKEN = 2
+
+# 근거 선택 (MMR)
+CTX_MIN_SCORE = 0.40          # dense 점수가 이보다 낮고 BM25에도 안 걸린 chunk는 제외
+CTX_MMR_LAMBDA = 0.7          # 1이면 관련도만, 0이면 다양성만
+CTX_DUP_SIMILARITY = 0.8      # 이미 고른 chunk와 이 이상 겹치면(자카드) 중복으로 보고 제외
+CTX_MAX_TOKENS_PER_CHUNK = 450
+CTX_MIN_TOKENS_PER_CHUNK = 80  # 남은 예산이 이보다 작으면 chunk를 잘라 넣지 않음
+
+# 대화 기록
+HISTORY_TOKEN_BUDGET = 600
+HISTORY_USER_MAX_TOKENS = 160
+HISTORY_LAST_ASSISTANT_MAX_TOKENS = 300  # 직전 답변 (후속 질문이 주로 참조)
+HISTORY_ASSISTANT_MAX_TOKENS = 120       # 그보다 이전 답변은 앞부분만 남김
+HISTORY_WINDOW_STEP = 4  # 대화 창 시작점은 이 메시지 수 단위로만 앞으로 옮김 (턴마다 밀리면 프롬프트 캐시가 깨짐)
+
+TRUNCATED_MARK = "...(생략)"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|(?<=다\.)|\n+")
+
+
+_enc_lock = threading.Lock()
+_enc: Dict[str, Any] = {"loaded": False, "encoding": None, "error": None}
+
+
+def load_encoding() -> Dict[str, Any]:
+    """
+    토큰 인코딩을 한 번만 로드 (RAGService.load()에서 호출 → 결과는 /readyz에 노출)
+    - 실패해도 예외를 올리지 않고 바이트 추정으로 전환, 다시 시도하지 않음
+    """
+    with _enc_lock:
+        if not _enc["loaded"]:
+            try:
+                _enc["encoding"] = tiktoken.get_encoding(TOKEN_ENCODING)
+            except Exception as e:
+                _enc["error"] = f"{type(e).__name__}: {e}"
+                logger.warning("token encoding %s unavailable; estimating tokens as utf-8 bytes/%s (%s)",
+                               TOKEN_ENCODING, TOKEN_FALLBACK_BYTES_PER_TOKEN, _enc["error"])
+            _enc["loaded"] = True
+    return token_counter_status()
+
+
+def use_encoding(encoding: Any) -> None:
+    """인코딩 직접 지정 (벤치: 오프라인 스텁 토크나이저) — encode(text) → 토큰 목록, name 속성"""
+    with _enc_lock:
+        _enc.update(loaded=True, encoding=encoding, error=None)
+
+
+def token_counter_status() -> Dict[str, Any]:
+    enc = _enc["encoding"]
+    return {
+        "encoding": enc.name if enc is not None else f"utf8_bytes/{TOKEN_FALLBACK_BYTES_PER_TOKEN}",
+        "fallback": _enc["loaded"] and _enc["encoding"] is None,
+        "error": _enc["error"],
+    }
+
+
+def count_tokens(text: str) -> int:
+    if not _enc["loaded"]:
+        load_encoding()
+    enc = _enc["encoding"]
+    if enc is None:
+        return -(-len((text or "").encode("utf-8")) // TOKEN_FALLBACK_BYTES_PER_TOKEN)
+    return len(enc.encode(text or ""))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    문장(줄) 단위로 앞에서부터 max_tokens까지 채움, 잘렸으면 TRUNCATED_MARK를 붙임
+    - 첫 문장부터 넘치면 글자 비율로 자름
+    """
+    text = (text or "").strip()
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    budget = max_tokens - count_tokens(TRUNCATED_MARK) - 1
+    out: List[str] = []
+    used = 0
+    for sent in (s.strip() for s in _SENTENCE_END.split(text)):
+        if not sent:
+            continue
+        t = count_tokens(sent) + 1
+        if used + t > budget:
+            if not out and budget > 0:
+                out.append(sent[:max(1, len(sent) * budget // t)])
+            break
+        out.append(sent)
+        used += t
+    return "\n".join(out + [TRUNCATED_MARK])
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n{2,}", text or "") if p.strip()]
+
+
+def _norm(p: str) -> str:
+    return re.sub(r"\s+", " ", p).strip()
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _relevance(c: Dict[str, Any]) -> float:
+    # dense 코사인이 기본, dense 후보에 없던 BM25 결과(score=0.0)는 RRF 순위를 점수처럼 사용
+    if c.get("score"):
+        return float(c["score"])
+    rrf = c.get("rrf_score")
+    return float(rrf) * 30.0 if rrf else 0.0
+
+
+def pack_contexts(ctxs: Sequence[Dict[str, Any]], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    검색 결과 → 프롬프트에 넣을 근거 목록 (token_budget 이내)
+    1) 약한 후보 제외: dense 점수 < CTX_MIN_SCORE 이고 BM25에도 안 걸린 것 (1등은 항상 남김)
+    2) MMR 순서로 선택: 관련도 - 이미 고른 chunk와의 최대 유사도(한글 2-gram 자카드), 너무 비슷하면 제외
+    3) 겹치는 구간 제거: 앞서 고른 chunk에 이미 들어간 문단은 빼고 나머지만 사용 (chunk overlap 대응)
+    4) chunk당 CTX_MAX_TOKENS_PER_CHUNK, 전체 token_budget 안에서 문장 단위로 자름
+    반환 항목은 원래 dict 복사본이며 text만 잘린/중복 제거된 본문으로 바뀜
+    """
+    if not ctxs:
+        return []
+
+    cands = [c for i, c in enumerate(ctxs) if i == 0 or c.get("score", 0.0) >= CTX_MIN_SCORE or c.get("bm25_score")]
+    sigs = [frozenset(tokenize(c.get("text") or "")) for c in cands]
+    rel = [_relevance(c) for c in cands]
+
+    order: List[int] = []
+    remaining = list(range(len(cands)))
+    while remaining:
+        best_i, best_v = None, None
+        for i in remaining:
+            sim = max((_jaccard(sigs[i], sigs[j]) for j in order), default=0.0)
+            if sim >= CTX_DUP_SIMILARITY:
+                continue
+            v = CTX_MMR_LAMBDA * rel[i] - (1.0 - CTX_MMR_LAMBDA) * sim
+            if best_v is None or v > best_v:
+                best_i, best_v = i, v
+        if best_i is None:
+            break
+        order.append(best_i)
+        remaining.remove(best_i)
+
+    seen_paras = set()
+    packed: List[Dict[str, Any]] = []
+    left = token_budget
+    for i in order:
+        c = cands[i]
+        paras = [p for p in _paragraphs(c.get("text") or "") if _norm(p) not in seen_paras]
+        if not paras:
+            continue
+
+        header_tokens = count_tokens(f"[{len(packed) + 1}] ({c.get('source')} p.{c.get('page')})\n\n\n")
+        cap = min(CTX_MAX_TOKENS_PER_CHUNK, left - header_tokens)
+        if cap < CTX_MIN_TOKENS_PER_CHUNK:
+            break
+
+        text = truncate_to_tokens("\n\n".join(paras), cap)
+        seen_paras.update(_norm(p) for p in paras)
+        left -= header_tokens + count_tokens(text)
+        packed.append({**c, "text": text})
+
+    return packed
+
+
+def pack_history(
+    history: Optional[Sequence[Dict[str, str]]],
+    max_messages: int,
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+) -> List[Dict[str, str]]:
+    """
+    대화 기록 전체 → 프롬프트용 최근 대화 메시지 (오래된 순서 유지)
+    - user 메시지는 HISTORY_USER_MAX_TOKENS, 직전 답변은 HISTORY_LAST_ASSISTANT_MAX_TOKENS,
+      그 이전 답변은 HISTORY_ASSISTANT_MAX_TOKENS로 축약
+    - 창 시작점은 HISTORY_WINDOW_STEP 단위로만 이동 (max_messages / token_budget을 넘을 때)
+      → 창이 안 옮겨지는 턴에는 이전 턴의 대화 부분이 그대로 앞부분이라 Ollama 프롬프트 캐시가 유지됨
+        (직전 답변만 다음 턴에 HISTORY_ASSISTANT_MAX_TOKENS로 줄어서 그 메시지부터 다시 평가)
+    - 창 시작점을 절대 위치로 정하므로 history는 잘라서 넘기지 말고 세션 기록 전체를 넘김
+    """
+    msgs = [m for m in (history or []) if m.get("role") in ("user", "assistant")]
+    last_assistant = max((i for i, m in enumerate(msgs) if m["role"] == "assistant"), default=-1)
+    step = max(1, min(HISTORY_WINDOW_STEP, max_messages))
+    start = -(-max(0, len(msgs) - max_messages) // step) * step
+
+    window: List[Dict[str, str]] = []
+    costs: List[int] = []
+    for i in range(start, len(msgs)):
+        m = msgs[i]
+        content = m.get("content") or ""
+        if m["role"] == "user":
+            content = truncate_to_tokens(content, HISTORY_USER_MAX_TOKENS)
+        elif i == last_assistant:
+            content = truncate_to_tokens(content, HISTORY_LAST_ASSISTANT_MAX_TOKENS)
+        else:
+            content = truncate_to_tokens(content, HISTORY_ASSISTANT_MAX_TOKENS)
+        window.append({"role": m["role"], "content": content})
+        costs.append(count_tokens(content) + 4)
+
+    # 예산을 넘으면 앞에서부터 step개씩 버림
+    skip = 0
+    while skip < len(window) and sum(costs[skip:]) > token_budget:
+        skip += step
+    out = window[skip:]
+
+    # 대화 기록이 assistant 답변으로 시작하지 않도록 (질문 없이 답만 남는 경우)
+    while out and out[0]["role"] == "assistant":
+        out.pop(0)
+    return out
@@ -0,0 +1,115 @@
+# backend/src/app/services/embed_batcher.py
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+EncodeFn = Callable[[List[str]], np.ndarray]
+
+
+class EmbeddingBatcher:
+    """
+    동시에 들어온 쿼리 임베딩 요청을 모아서 한 번에 encode하는 마이크로 배처
+    - 첫 요청이 도착하면 최대 max_wait_ms 동안(또는 max_batch_size가 찰 때까지) 더 모음
+    - 모델이 배치를 처리하는 동안 도착한 요청은 자연스럽게 다음 배치로 묶임
+    - 호출 측(검색 스레드풀)에는 단건 encode와 똑같이 보임: encode(text) → 1차원 float32 벡터
+    - 배치 스레드는 첫 encode 때 시작 (fork 전에 만들어진 배처도 자식 프로세스에서 그대로 동작)
+    """
+
+    def __init__(self, encode_fn: EncodeFn, max_batch_size: int, max_wait_ms: float):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_sec = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[Optional[Tuple[str, Future]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self._worker: Optional[threading.Thread] = None
+
+    def _ensure_worker(self) -> None:
+        # fork된 자식에서는 부모의 스레드가 없으므로 is_alive() False → 새로 시작
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embed-batcher", daemon=True)
+                self._worker.start()
+
+    def encode(self, text: str) -> np.ndarray:
+        self._ensure_worker()
+        fut: Future = Future()
+        self._queue.put((text, fut))
+        return fut.result()
+
+    def encode_many(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        여러 건을 한꺼번에 큐에 넣고 모두 기다림
+        - 임베딩 사이드카: API 워커 하나가 보낸 배치가 다른 워커들의 요청과 같은 배치로 합쳐짐
+        """
+        self._ensure_worker()
+        futs: List[Future] = []
+        for text in texts:
+            fut: Future = Future()
+            self._queue.put((text, fut))
+            futs.append(fut)
+        return [fut.result() for fut in futs]
+
+    def close(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            return
+        self._queue.put(None)
+        self._worker.join(timeout=5)
+
+    def _collect(self, first: Tuple[str, Future]) -> Tuple[List[Tuple[str, Future]], bool]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait_sec
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            first = self._queue.get()
+            if first is None:
+                break
+            batch, stop = self._collect(first)
+
+            # 같은 배치 안의 동일 쿼리는 한 번만 encode
+            texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                vecs = np.asarray(self._encode_fn(texts), dtype="float32")
+            except Exception as e:
+                for _, fut in batch:
+                    fut.set_exception(e)
+                continue
+
+            row = {text: i for i, text in enumerate(texts)}
+            for text, fut in batch:
+                fut.set_result(vecs[row[text]])
+
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": (self.items / self.batches) if self.batches else 0.0,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_sec * 1000.0,
+            }
@@ -0,0 +1,221 @@
+# backend/src/app/services/embed_sidecar.py
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 임베딩 사이드카 (src/app/embed_server.py) 프로토콜 + 클라이언트
+# - 모델은 사이드카 프로세스 하나만 들고 있고, API 워커들은 Unix 소켓으로 질문 텍스트를 보냄
+# - 프레임: 4바이트 길이(big-endian) + 본문
+#   요청  : JSON {"op": "info"} | {"op": "encode", "texts": [...]}
+#   응답  : JSON 헤더 {"ok", "rows", "dim", "model" | "error"} (+ encode면 float32 행렬 원본 바이트 한 프레임)
+# - 벡터 프레임은 미리 잡아 둔 ndarray 버퍼로 바로 recv_into (중간 bytes 복사/역직렬화 없음)
+# - 사이드카가 없거나 응답이 없으면 프로세스 안 임베더(fallback)로 encode, SIDECAR_RETRY_SEC 뒤 다시 시도
+#   fallback 모델은 처음 실패했을 때 별도 스레드에서 로드 → 로드 중에는 EmbedderUnavailable로 바로 실패
+#   (배치 스레드가 모델 로드 동안 멈추면 대기 중인 질문이 전부 같이 밀림)
+
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+SIDECAR_RETRY_SEC = 5.0
+
+
+class SidecarError(RuntimeError):
+    """사이드카 연결 실패 / 프로토콜 오류 / 사이드카 쪽 encode 오류"""
+
+
+class EmbedderUnavailable(RuntimeError):
+    """사이드카는 안 되고 fallback 임베더는 아직 로드 중 (호출 측이 안내 문구로 처리)"""
+
+
+def _recv_exact(sock: socket.socket, buf: Union[bytearray, memoryview]) -> None:
+    view = memoryview(buf)
+    while len(view):
+        n = sock.recv_into(view)
+        if n == 0:
+            raise SidecarError("connection closed")
+        view = view[n:]
+
+
+def recv_frame_size(sock: socket.socket) -> int:
+    head = bytearray(FRAME_HEADER.size)
+    _recv_exact(sock, head)
+    (size,) = FRAME_HEADER.unpack(head)
+    if size > MAX_FRAME_BYTES:
+        raise SidecarError(f"frame too large: {size}")
+    return size
+
+
+def recv_frame(sock: socket.socket) -> bytearray:
+    buf = bytearray(recv_frame_size(sock))
+    _recv_exact(sock, buf)
+    return buf
+
+
+def send_frame(sock: socket.socket, payload: Union[bytes, memoryview]) -> None:
+    sock.sendall(FRAME_HEADER.pack(len(payload)))
+    sock.sendall(payload)
+
+
+def send_json(sock: socket.socket, obj: Dict[str, Any]) -> None:
+    send_frame(sock, json.dumps(obj, ensure_ascii=False).encode("utf-8"))
+
+
+def recv_json(sock: socket.socket) -> Dict[str, Any]:
+    return json.loads(recv_frame(sock).decode("utf-8"))
+
+
+class SidecarEmbedder:
+    """
+    사이드카에 질문 임베딩을 맡기는 임베더 (SentenceTransformer.encode와 같은 모양으로 호출)
+    - 연결은 스레드마다 하나, fork로 넘어온 부모 연결은 쓰지 않음 (serve.py 프리포크 워커)
+    - 사이드카 모델 이름이 인덱스 모델과 다르면 쓰지 않음 (다른 벡터 공간)
+    - fallback은 사이드카를 못 쓸 때 처음 한 번만, 별도 스레드에서 로드 (로드 실패면 다음 실패 때 다시)
+    - up은 사이드카 왕복이 실제로 성공한 뒤에만 True
+    """
+
+    def __init__(
+        self,
+        socket_path: Path,
+        model_name: str,
+        fallback: Callable[[], Any],
+        timeout_sec: float = 10.0,
+    ):
+        self.socket_path = Path(socket_path)
+        self.model_name = model_name
+        self.timeout_sec = timeout_sec
+        self._load_fallback = fallback
+        self._fallback: Any = None
+        self._fallback_loader: Optional[threading.Thread] = None
+        self._up = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self.dim: Optional[int] = None
+        self.remote_batches = 0
+        self.fallback_batches = 0
+        self.errors = 0
+
+    def _connect(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None and self._local.pid == os.getpid():
+            return sock
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout_sec)
+        try:
+            sock.connect(str(self.socket_path))
+            send_json(sock, {"op": "info"})
+            info = recv_json(sock)
+        except BaseException:
+            sock.close()
+            raise
+        if info.get("model") != self.model_name:
+            sock.close()
+            raise SidecarError(f"sidecar model {info.get('model')!r} != index model {self.model_name!r}")
+        self.dim = int(info["dim"])
+        self._local.sock = sock
+        self._local.pid = os.getpid()
+        return sock
+
+    def _drop(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None and self._local.pid == os.getpid():
+            sock.close()
+
+    def _remote(self, texts: List[str]) -> np.ndarray:
+        sock = self._connect()
+        send_json(sock, {"op": "encode", "texts": texts})
+        head = recv_json(sock)
+        if not head.get("ok"):
+            raise SidecarError(head.get("error") or "sidecar encode failed")
+        rows, dim = int(head["rows"]), int(head["dim"])
+        out = np.empty((rows, dim), dtype="float32")
+        size = recv_frame_size(sock)
+        if size != out.nbytes:
+            raise SidecarError(f"vector frame size {size} != {out.nbytes}")
+        _recv_exact(sock, memoryview(out).cast("B"))
+        return out
+
+    def _load_fallback_in_background(self) -> None:
+        try:
+            embedder = self._load_fallback()
+        except Exception:
+            logger.exception("in-process embedder load failed")
+            return
+        with self._lock:
+            self._fallback = embedder
+        logger.info("in-process embedder loaded")
+
+    def _fallback_embedder(self) -> Any:
+        if self._fallback is not None:
+            return self._fallback
+        with self._lock:
+            # fork된 자식에는 부모의 로더 스레드가 없으므로 is_alive() False → 새로 시작
+            if self._fallback is None and (self._fallback_loader is None or not self._fallback_loader.is_alive()):
+                logger.warning("embed sidecar unavailable; loading in-process embedder")
+                self._fallback_loader = threading.Thread(
+                    target=self._load_fallback_in_background, name="embed-fallback-load", daemon=True
+                )
+                self._fallback_loader.start()
+        if self._fallback is None:
+            raise EmbedderUnavailable("embed sidecar down and in-process embedder still loading")
+        return self._fallback
+
+    def encode(
+        self,
+        texts: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **_: object,
+    ) -> np.ndarray:
+        # 사이드카는 항상 L2 정규화된 벡터를 돌려줌 (RAGService 계약)
+        single = isinstance(texts, str)
+        items: List[str] = [texts] if single else list(texts)
+
+        if time.monotonic() >= self._down_until:
+            try:
+                out = self._remote(items)
+                with self._lock:
+                    self.remote_batches += 1
+                    self._up = True
+                return out[0] if single else out
+            except (OSError, SidecarError, ValueError) as e:
+                self._drop()
+                with self._lock:
+                    self.errors += 1
+                    self._up = False
+                    self._down_until = time.monotonic() + SIDECAR_RETRY_SEC
+                logger.warning("embed sidecar failed (%s); falling back for %ss", e, SIDECAR_RETRY_SEC)
+
+        out = self._fallback_embedder().encode(items, batch_size=batch_size, normalize_embeddings=True)
+        with self._lock:
+            self.fallback_batches += 1
+        return out[0] if single else out
+
+    def get_sentence_embedding_dimension(self) -> Optional[int]:
+        if self.dim is None and self._fallback is not None:
+            return self._fallback.get_sentence_embedding_dimension()
+        return self.dim
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "socket": str(self.socket_path),
+                "up": self._up,
+                "remote_batches": self.remote_batches,
+                "fallback_batches": self.fallback_batches,
+                "fallback_loaded": self._fallback is not None,
+                "errors": self.errors,
+            }
+
@@ -0,0 +1,137 @@
+# backend/src/app/services/embedders.py
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 질문 임베딩 백엔드
+# - torch: sentence-transformers(fp32 PyTorch) — 인덱스를 만든 것과 같은 모델
+# - onnx : scripts/export_onnx_embedder.py 로 내보낸 int8 동적 양자화 ONNX (onnxruntime, CPU)
+#          torch를 import하지 않으므로 워커당 메모리가 크게 줄어듦
+#          같은 폴더의 parity.json(인덱스 벡터 대비 일치도 검사)이 통과된 모델만 로드
+EMBED_BACKENDS = ("torch", "onnx")
+
+ONNX_MODEL_NAME = "model.onnx"
+ONNX_CONFIG_NAME = "embedder.json"   # {model, max_length, doc_max_length, dim, quantized, pad_token}
+PARITY_REPORT_NAME = "parity.json"   # {passed, model_sha256, cos_mean, topk_overlap, ...}
+
+
+class EmbedderNotReady(RuntimeError):
+    """ONNX 모델이 없거나 parity 검사를 통과하지 않음"""
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with Path(path).open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def read_parity_report(model_dir: Path) -> Optional[Dict[str, Any]]:
+    p = Path(model_dir) / PARITY_REPORT_NAME
+    if not p.exists():
+        return None
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+class OnnxEmbedder:
+    """
+    CLS 풀링 + L2 정규화까지 그래프에 들어 있는 ONNX 모델 실행기
+    - encode()는 SentenceTransformer.encode와 같은 모양으로 호출 가능 (RAGService/배처 코드 그대로 사용)
+    """
+
+    def __init__(self, model_dir: Path, threads: int = 0, max_length: Optional[int] = None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_dir = Path(model_dir)
+        cfg = json.loads((self.model_dir / ONNX_CONFIG_NAME).read_text(encoding="utf-8"))
+        self.model_name: str = cfg["model"]
+        # 질문용은 짧게 자름, parity 검사(문서 본문)는 인덱스를 만들 때와 같은 길이(doc_max_length)로 호출
+        self.max_length = int(max_length or cfg.get("max_length", 512))
+        self.dim = int(cfg["dim"])
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(self.max_length)
+        pad_token = cfg.get("pad_token", "<pad>")
+        self.tokenizer.enable_padding(pad_id=self.tokenizer.token_to_id(pad_token), pad_token=pad_token)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads > 0:
+            opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            str(self.model_dir / ONNX_MODEL_NAME), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self._output = self.session.get_outputs()[0].name
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(
+        self,
+        texts: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = True,
+        **_: object,
+    ) -> np.ndarray:
+        single = isinstance(texts, str)
+        items: List[str] = [texts] if single else list(texts)
+        parts = []
+        for start in range(0, len(items), max(1, batch_size)):
+            enc = self.tokenizer.encode_batch(items[start:start + batch_size])
+            feeds = {
+                "input_ids": np.asarray([e.ids for e in enc], dtype="int64"),
+                "attention_mask": np.asarray([e.attention_mask for e in enc], dtype="int64"),
+            }
+            parts.append(self.session.run([self._output], feeds)[0].astype("float32"))
+        out = np.concatenate(parts) if parts else np.zeros((0, self.dim), dtype="float32")
+        if normalize_embeddings and len(out):
+            out /= np.maximum(np.linalg.norm(out, axis=1, keepdims=True), 1e-12)
+        return out[0] if single else out
+
+
+def load_onnx_embedder(model_dir: Path, expected_model: str, threads: int = 0) -> OnnxEmbedder:
+    """
+    parity.json이 통과(passed)이고, 검사한 모델 파일과 지금 파일이 같을 때만 로드
+    """
+    model_dir = Path(model_dir)
+    model_path = model_dir / ONNX_MODEL_NAME
+    if not model_path.exists():
+        raise EmbedderNotReady(f"missing: {model_path} (scripts/export_onnx_embedder.py 로 생성)")
+
+    report = read_parity_report(model_dir)
+    if report is None:
+        raise EmbedderNotReady(f"missing parity report: {model_dir / PARITY_REPORT_NAME}")
+    if not report.get("passed"):
+        raise EmbedderNotReady(f"parity check failed: {model_dir / PARITY_REPORT_NAME}")
+    if report.get("model_sha256") != file_sha256(model_path):
+        raise EmbedderNotReady(f"parity report is for a different model file: {model_path}")
+
+    embedder = OnnxEmbedder(model_dir, threads=threads)
+    if embedder.model_name != expected_model:
+        raise EmbedderNotReady(f"onnx model {embedder.model_name!r} != index model {expected_model!r}")
+    logger.info(
+        "onnx query embedder loaded: %s (cos_mean=%s, topk_overlap=%s)",
+        model_dir, report.get("cos_mean"), report.get("topk_overlap"),
+    )
+    return embedder
+
+
+def load_query_embedder(backend: str, model_name: str, onnx_dir: Path, onnx_threads: int = 0) -> Any:
+    """backend에 맞는 질문 임베더 (encode(texts, batch_size=, normalize_embeddings=) 계약)"""
+    assert backend in EMBED_BACKENDS, f"unknown embed backend: {backend} (expected one of {EMBED_BACKENDS})"
+    if backend == "onnx":
+        return load_onnx_embedder(onnx_dir, model_name, threads=onnx_threads)
+
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
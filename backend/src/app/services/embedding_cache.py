@@ -0,0 +1,92 @@
+# backend/src/app/services/embedding_cache.py
+from __future__ import annotations
+
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_query(text: str) -> str:
+    # 같은 질문의 공백/유니코드 표기 차이는 같은 키로 취급
+    t = unicodedata.normalize("NFKC", text or "")
+    return _WS.sub(" ", t).strip()
+
+
+class QueryEmbeddingCache:
+    """
+    검색 쿼리 → float32 임베딩 벡터 캐시 (LRU + TTL)
+    - 키: normalize_query() 결과
+    - 메모리 상한(max_bytes)은 벡터 + 키 바이트 기준, 넘치면 오래 안 쓴 것부터 제거
+    - 여러 스레드(검색 스레드풀)에서 동시에 호출되므로 lock으로 보호
+    """
+
+    def __init__(self, max_bytes: int, ttl_sec: float):
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self._items: "OrderedDict[str, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _cost(key: str, vec: np.ndarray) -> int:
+        return vec.nbytes + len(key.encode("utf-8"))
+
+    def _drop(self, key: str) -> None:
+        _, vec = self._items.pop(key)
+        self._bytes -= self._cost(key, vec)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            stored_at, vec = item
+            if now - stored_at > self.ttl_sec:
+                self._drop(key)
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return vec
+
+    def put(self, key: str, vec: np.ndarray) -> None:
+        vec = np.ascontiguousarray(vec, dtype="float32").reshape(-1)
+        vec.setflags(write=False)  # 공유 벡터라 호출 측에서 실수로 수정하지 않도록
+        cost = self._cost(key, vec)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._drop(key)
+            self._items[key] = (time.monotonic(), vec)
+            self._bytes += cost
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._items)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / total) if total else 0.0,
+            }
@@ -0,0 +1,135 @@
+# backend/src/app/services/extractive.py
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .lexical import tokenize
+
+# LLM 없이 문서 문장을 그대로 인용해 답하는 경로 (추출형 답변)
+EXTRACTIVE_MAX_SENTENCES = 3
+EXTRACTIVE_MAX_SENTENCE_CHARS = 160
+
+
+@dataclass(frozen=True)
+class FactRule:
+    """
+    단순 사실 질문 규칙
+    - question: 질문에 이 패턴이 있으면 해당 유형
+    - sentence: 근거 문장에 이 패턴이 있어야 인용 후보
+    """
+    name: str
+    label: str
+    question: re.Pattern
+    sentence: re.Pattern
+
+
+FACT_RULES: List[FactRule] = [
+    FactRule(
+        name="amount",
+        label="지원 금액",
+        question=re.compile(r"얼마|금액|액수|몇\s*만\s*원|지급액|지원액"),
+        sentence=re.compile(r"\d[\d,]*\s*(?:만\s*원|천\s*원|억\s*원|원)"),
+    ),
+    FactRule(
+        name="deadline",
+        label="신청 기간/기한",
+        question=re.compile(r"언제까지|기한|마감|신청\s*기간|접수\s*기간|언제\s*신청"),
+        sentence=re.compile(r"\d{4}\s*[.년]\s*\d{1,2}\s*[.월]|\d{1,2}\s*월\s*\d{1,2}\s*일|\d+\s*(?:개월|일)\s*이내|까지"),
+    ),
+    FactRule(
+        name="age",
+        label="연령 요건",
+        question=re.compile(r"나이|몇\s*살|연령|만\s*\d+\s*세"),
+        sentence=re.compile(r"만?\s*\d{2}\s*세"),
+    ),
+]
+
+# PDF 추출 본문은 문장부호가 드물어서 글머리 기호(○, ※, ☞, √, ❶ …)와 " - "도 문장 경계로 봄
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|(?<=다\.)|\n+|\s+(?=[○■□※☞√❶-❿①-⑳]|-\s)")
+
+
+def match_fact_rule(question: str, rules: Sequence[FactRule] = FACT_RULES) -> Optional[FactRule]:
+    q = question or ""
+    for rule in rules:
+        if rule.question.search(q):
+            return rule
+    return None
+
+
+def _sentences(text: str) -> List[str]:
+    out = []
+    for s in _SENTENCE_SPLIT.split(text or ""):
+        s = re.sub(r"\s+", " ", s).strip()
+        if len(s) >= 8:
+            out.append(s)
+    return out
+
+
+def _clip(sent: str, rule: Optional[FactRule]) -> str:
+    # 너무 긴 문장은 규칙에 맞는 부분(금액/날짜/나이) 주변만 남김
+    limit = EXTRACTIVE_MAX_SENTENCE_CHARS
+    if len(sent) <= limit:
+        return sent
+    m = rule.sentence.search(sent) if rule is not None else None
+    start = 0 if m is None else max(0, min(m.start() - limit // 2, len(sent) - limit))
+    return ("…" if start else "") + sent[start:start + limit] + ("…" if start + limit < len(sent) else "")
+
+
+def highlight_sentences(
+    question: str,
+    ctxs: Sequence[Dict[str, Any]],
+    rule: Optional[FactRule] = None,
+    max_sentences: int = EXTRACTIVE_MAX_SENTENCES,
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    상위 chunk에서 질문과 가장 많이 겹치는(한글 2-gram) 문장 고르기
+    - 점수 = 겹치는 토큰 수 / sqrt(문장 토큰 수) → 긴 문장이 겹침 수만으로 이기지 않도록
+    - rule이 있으면 rule.sentence에 맞는 문장만 후보
+    - 동점이면 검색 순위가 높은 chunk, 문서 앞쪽 문장 우선
+    """
+    q_terms = set(tokenize(question))
+    scored: List[Tuple[float, int, int, str, Dict[str, Any]]] = []
+    for rank, c in enumerate(ctxs):
+        for pos, sent in enumerate(_sentences(c.get("text") or "")):
+            if rule is not None and not rule.sentence.search(sent):
+                continue
+            terms = tokenize(sent)
+            overlap = len(q_terms & set(terms))
+            if overlap == 0:
+                continue
+            scored.append((-overlap / math.sqrt(len(terms)), rank, pos, _clip(sent, rule), c))
+
+    scored.sort(key=lambda x: x[:3])
+    picked: List[Tuple[str, Dict[str, Any]]] = []
+    seen = set()
+    for _, _, _, sent, c in scored:
+        if sent in seen:
+            continue
+        seen.add(sent)
+        picked.append((sent, c))
+        if len(picked) >= max_sentences:
+            break
+    return picked
+
+
+def _quote_lines(picked: Sequence[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    return [f"- 「{sent}」 ({c.get('source')} p.{c.get('page')})" for sent, c in picked]
+
+
+def fact_answer(rule: FactRule, picked: Sequence[Tuple[str, Dict[str, Any]]]) -> str:
+    lines = [f"문서에서 {rule.label} 관련 내용을 그대로 옮겨 드릴게요.", ""]
+    lines.extend(_quote_lines(picked))
+    lines.append("")
+    lines.append("세부 조건(대상/예외)에 따라 달라질 수 있으니, 본인 상황을 알려주시면 해당 여부를 함께 확인해 드릴게요.")
+    return "\n".join(lines)
+
+
+def low_score_answer(fallback: str, picked: Sequence[Tuple[str, Dict[str, Any]]]) -> str:
+    if not picked:
+        return fallback
+    lines = [fallback, "", "참고로 가장 가까운 문서 내용은 아래와 같아요. (질문과 직접 관련이 없을 수 있어요)"]
+    lines.extend(_quote_lines(picked))
+    return "\n".join(lines)
@@ -2,22 +2,19 @@
 from __future__ import annotations
 
 from typing import Optional
-from .session_store import SessionState
-
 
-def detect_policy_intent(user_text: str) -> Optional[str]:
-    t = (user_text or "").strip().lower()
-    if not t:
-        return None
+from .policy_catalog import PolicyMatch, get_policy_catalog
+from .session_store import SessionState
 
-    # 도약장려금 계열 키워드 (반쪽 키워드 포함)
-    if any(k in t for k in ["도약", "도약장려금", "일자리도약", "청년일자리도약", "일자리 장려금", "청년 장려금", "장려금"]):
-        return "job_jump"
 
-    if any(k in t for k in ["국민취업", "국취", "취업지원제도", "취업지원"]):
-        return "kua"
+def detect_policy(user_text: str) -> PolicyMatch:
+    """
+    정책명/별칭/반쪽 키워드/일반어를 한 번에 매칭 (data/policy_catalog.json)
+    - 결과를 그대로 RAGService.plan_answer(policy_match=)에 넘김 → 메시지당 매칭 한 번
+    """
+    return get_policy_catalog().match(user_text)
 
-    if any(k in t for k in ["희망두배", "희망 두배", "청년통장", "자산형성", "통장"]):
-        return "hope_account"
 
-    return None
+def detect_policy_intent(user_text: str) -> Optional[str]:
+    # 여러 정책에 걸리면 카탈로그 앞쪽 정책
+    return detect_policy(user_text).intent
@@ -0,0 +1,114 @@
+# backend/src/app/services/index_files.py
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# 인덱스 "세대(generation)" 관리
+# - 빌드 결과는 세대별 파일(faiss-<gen>.index / meta-<gen>.bin / state-<gen>.json / bm25-<gen>.npz)로 저장
+#   flat 인덱스는 mmap 검색용 vectors-<gen>.npy도 같이 (mmap_index.py)
+# - BM25 역색인도 같은 chunk 집합으로 세대마다 다시 만듦 → dense/BM25/메타가 항상 같은 세대
+# - index.json(포인터)이 현재 세대를 가리키고, 포인터 교체(os.replace)가 곧 원자적 전환
+# - 포인터가 없으면 구버전 고정 경로(faiss.index + meta.bin/meta.json + bm25.npz) 사용
+POINTER_NAME = "index.json"
+
+
+@dataclass
+class IndexFiles:
+    generation: str
+    index_path: Path
+    meta_path: Path
+    state_path: Optional[Path] = None
+    vectors_path: Optional[Path] = None
+    lexical_path: Optional[Path] = None  # 없으면 dense 검색만
+
+
+def new_generation() -> str:
+    return time.strftime("%Y%m%d-%H%M%S") + "-" + uuid.uuid4().hex[:6]
+
+
+def generation_file_names(generation: str) -> Dict[str, str]:
+    return {
+        "index": f"faiss-{generation}.index",
+        "meta": f"meta-{generation}.bin",
+        "state": f"state-{generation}.json",
+        "vectors": f"vectors-{generation}.npy",
+        "bm25": f"bm25-{generation}.npz",
+    }
+
+
+def _fingerprint(*paths: Path) -> str:
+    parts = []
+    for p in paths:
+        st = p.stat()
+        parts.append(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+    return "_".join(parts)
+
+
+def read_pointer(data_dir: Path) -> Optional[Dict[str, Any]]:
+    p = Path(data_dir) / POINTER_NAME
+    if not p.exists():
+        return None
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def resolve_index_files(
+    data_dir: Path,
+    legacy_index: Path,
+    legacy_meta: Path,
+    legacy_meta_json: Path,
+    legacy_lexical: Optional[Path] = None,
+) -> IndexFiles:
+    data_dir = Path(data_dir)
+    ptr = read_pointer(data_dir)
+    if ptr is not None:
+        return IndexFiles(
+            generation=ptr["generation"],
+            index_path=data_dir / ptr["index"],
+            meta_path=data_dir / ptr["meta"],
+            state_path=(data_dir / ptr["state"]) if ptr.get("state") else None,
+            vectors_path=(data_dir / ptr["vectors"]) if ptr.get("vectors") else None,
+            lexical_path=(data_dir / ptr["bm25"]) if ptr.get("bm25") else None,
+        )
+
+    meta = legacy_meta if legacy_meta.exists() else legacy_meta_json
+    assert legacy_index.exists(), f"missing: {legacy_index}"
+    assert meta.exists(), f"missing: {legacy_meta}"
+    # bm25.npz만 바뀌어도 세대가 달라지도록 지문에 포함
+    lexical = legacy_lexical if legacy_lexical is not None and legacy_lexical.exists() else None
+    paths = (legacy_index, meta) + ((lexical,) if lexical is not None else ())
+    return IndexFiles(generation=_fingerprint(*paths), index_path=legacy_index, meta_path=meta, lexical_path=lexical)
+
+
+def publish_generation(data_dir: Path, generation: str) -> None:
+    """
+    이미 저장된 세대 파일들을 현재 세대로 전환
+    - 포인터는 임시 파일에 쓴 뒤 os.replace → 읽는 쪽은 이전/새 세대 중 하나만 봄
+    - 직전 세대는 남겨둠(전환 중 읽고 있던 프로세스용), 그보다 오래된 세대 파일은 삭제
+    """
+    data_dir = Path(data_dir)
+    prev = read_pointer(data_dir)
+    # 이번 세대에 실제로 쓴 파일만 포인터에 (vectors는 flat일 때만 있음)
+    names = {k: v for k, v in generation_file_names(generation).items() if (data_dir / v).exists()}
+    ptr = {
+        "generation": generation,
+        **names,
+        "previous": prev["generation"] if prev else None,
+        "published_at": time.time(),
+    }
+
+    tmp = data_dir / (POINTER_NAME + ".tmp")
+    tmp.write_text(json.dumps(ptr, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, data_dir / POINTER_NAME)
+
+    keep = {generation, prev["generation"] if prev else None}
+    for pattern in ("faiss-*.index", "meta-*.bin", "state-*.json", "vectors-*.npy", "bm25-*.npz"):
+        for p in data_dir.glob(pattern):
+            gen = p.name.split("-", 1)[1].rsplit(".", 1)[0]
+            if gen not in keep:
+                p.unlink(missing_ok=True)
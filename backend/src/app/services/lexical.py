@@ -0,0 +1,163 @@
+# backend/src/app/services/lexical.py
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# BM25 파라미터 (일반적인 기본값)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# 숫자+단위는 한 토큰으로 ("5인", "6개월", "3호", "200만원" …) — 정책 요건 검색의 핵심
+_NUM_UNIT = re.compile(r"\d+(?:[.,]\d+)*\s*(?:개월|만원|천원|억원|시간|인|세|원|년|월|일|주|호|회|명|%)?")
+_HANGUL = re.compile(r"[가-힣]+")
+_LATIN = re.compile(r"[a-z]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    한국어용 경량 토크나이저 (형태소 분석기 없이)
+    - 한글: 어절 내 문자 2-gram (+ 1글자 어절은 그대로) → 조사/어미가 붙어도 어간이 매칭됨
+    - 숫자: 단위까지 붙여 한 토큰 (공백 제거)
+    - 영문: 소문자 단어
+    """
+    t = unicodedata.normalize("NFKC", text or "").lower()
+    tokens: List[str] = []
+
+    for m in _NUM_UNIT.finditer(t):
+        tokens.append(re.sub(r"\s+", "", m.group()))
+
+    for m in _HANGUL.finditer(t):
+        w = m.group()
+        if len(w) == 1:
+            tokens.append(w)
+            continue
+        tokens.extend(w[i:i + 2] for i in range(len(w) - 1))
+
+    tokens.extend(m.group() for m in _LATIN.finditer(t))
+    return tokens
+
+
+class BM25Index:
+    """
+    chunk_id 단위 BM25 역색인
+    - 포스팅은 용어별로 이어붙인 배열(doc 번호/tf) + 오프셋 → npz 하나로 저장/로드
+    - chunk_id로 결과를 돌려주므로 FAISS 벡터 id와 무관하게 재사용 가능
+    """
+
+    def __init__(
+        self,
+        chunk_ids: Sequence[str],
+        terms: Sequence[str],
+        offsets: np.ndarray,
+        postings_doc: np.ndarray,
+        postings_tf: np.ndarray,
+        doc_len: np.ndarray,
+    ):
+        self.chunk_ids = list(chunk_ids)
+        self._term_idx: Dict[str, int] = {t: i for i, t in enumerate(terms)}
+        self._offsets = offsets
+        self._doc = postings_doc
+        self._tf = postings_tf
+        self._doc_len = doc_len.astype("float32")
+        self._avgdl = float(self._doc_len.mean()) if len(self._doc_len) else 0.0
+
+        n = len(self.chunk_ids)
+        df = np.diff(self._offsets).astype("float64")
+        self._idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5)).astype("float32")
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[str, str]]) -> "BM25Index":
+        chunk_ids: List[str] = []
+        doc_len: List[int] = []
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for d, (chunk_id, text) in enumerate(docs):
+            toks = tokenize(text)
+            chunk_ids.append(chunk_id)
+            doc_len.append(len(toks))
+            for term, tf in Counter(toks).items():
+                postings.setdefault(term, []).append((d, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype="int64")
+        for i, term in enumerate(terms):
+            offsets[i + 1] = offsets[i] + len(postings[term])
+        p_doc = np.empty(int(offsets[-1]), dtype="int32")
+        p_tf = np.empty(int(offsets[-1]), dtype="float32")
+        for i, term in enumerate(terms):
+            plist = postings[term]
+            p_doc[offsets[i]:offsets[i + 1]] = [d for d, _ in plist]
+            p_tf[offsets[i]:offsets[i + 1]] = [tf for _, tf in plist]
+
+        return cls(chunk_ids, terms, offsets, p_doc, p_tf, np.asarray(doc_len, dtype="int32"))
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        terms = sorted(self._term_idx, key=self._term_idx.__getitem__)
+        with tmp.open("wb") as f:
+            np.savez(
+                f,
+                chunk_ids=np.frombuffer(json.dumps(self.chunk_ids, ensure_ascii=False).encode("utf-8"), dtype="uint8"),
+                terms=np.frombuffer(json.dumps(terms, ensure_ascii=False).encode("utf-8"), dtype="uint8"),
+                offsets=self._offsets,
+                postings_doc=self._doc,
+                postings_tf=self._tf,
+                doc_len=self._doc_len.astype("int32"),
+            )
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with np.load(Path(path), allow_pickle=False) as z:
+            return cls(
+                chunk_ids=json.loads(z["chunk_ids"].tobytes().decode("utf-8")),
+                terms=json.loads(z["terms"].tobytes().decode("utf-8")),
+                offsets=z["offsets"],
+                postings_doc=z["postings_doc"],
+                postings_tf=z["postings_tf"],
+                doc_len=z["doc_len"],
+            )
+
+    def search(self, query: str, top_k: int) -> List[Tuple[str, float]]:
+        n = len(self.chunk_ids)
+        if n == 0 or top_k <= 0:
+            return []
+
+        scores = np.zeros(n, dtype="float32")
+        norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self._doc_len / (self._avgdl or 1.0))
+        for term in set(tokenize(query)):
+            ti = self._term_idx.get(term)
+            if ti is None:
+                continue
+            s, e = int(self._offsets[ti]), int(self._offsets[ti + 1])
+            docs = self._doc[s:e]
+            tf = self._tf[s:e]
+            scores[docs] += self._idf[ti] * tf * (BM25_K1 + 1.0) / (tf + norm[docs])
+
+        k = min(top_k, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.chunk_ids[i], float(scores[i])) for i in top if scores[i] > 0]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    여러 검색 결과 순위를 RRF로 합침: score = Σ 1 / (k + rank)
+    - 점수 스케일이 다른 dense(코사인)/BM25를 정규화 없이 섞을 수 있음
+    """
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            fused[key] = fused.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
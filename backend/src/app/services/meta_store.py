@@ -0,0 +1,160 @@
+# backend/src/app/services/meta_store.py
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+# meta.bin 레이아웃 (little-endian)
+#   header  : magic(8) | version(u32) | reserved(u32) | count(u64)
+#   offsets : u64 × (count + 1)   → i번째 행 = payload[offsets[i]:offsets[i+1]]
+#   payload : 행마다 UTF-8 JSON (chunk_id/doc_id/source/page/text)
+#             길이 0인 행 = 삭제된 벡터 id 자리(증분 빌드), get()은 None 반환
+MAGIC = b"YPMETA\x00\x01"
+VERSION = 1
+_HEADER = struct.Struct("<8sIIQ")
+_CHUNK_ID_PREFIX = b'{"chunk_id":'
+_json_decoder = json.JSONDecoder()
+
+
+def _normalize_row(item: Any, idx: int) -> Dict[str, Any]:
+    if isinstance(item, dict):
+        return {
+            "chunk_id": item.get("chunk_id") or f"chunk_{idx}",
+            "doc_id": item.get("doc_id"),
+            "source": item.get("source"),
+            "page": item.get("page"),
+            "text": item.get("text") or "",
+        }
+    return {"chunk_id": f"chunk_{idx}", "doc_id": None, "source": None, "page": None, "text": str(item)}
+
+
+def write_meta_store(path: Path, rows: Iterable[Optional[Dict[str, Any]]]) -> int:
+    """
+    rows를 meta.bin 형식으로 저장 (임시 파일에 쓴 뒤 교체 → 읽는 쪽은 항상 완전한 파일만 봄)
+    rows는 한 번만 순회하므로 제너레이터를 넘겨도 됨. None 행은 빈 자리로 저장. 저장한 행 수를 반환.
+    """
+    path = Path(path)
+    payload_tmp = path.with_name(path.name + ".payload.tmp")
+    out_tmp = path.with_name(path.name + ".tmp")
+
+    offsets: List[int] = [0]
+    with payload_tmp.open("wb") as f:
+        for i, row in enumerate(rows):
+            if row is None:
+                offsets.append(offsets[-1])
+                continue
+            data = json.dumps(_normalize_row(row, i), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+
+    count = len(offsets) - 1
+    with out_tmp.open("wb") as out, payload_tmp.open("rb") as payload:
+        out.write(_HEADER.pack(MAGIC, VERSION, 0, count))
+        out.write(np.asarray(offsets, dtype="<u8").tobytes())
+        while True:
+            buf = payload.read(1 << 20)
+            if not buf:
+                break
+            out.write(buf)
+    payload_tmp.unlink()
+    os.replace(out_tmp, path)
+    return count
+
+
+class MetaStore:
+    """
+    meta.bin 읽기 전용 뷰
+    - 파일 전체를 mmap → 워커 프로세스들이 OS 페이지 캐시를 공유
+    - 행은 get(i) 호출 시점에만 디코딩 (검색에 걸린 행만)
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, _, count = _HEADER.unpack_from(self._mm, 0)
+        assert magic == MAGIC, f"not a meta store: {self.path}"
+        assert version == VERSION, f"unsupported meta store version {version}: {self.path}"
+
+        self._count = int(count)
+        self._offsets = np.frombuffer(self._mm, dtype="<u8", count=self._count + 1, offset=_HEADER.size)
+        self._base = _HEADER.size + (self._count + 1) * 8
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, idx: int) -> Optional[Dict[str, Any]]:
+        if not 0 <= idx < self._count:
+            raise IndexError(idx)
+        start = self._base + int(self._offsets[idx])
+        end = self._base + int(self._offsets[idx + 1])
+        if start == end:
+            return None
+        return json.loads(self._mm[start:end].decode("utf-8"))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._count):
+            row = self.get(i)
+            if row is not None:
+                yield row
+
+    def chunk_id_rows(self) -> Dict[str, int]:
+        """
+        chunk_id → 행 번호 (하이브리드 검색에서 BM25 결과를 메타 행으로 연결할 때 사용)
+        write_meta_store가 chunk_id를 항상 첫 필드로 쓰므로 본문까지 디코딩하지 않고 앞부분만 읽음
+        """
+        out: Dict[str, int] = {}
+        skip = len(_CHUNK_ID_PREFIX)
+        for i in range(self._count):
+            start = self._base + int(self._offsets[i])
+            end = self._base + int(self._offsets[i + 1])
+            if start == end:
+                continue
+            head = self._mm[start:min(end, start + 512)]
+            if head.startswith(_CHUNK_ID_PREFIX):
+                try:
+                    chunk_id, _ = _json_decoder.raw_decode(head[skip:].decode("utf-8", errors="ignore"))
+                    out[chunk_id] = i
+                    continue
+                except ValueError:
+                    pass
+            out[self.get(i)["chunk_id"]] = i
+        return out
+
+    def close(self) -> None:
+        # numpy 뷰가 mmap 버퍼를 잡고 있으므로 먼저 해제
+        self._offsets = None
+        self._mm.close()
+
+
+class ListMetaStore:
+    """
+    구버전 meta.json(행 리스트)용 호환 래퍼 — MetaStore와 같은 get() 계약
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._rows = json.loads(self.path.read_text(encoding="utf-8"))
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, idx: int) -> Dict[str, Any]:
+        return _normalize_row(self._rows[idx], idx)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self._rows)):
+            yield self.get(i)
+
+    def chunk_id_rows(self) -> Dict[str, int]:
+        return {self.get(i)["chunk_id"]: i for i in range(len(self._rows))}
+
+    def close(self) -> None:
+        self._rows = []
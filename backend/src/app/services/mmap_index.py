@@ -0,0 +1,54 @@
+# backend/src/app/services/mmap_index.py
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+# flat(전수검색) 인덱스용 mmap 검색기
+# - faiss 1.8의 IO_FLAG_MMAP은 IVF 역리스트만 mmap하고 IndexFlat은 통째로 힙에 복사함
+# - build_faiss.py가 flat 세대마다 vectors-<gen>.npy(float32, i행 = 벡터 id i)를 같이 쓰고,
+#   여기서 np.load(mmap_mode="r")로 열어 내적 검색 → 워커 여러 개가 OS 페이지 캐시 한 벌을 공유
+# - 증분 빌드로 삭제된 id 자리는 0벡터(점수 0) → 메타에서 None이라 검색 결과에서 빠짐
+
+SEARCH_BLOCK_ROWS = 262144  # 한 번에 점수를 계산할 행 수 (임시 점수 배열 크기 제한)
+
+
+class MmapFlatIndex:
+    """
+    faiss.IndexIDMap2(IndexFlatIP)와 같은 결과를 내는 읽기 전용 검색기
+    - RAGService가 쓰는 만큼만 구현: d, ntotal, search(), reconstruct()
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.vectors: np.ndarray = np.load(self.path, mmap_mode="r")
+        assert self.vectors.dtype == np.float32 and self.vectors.ndim == 2, f"not a float32 matrix: {self.path}"
+        self.ntotal, self.d = self.vectors.shape
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        q = np.ascontiguousarray(queries, dtype="float32").reshape(-1, self.d)
+        nq = len(q)
+        best_s = np.full((nq, 0), -np.inf, dtype="float32")
+        best_i = np.zeros((nq, 0), dtype="int64")
+
+        for start in range(0, self.ntotal, SEARCH_BLOCK_ROWS):
+            scores = q @ self.vectors[start:start + SEARCH_BLOCK_ROWS].T
+            kk = min(k, scores.shape[1])
+            part = np.argpartition(-scores, kk - 1, axis=1)[:, :kk]
+            cand_s = np.concatenate([best_s, np.take_along_axis(scores, part, axis=1)], axis=1)
+            cand_i = np.concatenate([best_i, part + start], axis=1)
+            keep = np.argsort(-cand_s, axis=1, kind="stable")[:, :k]
+            best_s = np.take_along_axis(cand_s, keep, axis=1)
+            best_i = np.take_along_axis(cand_i, keep, axis=1)
+
+        # faiss와 같은 모양: 결과가 k개보다 적으면 id -1
+        if best_s.shape[1] < k:
+            pad = k - best_s.shape[1]
+            best_s = np.pad(best_s, ((0, 0), (0, pad)), constant_values=-np.inf)
+            best_i = np.pad(best_i, ((0, 0), (0, pad)), constant_values=-1)
+        return best_s, best_i
+
+    def reconstruct(self, key: int) -> np.ndarray:
+        return np.array(self.vectors[int(key)], dtype="float32")
@@ -0,0 +1,191 @@
+# backend/src/app/services/policy_catalog.py
+from __future__ import annotations
+
+import json
+import os
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Generic, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+# 정책 카탈로그 (data/policy_catalog.json) → 시작할 때 Aho-Corasick 오토마톤 하나로 컴파일
+# - 정책명/별칭/반쪽 키워드/일반어를 모두 한 오토마톤에 넣고, 메시지를 한 번만 훑어서
+#   걸린 정책(intent) 전부 + 정책명 명시 여부 + 일반어 포함 여부를 같이 구함
+# - 정책이 수백 개로 늘어도 메시지당 비용은 메시지 길이(+매칭 수)에만 비례 (bench/policy_match_bench.py)
+# - 매칭은 소문자 변환 후 부분 문자열 기준 (공백 정규화 없음 → "희망 두배" 같은 표기는 별칭으로 따로 등록)
+
+POLICY_CATALOG_PATH = Path(os.getenv("POLICY_CATALOG_PATH", "data/policy_catalog.json"))
+CONFIRM_MAX_CANDIDATES = 5   # 정책명 확인 질문에 보여줄 후보 수
+CONFIRM_MAX_QUESTION_LEN = 14  # intent가 잡혀도 이보다 짧은 질문은 확인부터
+
+# 패턴 종류
+KIND_NAME = "name"        # 공식 정책명 → 명시적
+KIND_ALIAS = "alias"      # 별칭/약칭 → intent
+KIND_KEYWORD = "keyword"  # 반쪽 키워드 → intent
+KIND_GENERIC = "generic"  # 특정 정책이 아닌 일반어("지원금") → 확인 필요
+
+T = TypeVar("T")
+
+
+class AhoCorasick(Generic[T]):
+    """
+    여러 패턴을 한 번에 찾는 Aho-Corasick 오토마톤 (문자 단위, 순수 파이썬)
+    - 노드마다 {문자: 다음 노드} 딕셔너리 + 실패 링크, 출력은 실패 링크를 따라 미리 합쳐 둠
+    - iter_matches()는 텍스트를 한 번만 훑음
+    """
+
+    def __init__(self, patterns: Iterable[Tuple[str, T]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[List[T]] = [[]]
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            node = 0
+            for ch in pattern:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._out.append([])
+                node = nxt
+            self._out[node].append(payload)
+        self._fail = [0] * len(self._goto)
+        self._build_fail_links()
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self._goto)
+
+    def iter_matches(self, text: str) -> Iterator[T]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                yield from out[node]
+
+
+@dataclass(frozen=True)
+class Policy:
+    id: str
+    name: str                       # 공식 정책명 (확인 질문에 그대로 노출)
+    aliases: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()  # 반쪽 키워드 ("도약", "장려금" …)
+    doc_ids: Tuple[str, ...] = ()   # 근거 문서 (preproces_pdf.py doc_id)
+
+
+@dataclass(frozen=True)
+class PolicyMatch:
+    intents: Tuple[str, ...]  # 걸린 정책 id (카탈로그 순서)
+    explicit: bool            # 공식 정책명이 그대로 들어 있음
+    generic: bool             # 일반어/반쪽 키워드만 있는 경우 포함
+
+    @property
+    def intent(self) -> Optional[str]:
+        return self.intents[0] if self.intents else None
+
+
+class PolicyCatalog:
+    """카탈로그 정책 목록 + 컴파일된 매처"""
+
+    def __init__(
+        self,
+        policies: Sequence[Policy],
+        generic_keywords: Sequence[str] = (),
+        default_candidates: Sequence[str] = (),
+    ):
+        ids = [p.id for p in policies]
+        assert len(ids) == len(set(ids)), "duplicate policy id in catalog"
+        self.policies = list(policies)
+        self._order = {pid: i for i, pid in enumerate(ids)}
+        self._by_id = {p.id: p for p in self.policies}
+        unknown = [pid for pid in default_candidates if pid not in self._by_id]
+        assert not unknown, f"unknown default_candidates: {unknown}"
+        self.default_candidates = list(default_candidates) or ids[:CONFIRM_MAX_CANDIDATES]
+
+        patterns: List[Tuple[str, Tuple[str, Optional[str]]]] = []
+        for p in self.policies:
+            patterns.append((p.name.lower(), (KIND_NAME, p.id)))
+            patterns.extend((a.lower(), (KIND_ALIAS, p.id)) for a in p.aliases)
+            patterns.extend((k.lower(), (KIND_KEYWORD, p.id)) for k in p.keywords)
+        patterns.extend((g.lower(), (KIND_GENERIC, None)) for g in generic_keywords)
+        self.n_patterns = len(patterns)
+        self._matcher: AhoCorasick[Tuple[str, Optional[str]]] = AhoCorasick(patterns)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PolicyCatalog":
+        policies = [
+            Policy(
+                id=p["id"],
+                name=p["name"],
+                aliases=tuple(p.get("aliases") or ()),
+                keywords=tuple(p.get("keywords") or ()),
+                doc_ids=tuple(p.get("doc_ids") or ()),
+            )
+            for p in data.get("policies") or []
+        ]
+        return cls(policies, data.get("generic_keywords") or (), data.get("default_candidates") or ())
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PolicyCatalog":
+        return cls.from_dict(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def __len__(self) -> int:
+        return len(self.policies)
+
+    def get(self, policy_id: str) -> Optional[Policy]:
+        return self._by_id.get(policy_id)
+
+    def match(self, text: str) -> PolicyMatch:
+        t = (text or "").strip().lower()
+        hits = set()
+        explicit = generic = False
+        for kind, pid in self._matcher.iter_matches(t):
+            if kind == KIND_GENERIC:
+                generic = True
+                continue
+            hits.add(pid)
+            if kind == KIND_NAME:
+                explicit = True
+        return PolicyMatch(intents=tuple(sorted(hits, key=self._order.__getitem__)), explicit=explicit, generic=generic)
+
+    def needs_confirmation(self, question: str, match: Optional[PolicyMatch] = None) -> bool:
+        """
+        ✅ 할루시네이션 방지 규칙:
+        - 공식 정책명이 들어 있으면 확인 불필요
+        - 일반어('청년 장려금', '지원금' …)만 있거나, intent가 없거나, 질문이 너무 짧으면 정책명부터 확인
+        """
+        m = match if match is not None else self.match(question)
+        if m.explicit:
+            return False
+        if m.generic or m.intent is None:
+            return True
+        return len((question or "").strip()) <= CONFIRM_MAX_QUESTION_LEN
+
+    def confirmation_candidates(self, match: Optional[PolicyMatch] = None) -> List[Policy]:
+        # 키워드로 걸린 정책을 앞에, 나머지는 기본 후보로 채움 ("장려금"처럼 여러 정책에 걸리는 일반어 대비)
+        ids = list(match.intents) if match is not None else []
+        ids = list(dict.fromkeys(ids + self.default_candidates))
+        return [self._by_id[pid] for pid in ids[:CONFIRM_MAX_CANDIDATES]]
+
+
+@lru_cache(maxsize=1)
+def get_policy_catalog() -> PolicyCatalog:
+    """POLICY_CATALOG_PATH를 한 번만 읽어서 컴파일 (main.py가 시작할 때 호출 → 파일 오류는 바로 드러남)"""
+    return PolicyCatalog.from_file(POLICY_CATALOG_PATH)
@@ -1,25 +1,113 @@
 # backend/src/app/services/rag_service.py
+import asyncio
 import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Tuple, Union
 
 import faiss
-import requests
-from sentence_transformers import SentenceTransformer
-
-INDEX_PATH = Path("data/processed-data/faiss.index")
-META_PATH = Path("data/processed-data/meta.json")
+import httpx
+import numpy as np
+
+from .answer_cache import AnswerCache, bucket_age
+from .context_packer import count_tokens, load_encoding, pack_contexts, pack_history
+from .embed_batcher import EmbeddingBatcher
+from .embed_sidecar import EmbedderUnavailable, SidecarEmbedder
+from .embedders import load_query_embedder
+from .embedding_cache import QueryEmbeddingCache, normalize_query
+from .extractive import fact_answer, highlight_sentences, low_score_answer, match_fact_rule
+from .index_files import IndexFiles, resolve_index_files
+from .lexical import BM25Index, reciprocal_rank_fusion
+from .meta_store import ListMetaStore, MetaStore
+from .mmap_index import MmapFlatIndex
+from .policy_catalog import PolicyMatch, get_policy_catalog
+from .request_log import run_in_executor
+
+logger = logging.getLogger(__name__)
+
+# index.json(세대 포인터)이 있으면 그쪽이 우선, 없으면 아래 고정 경로 사용
+DATA_DIR = Path("data/processed-data")
+INDEX_PATH = DATA_DIR / "faiss.index"
+META_PATH = DATA_DIR / "meta.bin"
+LEGACY_META_JSON_PATH = DATA_DIR / "meta.json"  # 구버전 빌드 산출물 (meta.bin 없을 때만 사용)
+LEXICAL_PATH = DATA_DIR / "bm25.npz"  # 구버전 고정 경로 레이아웃용 (세대가 있으면 bm25-<gen>.npz), 없으면 dense 검색만 사용
 
 EMBED_MODEL = "BAAI/bge-m3"
-
-OLLAMA_URL = "http://localhost:11434/api/generate"
+# 질문 임베딩 백엔드: torch(기본) | onnx(int8 양자화, embedders.py 참고)
+# 인덱스 벡터는 항상 build_faiss.py(torch fp32)로 만들고, onnx는 parity 검사를 통과한 모델만 사용
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+EMBED_ONNX_DIR = Path(os.getenv("EMBED_ONNX_DIR", "data/models/bge-m3-onnx-int8"))
+EMBED_ONNX_THREADS = int(os.getenv("EMBED_ONNX_THREADS", "0"))  # 0이면 onnxruntime 기본값(코어 수)
+# 임베딩 사이드카(src/app/embed_server.py) Unix 소켓 — 설정하면 워커들은 모델을 올리지 않고 사이드카에 요청
+# 사이드카가 없거나 응답이 없으면 그때 워커 안에 EMBED_BACKEND 모델을 로드해서 사용 (embed_sidecar.py)
+EMBED_SIDECAR_SOCKET = os.getenv("EMBED_SIDECAR_SOCKET", "")
+EMBED_SIDECAR_TIMEOUT_SEC = float(os.getenv("EMBED_SIDECAR_TIMEOUT_SEC", "10"))
+
+# /api/chat: 고정 system 프롬프트가 항상 맨 앞 → Ollama가 직전 요청과 겹치는 앞부분 KV 캐시를 재사용
+OLLAMA_URL = "http://localhost:11434/api/chat"
 OLLAMA_MODEL = "llama3.2:3b"
+OLLAMA_KEEP_ALIVE = "30m"  # 요청 사이에 모델/KV 캐시를 내리지 않음
+OLLAMA_NUM_CTX = 4096      # 요청마다 같아야 함 (바뀌면 모델이 다시 로드되어 캐시가 사라짐)
+HISTORY_TURNS = 8
 
 TOP_K_DEFAULT = 5
-MAX_CTX_CHARS_PER_CHUNK = 900
 OLLAMA_NUM_PREDICT = 520
+# 프롬프트 전체 토큰 예산 (컨텍스트 창에서 답변 생성분과 여유분을 뺀 만큼)
+PROMPT_TOKEN_BUDGET = OLLAMA_NUM_CTX - OLLAMA_NUM_PREDICT - 64
 MIN_TOP_SCORE_FOR_LLM = 0.55
 
+# 근사검색 인덱스(build_faiss.py --index-type) 검색 파라미터
+# None이면 인덱스 파일에 저장된 값 사용 / flat 인덱스에는 영향 없음
+FAISS_EF_SEARCH: Optional[int] = None   # HNSW: 클수록 recall↑ 속도↓
+FAISS_NPROBE: Optional[int] = None      # IVF: 클수록 recall↑ 속도↓
+# 인덱스를 mmap으로 열어 워커들이 페이지 캐시 한 벌을 공유 (flat: vectors-<gen>.npy, IVF: faiss IO_FLAG_MMAP)
+# HNSW는 faiss가 mmap을 지원하지 않아 힙에 로드 (serve.py 프리포크면 fork 후 copy-on-write로 공유)
+FAISS_MMAP = True
+
+# 하이브리드 검색 (dense + BM25 → RRF)
+HYBRID_ENABLED = True
+HYBRID_CANDIDATES = 20  # 각 검색기에서 가져올 후보 수
+RRF_K = 60
+
+# Ollama 연결 풀 / 동시 생성 수 제한
+OLLAMA_TIMEOUT_SEC = 180
+OLLAMA_MAX_CONNECTIONS = 32
+OLLAMA_MAX_CONCURRENCY = 8
+
+# 임베딩/FAISS 검색(CPU 작업)을 돌리는 스레드 수
+# (임베딩은 배처가 한 스레드에서 모아 돌리므로, 배치 크기만큼은 동시에 대기할 수 있어야 함)
+RETRIEVE_WORKERS = 16
+
+# 쿼리 임베딩 캐시 (bge-m3 1024차원 float32 ≈ 4KB/건 → 64MB면 약 1.5만 건)
+QUERY_CACHE_MAX_BYTES = 64 * 1024 * 1024
+QUERY_CACHE_TTL_SEC = 6 * 60 * 60
+
+# 동시 요청 임베딩 마이크로 배칭
+EMBED_BATCH_MAX_SIZE = 16
+EMBED_BATCH_MAX_WAIT_MS = 3.0
+
+# 최종 답변 캐시 (같은 intent/프로필 구간/근거 chunk + 유사 질문이면 LLM 생략)
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_SIM_THRESHOLD = 0.92
+ANSWER_CACHE_TTL_SEC = 12 * 60 * 60
+ANSWER_CACHE_MAX_ENTRIES = 5000
+
+# LLM 생략(추출형 답변) 경로
+# - 근거가 약하면(MIN_TOP_SCORE_FOR_LLM 미만) LLM 대신 안내문 + 가장 가까운 문서 문장
+# - 금액/기한/나이 같은 단순 사실 질문은 근거가 충분히 강할 때 문서 문장을 그대로 인용 (extractive.FACT_RULES)
+EXTRACTIVE_LOW_SCORE_ENABLED = True
+EXTRACTIVE_LOW_SCORE_SENTENCES = 2
+EXTRACTIVE_FACTS_ENABLED = True
+EXTRACTIVE_FACT_MIN_SCORE = 0.65
+
+# 부팅 워밍업: 첫 사용자 대신 모델 첫 추론/인덱스 페이지 읽기/Ollama 모델 로드를 미리 치름
+WARMUP_QUERY = "청년 월세 지원 신청 자격"
+
 
 def build_user_context(profile: Optional[Dict[str, Any]], followups: Optional[Dict[str, Any]]) -> str:
     profile = profile or {}
@@ -57,217 +145,759 @@ def build_user_context(profile: Optional[Dict[str, Any]], followups: Optional[Di
     return "\n".join(lines)
 
 
-# ✅ 정책명 확정용 “후보 목록”
-# (네 데이터가 아직 도약장려금만 있을 가능성이 커서, 후보는 MVP 기준 최소로 둠)
-POLICY_CANDIDATES = [
-    ("job_jump", "청년일자리도약장려금"),
-    ("kua", "국민취업지원제도"),
-    ("hope_account", "희망두배 청년통장"),
-]
-
-
-def _needs_policy_confirmation(question: str, intent: Optional[str]) -> bool:
+def _needs_policy_confirmation(question: str, match: PolicyMatch) -> bool:
     """
-    ✅ 할루시네이션 방지 규칙:
+    ✅ 할루시네이션 방지 규칙 (정책 카탈로그 기준, policy_catalog.py):
     - 사용자가 정책명을 명확히 말하지 않고, '청년 장려금' 같은 일반어를 쓰면 확정 질문이 필요함
     - intent가 잡혔더라도 질문에 정책명이 명시되지 않으면 확인을 먼저 할 수도 있음
     """
-    q = (question or "").strip()
-    low = q.lower()
-
-    # 명시적 정책명이 포함되어 있으면 confirmation 불필요
-    explicit = any(name in q for _, name in POLICY_CANDIDATES)
-    if explicit:
-        return False
-
-    # 일반어/반쪽 키워드 케이스는 확인 필요
-    generic = any(k in low for k in ["청년 장려금", "일자리 장려금", "장려금", "지원금", "청년 지원금"])
-    if generic:
-        return True
-
-    # intent가 없으면 확인 필요
-    if intent is None:
-        return True
+    return get_policy_catalog().needs_confirmation(question, match)
 
-    # intent가 있어도 질문이 너무 짧고 일반어면 확인
-    if len(q) <= 14:
-        return True
 
-    return False
-
-
-def _policy_confirmation_message(question: str) -> str:
+def _policy_confirmation_message(match: PolicyMatch) -> str:
     lines = []
     lines.append("질문하신 '청년 장려금'이 정확히 어떤 정책을 뜻하는지 먼저 확인이 필요합니다.")
     lines.append("비슷한 이름의 제도가 여러 개라서, 정책명을 확정하지 않으면 요건을 잘못 안내할 위험이 있어요.")
     lines.append("")
     lines.append("혹시 아래 중 어떤 정책을 찾으시는 걸까요?")
-    for _, name in POLICY_CANDIDATES:
-        lines.append(f"- {name}")
+    for policy in get_policy_catalog().confirmation_candidates(match):
+        lines.append(f"- {policy.name}")
     lines.append("")
     lines.append("원하시는 정책명을 그대로 입력해 주시면, 그 다음에 자격/조건을 정확히 정리해드릴게요.")
     return "\n".join(lines)
 
 
+LOW_SCORE_FALLBACK = (
+    "현재 보유 문서에서 질문과 직접 연결되는 근거를 찾기 어렵습니다.\n"
+    "정확한 안내를 위해 정책명을 조금 더 구체적으로 적어주시거나, 해당 정책 PDF를 데이터에 추가해 주세요."
+)
+
+# 모든 요청에 바이트 단위로 똑같이 들어가는 system 프롬프트 (요청별 값은 넣지 않음)
+SYSTEM_PROMPT = """
+너는 '청년 정책 상담사'다. 사용자는 비전공자이며 문서 용어에 익숙하지 않다.
+
+[최우선 규칙]
+- JSON 출력 금지.
+- 문서 출처만 나열 금지.
+- 문서에 없는 내용은 추측 금지. (추측 대신 '문서에 명시 없음' + 다음 액션 제시)
+- 정책명이 불명확하면 절대 요건/자격을 단정하지 말고, 먼저 정책명을 확인하는 질문을 한다.
+- 답변은 마지막 사용자 메시지의 [근거 문서 발췌(Context)]만 근거로 한다.
+
+[답변 구조]
+1) 지금 상태에서 할 수 있는 1차 답변(짧게)
+2) 근거가 충분하면 조건/요건을 쉬운 말로 정리
+3) 근거가 부족하면 "현재 보유 문서에 명시가 부족"이라고 말하고 (문서 추가/질문 구체화) 유도
+4) 추가 질문은 1~2개만, 선택지 강제 금지
+""".strip()
+
+LLM_ERROR_FALLBACK = (
+    "지금은 답변을 만드는 과정에서 오류가 발생했어요.\n"
+    "질문을 조금 더 짧게/구체적으로 다시 보내주시거나, 잠시 후 다시 시도해 주세요."
+)
+
+
+def _unwrap_index(index: faiss.Index) -> faiss.Index:
+    if isinstance(index, MmapFlatIndex):
+        return index
+    index = faiss.downcast_index(index)
+    while isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def _index_ivf(index: faiss.Index) -> Optional[faiss.IndexIVF]:
+    if isinstance(index, MmapFlatIndex):
+        return None
+    try:
+        return faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return None
+
+
+def _current_index_files() -> IndexFiles:
+    return resolve_index_files(DATA_DIR, INDEX_PATH, META_PATH, LEGACY_META_JSON_PATH, LEXICAL_PATH)
+
+
+def _open_meta_store(path: Path) -> Union[MetaStore, ListMetaStore]:
+    return MetaStore(path) if path.suffix == ".bin" else ListMetaStore(path)
+
+
+def _apply_search_params(index: faiss.Index, ef_search: Optional[int], nprobe: Optional[int]) -> None:
+    base = _unwrap_index(index)
+    if ef_search is not None and isinstance(base, faiss.IndexHNSW):
+        base.hnsw.efSearch = int(ef_search)
+    ivf = _index_ivf(index)
+    if nprobe is not None and ivf is not None:
+        ivf.nprobe = min(int(nprobe), ivf.nlist)
+
+
+@dataclass
+class IndexSnapshot:
+    """
+    한 세대의 인덱스 + 메타 묶음
+    - 요청은 시작할 때 현재 스냅샷 참조를 한 번 잡고 끝까지 그것만 사용
+    - 핫 리로드는 새 스냅샷을 다 만든 뒤 참조만 바꿔치기 → 진행 중 요청에 영향 없음
+    """
+    generation: str
+    index: faiss.Index
+    meta: Union[MetaStore, ListMetaStore]
+    files: IndexFiles
+    loaded_at: float
+    lexical: Optional[BM25Index] = None
+    rows_by_chunk: Optional[Dict[str, int]] = None  # BM25 결과(chunk_id) → 메타 행/벡터 id
+
+
+def _read_index(files: IndexFiles) -> Union[faiss.Index, MmapFlatIndex]:
+    if not FAISS_MMAP:
+        return faiss.read_index(str(files.index_path))
+    if files.vectors_path is not None and files.vectors_path.exists():
+        return MmapFlatIndex(files.vectors_path)
+    # IVF는 역리스트(벡터 본체)가 mmap으로 열림, 그 밖의 타입은 플래그가 무시되고 힙에 로드
+    return faiss.read_index(str(files.index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+
+
+def _make_query_embedder() -> Any:
+    def local() -> Any:
+        return load_query_embedder(EMBED_BACKEND, EMBED_MODEL, EMBED_ONNX_DIR, EMBED_ONNX_THREADS)
+
+    if not EMBED_SIDECAR_SOCKET:
+        return local()
+    return SidecarEmbedder(Path(EMBED_SIDECAR_SOCKET), EMBED_MODEL, fallback=local, timeout_sec=EMBED_SIDECAR_TIMEOUT_SEC)
+
+
+def _load_snapshot(files: IndexFiles) -> IndexSnapshot:
+    meta = _open_meta_store(files.meta_path)
+    lexical = None
+    rows_by_chunk = None
+    if HYBRID_ENABLED and files.lexical_path is not None and files.lexical_path.exists():
+        lexical = BM25Index.load(files.lexical_path)
+        rows_by_chunk = meta.chunk_id_rows()
+    return IndexSnapshot(
+        generation=files.generation,
+        index=_read_index(files),
+        meta=meta,
+        files=files,
+        loaded_at=time.time(),
+        lexical=lexical,
+        rows_by_chunk=rows_by_chunk,
+    )
+
+
+def cacheable_user_context(profile: Optional[Dict[str, Any]], followups: Optional[Dict[str, Any]]) -> str:
+    # 캐시로 공유될 답변용 프로필: 나이는 구간으로만 (정확한 나이는 프롬프트에도 안 넣음)
+    profile = dict(profile or {})
+    profile["age"] = bucket_age(profile.get("age"))
+    return build_user_context(profile, followups)
+
+
+def answer_cache_key(intent: Optional[str], user_context: str, ctxs: List[Dict[str, Any]]) -> Tuple[Optional[str], str, Tuple[str, ...]]:
+    # user_context는 cacheable_user_context() 결과 — 답변을 만든 프롬프트 정보가 키에 전부 들어 있어야 함
+    return (intent, user_context, tuple(c["chunk_id"] for c in ctxs))
+
+
+def _prior_history(history: Optional[List[Dict[str, str]]], question: str) -> List[Dict[str, str]]:
+    # history의 마지막은 이번 질문(main이 먼저 기록함) → 그 앞까지만 이전 대화
+    tail = list(history or [])
+    if tail and tail[-1].get("role") == "user" and tail[-1].get("content") == question:
+        tail = tail[:-1]
+    return tail
+
+
+class LLMTimingStats:
+    """
+    Ollama 응답의 *_duration(ns)/*_count 누적
+    - prompt_eval: 프롬프트 처리(KV 캐시에 없던 토큰만 셈) / eval: 답변 토큰 생성
+    - prompt_eval_tokens가 요청 프롬프트보다 훨씬 작으면 앞부분 캐시가 재사용된 것
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.prompt_eval_tokens = 0
+        self.prompt_eval_ms = 0.0
+        self.eval_tokens = 0
+        self.eval_ms = 0.0
+        self.load_ms = 0.0
+        self.bypassed: Dict[str, int] = {}
+
+    def record_bypass(self, reason: str) -> None:
+        with self._lock:
+            self.bypassed[reason] = self.bypassed.get(reason, 0) + 1
+
+    def record(self, data: Dict[str, Any], timings: Optional[Dict[str, float]] = None) -> None:
+        sample = {
+            "prompt_eval_tokens": int(data.get("prompt_eval_count") or 0),
+            "prompt_eval_ms": (data.get("prompt_eval_duration") or 0) / 1e6,
+            "eval_tokens": int(data.get("eval_count") or 0),
+            "eval_ms": (data.get("eval_duration") or 0) / 1e6,
+            "load_ms": (data.get("load_duration") or 0) / 1e6,
+        }
+        if timings is not None:
+            timings.update(sample)
+        with self._lock:
+            self.calls += 1
+            self.prompt_eval_tokens += sample["prompt_eval_tokens"]
+            self.prompt_eval_ms += sample["prompt_eval_ms"]
+            self.eval_tokens += sample["eval_tokens"]
+            self.eval_ms += sample["eval_ms"]
+            self.load_ms += sample["load_ms"]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            n = self.calls or 1
+            n_bypassed = sum(self.bypassed.values())
+            return {
+                "calls": self.calls,
+                "bypassed": dict(self.bypassed),
+                "bypass_rate": n_bypassed / ((self.calls + n_bypassed) or 1),
+                "avg_prompt_eval_tokens": self.prompt_eval_tokens / n,
+                "avg_prompt_eval_ms": self.prompt_eval_ms / n,
+                "avg_eval_tokens": self.eval_tokens / n,
+                "avg_eval_ms": self.eval_ms / n,
+                "avg_load_ms": self.load_ms / n,
+                "prompt_eval_share": self.prompt_eval_ms / ((self.prompt_eval_ms + self.eval_ms) or 1.0),
+            }
+
+
+@dataclass
+class AnswerPlan:
+    """
+    answer 한 턴의 실행 계획
+    - messages가 None이면 LLM 호출 없이 fallback이 곧 최종 답변(정책 확정 질문, 캐시 적중 등)
+    - messages가 있으면 /api/chat 호출, 실패 시 fallback으로 안내
+    - cache_key가 있으면 LLM 답변을 답변 캐시에 저장
+    - timings: 검색 단계별 소요시간(ms), LLM 호출 후에는 prompt_eval_ms/eval_ms 등도 추가
+    - bypass: 검색까지 한 뒤 LLM을 생략한 이유 (low_score / fact:<규칙> / cache)
+    - outcome: 턴 결과 (confirm / bypass 이유 / embed_unavailable / prompt_error / llm / llm_error / llm_timeout), 턴이 끝날 때 채워짐
+    """
+    messages: Optional[List[Dict[str, str]]]
+    fallback: str
+    question: str = ""
+    cache_key: Optional[Hashable] = None
+    question_vec: Optional[np.ndarray] = None
+    generation: Optional[str] = None
+    timings: Dict[str, float] = field(default_factory=dict)
+    bypass: Optional[str] = None
+    outcome: Optional[str] = None
+
+
+class LLMStreamInterrupted(RuntimeError):
+    """첫 토큰 이후 LLM 스트림이 끊김 — 그때까지 보낸 부분은 완성된 답변이 아님"""
+
+
+def _llm_failure(e: Exception) -> str:
+    return "llm_timeout" if isinstance(e, httpx.TimeoutException) else "llm_error"
+
+
 class RAGService:
+    """
+    생성자는 가벼운 것(캐시/배처/HTTP 설정)만 만들고, 인덱스/임베딩 모델은 load()에서 로드
+    → 프로세스는 바로 뜨고(healthz), 무거운 로드와 워밍업은 백그라운드에서 (main.py 부팅 참고)
+    """
+
     def __init__(self):
-        assert INDEX_PATH.exists(), f"missing: {INDEX_PATH}"
-        assert META_PATH.exists(), f"missing: {META_PATH}"
-        self.index = faiss.read_index(str(INDEX_PATH))
-        self.meta = json.loads(META_PATH.read_text(encoding="utf-8"))
-        self.embedder = SentenceTransformer(EMBED_MODEL)
-
-    def _normalize_meta_item(self, item: Any, idx: int) -> Dict[str, Any]:
-        if isinstance(item, dict):
-            item.setdefault("chunk_id", f"chunk_{idx}")
-            item.setdefault("source", None)
-            item.setdefault("page", None)
-            item.setdefault("text", "")
-            return item
-        return {"chunk_id": f"chunk_{idx}", "source": None, "page": None, "text": str(item)}
-
-    def retrieve(self, query: str, top_k: int = TOP_K_DEFAULT) -> List[Dict[str, Any]]:
-        qv = self.embedder.encode([query], normalize_embeddings=True).astype("float32")
-        scores, idxs = self.index.search(qv, top_k)
+        self._search_overrides: Dict[str, Optional[int]] = {"ef_search": FAISS_EF_SEARCH, "nprobe": FAISS_NPROBE}
+        self._reload_lock = threading.Lock()
+        self._active: Optional[IndexSnapshot] = None
+        self.embedder: Any = None
+        self.query_cache = QueryEmbeddingCache(max_bytes=QUERY_CACHE_MAX_BYTES, ttl_sec=QUERY_CACHE_TTL_SEC)
+        self.embed_batcher = EmbeddingBatcher(
+            self._encode_batch,
+            max_batch_size=EMBED_BATCH_MAX_SIZE,
+            max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+        )
+        self.answer_cache = AnswerCache(
+            similarity_threshold=ANSWER_CACHE_SIM_THRESHOLD,
+            ttl_sec=ANSWER_CACHE_TTL_SEC,
+            max_entries=ANSWER_CACHE_MAX_ENTRIES,
+        )
+
+        self._executor = ThreadPoolExecutor(max_workers=RETRIEVE_WORKERS, thread_name_prefix="rag-retrieve")
+        self._client: Optional[httpx.AsyncClient] = None
+        self._llm_slots = asyncio.Semaphore(OLLAMA_MAX_CONCURRENCY)
+        self.llm_stats = LLMTimingStats()
+        self._timing_listeners: List[Callable[[AnswerPlan], None]] = []
+
+    @property
+    def loaded(self) -> bool:
+        return self._active is not None and self.embedder is not None
+
+    def load_index(self) -> None:
+        """인덱스/메타/BM25 스냅샷만 로드 (serve.py 프리포크: 부모에서 한 번 → 워커들이 공유)"""
+        with self._reload_lock:
+            if self._active is None:
+                snap = _load_snapshot(_current_index_files())
+                _apply_search_params(snap.index, **self._search_overrides)
+                self._active = snap
+                self.answer_cache.invalidate(snap.generation)
+
+    def load(self) -> None:
+        """
+        인덱스/메타/BM25 + 질문 임베딩 모델 로드 (블로킹, 스레드에서 호출)
+        - 이미 로드된 부분은 건너뜀 → 실패 후 다시 불러도 됨
+        """
+        self.load_index()
+        # 토큰 인코딩도 부팅 때 결정 (첫 답변에서 내려받다가 실패하지 않도록, 실패하면 바이트 추정)
+        load_encoding()
+        if self.embedder is None:
+            self.embedder = _make_query_embedder()
+
+    def warm_up_local(self) -> Dict[str, float]:
+        """임베딩 첫 추론 + FAISS 검색 한 번 (블로킹, 스레드에서 호출) → 단계별 ms"""
+        t0 = time.perf_counter()
+        vec = self._encode_batch([WARMUP_QUERY])
+        t1 = time.perf_counter()
+        self._active.index.search(vec, TOP_K_DEFAULT)
+        t2 = time.perf_counter()
+        return {"warm_embed": (t1 - t0) * 1000, "warm_search": (t2 - t1) * 1000}
+
+    async def warm_up_llm(self) -> None:
+        """
+        Ollama에 모델을 올려 두고(keep_alive) 공통 system 프롬프트까지 KV 캐시에 넣어 둠
+        - 한 토큰만 생성, LLM 통계(llm_stats)에는 넣지 않음
+        """
+        payload = self._ollama_payload([{"role": "system", "content": SYSTEM_PROMPT}], stream=False)
+        payload["options"]["num_predict"] = 1
+        r = await self._http().post(OLLAMA_URL, json=payload)
+        r.raise_for_status()
+
+    def add_timing_listener(self, fn: Callable[[AnswerPlan], None]) -> None:
+        """
+        답변 한 턴이 끝날 때마다 fn(plan) 호출 (plan.timings: 단계별 ms, plan.outcome: 턴 결과)
+        - 벤치마크/지표 수집용, 예외는 삼킴
+        """
+        self._timing_listeners.append(fn)
+
+    def _emit_timings(self, plan: AnswerPlan, outcome: str) -> None:
+        plan.outcome = outcome
+        for fn in self._timing_listeners:
+            try:
+                fn(plan)
+            except Exception:
+                logger.exception("timing listener failed")
+
+    def _http(self) -> httpx.AsyncClient:
+        # keep-alive 연결을 재사용하는 공용 클라이언트 (이벤트 루프 안에서 지연 생성)
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(OLLAMA_TIMEOUT_SEC, connect=10.0),
+                limits=httpx.Limits(
+                    max_connections=OLLAMA_MAX_CONNECTIONS,
+                    max_keepalive_connections=OLLAMA_MAX_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._executor.shutdown(wait=False)
+        self.embed_batcher.close()
+
+    @property
+    def index(self) -> faiss.Index:
+        return self._active.index
+
+    @property
+    def meta(self) -> Union[MetaStore, ListMetaStore]:
+        return self._active.meta
+
+    @property
+    def index_generation(self) -> str:
+        # 인덱스가 다시 빌드되면 바뀌는 식별자 (답변 캐시 무효화 기준)
+        return self._active.generation
+
+    def reload_index(self, force: bool = False) -> Dict[str, Any]:
+        """
+        디스크의 현재 세대(index.json 포인터)를 읽어 새 스냅샷으로 교체
+        - 같은 세대면 아무것도 안 함(force=True면 다시 로드)
+        - 로드는 호출 스레드에서 하고, 교체는 참조 한 번 바꾸기 → 진행 중 요청은 이전 스냅샷으로 끝남
+        """
+        with self._reload_lock:
+            assert self._active is not None, "index not loaded yet (load() first)"
+            files = _current_index_files()
+            previous = self._active.generation
+            if files.generation == previous and not force:
+                return {**self.index_status(), "reloaded": False}
+
+            snap = _load_snapshot(files)
+            _apply_search_params(snap.index, **self._search_overrides)
+            self._active = snap
+            self.answer_cache.invalidate(snap.generation)
+            return {**self.index_status(), "reloaded": True, "previous_generation": previous}
+
+    def index_status(self) -> Dict[str, Any]:
+        snap = self._active
+        return {
+            "generation": snap.generation,
+            "loaded_at": snap.loaded_at,
+            "index_path": str(snap.files.index_path),
+            "meta_path": str(snap.files.meta_path),
+            "vectors_path": str(snap.files.vectors_path) if isinstance(snap.index, MmapFlatIndex) else None,
+            "meta_rows": len(snap.meta),
+            **self.search_params(),
+        }
+
+    def set_search_params(self, ef_search: Optional[int] = None, nprobe: Optional[int] = None) -> Dict[str, Any]:
+        """
+        근사검색 인덱스의 런타임 검색 파라미터 조정 (None이면 현재 값 유지)
+        - ef_search: HNSW efSearch
+        - nprobe: IVF nprobe
+        이후 핫 리로드로 들어오는 세대에도 같은 값 적용
+        """
+        if ef_search is not None:
+            self._search_overrides["ef_search"] = ef_search
+        if nprobe is not None:
+            self._search_overrides["nprobe"] = nprobe
+        _apply_search_params(self._active.index, ef_search, nprobe)
+        return self.search_params()
+
+    def search_params(self) -> Dict[str, Any]:
+        base = _unwrap_index(self.index)
+        ivf = _index_ivf(self.index)
+        return {
+            "index_type": type(base).__name__,
+            "ntotal": int(self.index.ntotal),
+            "ef_search": int(base.hnsw.efSearch) if isinstance(base, faiss.IndexHNSW) else None,
+            "nprobe": int(ivf.nprobe) if ivf is not None else None,
+            "nlist": int(ivf.nlist) if ivf is not None else None,
+        }
+
+    def embedder_stats(self) -> Dict[str, Any]:
+        if isinstance(self.embedder, SidecarEmbedder):
+            return {"backend": "sidecar", **self.embedder.stats()}
+        return {"backend": EMBED_BACKEND}
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.embedder.encode(texts, batch_size=len(texts), normalize_embeddings=True).astype("float32")
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        key = normalize_query(query)
+        vec = self.query_cache.get(key)
+        if vec is None:
+            vec = self.embed_batcher.encode(key)
+            self.query_cache.put(key, vec)
+        return vec.reshape(1, -1)
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = TOP_K_DEFAULT,
+        lexical_query: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        return self.retrieve_with_timings(query, top_k, lexical_query)[0]
+
+    def retrieve_with_timings(
+        self,
+        query: str,
+        top_k: int = TOP_K_DEFAULT,
+        lexical_query: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+        """
+        dense(FAISS) 검색, BM25 색인이 있으면 BM25 결과와 RRF로 합침
+        - lexical_query: BM25에 쓸 텍스트(프로필 블록 없이 질문만 넣는 용도), 없으면 query
+        - score는 항상 dense 코사인 점수(근거 충분 여부 판단용), dense 후보에 없던 BM25 결과는 0.0
+        - 단계별 소요시간(ms)을 함께 반환
+        """
+        snap = self._active  # 검색 도중 리로드돼도 index/meta 짝이 맞도록 한 번만 읽음
+        timings: Dict[str, float] = {}
+
+        t0 = time.perf_counter()
+        qv = self._embed_query(query)
+        t1 = time.perf_counter()
+        timings["embed_ms"] = (t1 - t0) * 1000
+
+        n_cand = max(top_k, HYBRID_CANDIDATES) if snap.lexical is not None else top_k
+        scores, idxs = snap.index.search(qv, n_cand)
+        dense: Dict[int, float] = {int(i): float(sc) for sc, i in zip(scores[0], idxs[0]) if i >= 0}
+        t2 = time.perf_counter()
+        timings["dense_ms"] = (t2 - t1) * 1000
+
+        lex: Dict[int, float] = {}
+        if snap.lexical is not None and snap.rows_by_chunk is not None:
+            for chunk_id, sc in snap.lexical.search(lexical_query or query, n_cand):
+                row = snap.rows_by_chunk.get(chunk_id)
+                if row is not None:
+                    lex[row] = sc
+            t3 = time.perf_counter()
+            timings["lexical_ms"] = (t3 - t2) * 1000
+
+            fused = reciprocal_rank_fusion([list(dense), list(lex)], k=RRF_K)
+            rows = [(row, rrf) for row, rrf in fused[:top_k]]
+            timings["fuse_ms"] = (time.perf_counter() - t3) * 1000
+        else:
+            rows = [(row, None) for row in list(dense)[:top_k]]
 
         results: List[Dict[str, Any]] = []
-        for score, idx in zip(scores[0], idxs[0]):
-            if idx < 0:
+        for row, rrf in rows:
+            item = snap.meta.get(int(row))
+            if item is None:
                 continue
-            raw_item = self.meta[idx]
-            item = self._normalize_meta_item(raw_item, idx)
             results.append({
-                "score": float(score),
+                "score": dense.get(row, 0.0),
+                "bm25_score": lex.get(row),
+                "rrf_score": rrf,
                 "chunk_id": item["chunk_id"],
                 "source": item["source"],
                 "page": item["page"],
                 "text": item["text"],
             })
-        return results
+        return results, timings
 
-    def _build_prompt(
+    def _build_messages(
         self,
         question: str,
         ctxs: List[Dict[str, Any]],
         user_context: str,
         history: Optional[List[Dict[str, str]]],
         intent: Optional[str],
-    ) -> str:
-        ctx_lines = []
-        for i, c in enumerate(ctxs, start=1):
-            text = (c.get("text") or "")
-            if len(text) > MAX_CTX_CHARS_PER_CHUNK:
-                text = text[:MAX_CTX_CHARS_PER_CHUNK] + "\n...(생략)"
-            ctx_lines.append(f"[{i}] ({c.get('source')} p.{c.get('page')})\n{text}")
-        ctx_block = "\n\n".join(ctx_lines).strip() or "(관련 문서 발췌가 충분하지 않음)"
-
-        hist_block = ""
-        if history:
-            tail = history[-8:]
-            hist_block = "\n".join([f"{m.get('role')}: {m.get('content')}" for m in tail])
+    ) -> List[Dict[str, str]]:
+        """
+        /api/chat 메시지 목록: 변하지 않는 것 → 자주 변하는 것 순서
+        - SYSTEM_PROMPT(모든 요청 공통) → 프로필(세션 동안 거의 고정) → 최근 대화 → 이번 턴(근거+질문)
+        - 같은 세션의 다음 턴은 앞부분이 그대로라 Ollama가 그만큼 프롬프트 평가를 건너뜀
+        - 근거 발췌는 턴마다 바뀌므로 맨 마지막 user 메시지에만 넣음 (대화 기록에는 남기지 않음)
+        - 전체가 PROMPT_TOKEN_BUDGET 안에 들도록 대화 기록 → 근거 순으로 예산 배분 (context_packer)
+        """
+        messages = [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": f"[사용자 프로필]\n{user_context}"},
+        ]
+
+        # 이번 질문은 아래 user 메시지로 따로 보냄
+        messages.extend(pack_history(_prior_history(history, question), HISTORY_TURNS))
 
         # intent 힌트를 약하게 제공 (확정은 LLM이 아니라 서버 정책확정 단계에서)
         intent_hint = ""
         if intent:
-            intent_hint = f"- 시스템 추정 intent: {intent} (참고용, 확정 아님)"
-
-        return f"""
-너는 '청년 정책 상담사'다. 사용자는 비전공자이며 문서 용어에 익숙하지 않다.
-
-[최우선 규칙]
-- JSON 출력 금지.
-- 문서 출처만 나열 금지.
-- 문서에 없는 내용은 추측 금지. (추측 대신 '문서에 명시 없음' + 다음 액션 제시)
-- 정책명이 불명확하면 절대 요건/자격을 단정하지 말고, 먼저 정책명을 확인하는 질문을 한다.
-
-[사용자 프로필]
-{user_context}
-
-[최근 대화]
-{hist_block}
-
-[시스템 힌트]
-{intent_hint}
-
-[사용자 질문]
-{question}
-
-[근거 문서 발췌(Context)]
-{ctx_block}
-
-[답변 구조]
-1) 지금 상태에서 할 수 있는 1차 답변(짧게)
-2) 근거가 충분하면 조건/요건을 쉬운 말로 정리
-3) 근거가 부족하면 "현재 보유 문서에 명시가 부족"이라고 말하고 (문서 추가/질문 구체화) 유도
-4) 추가 질문은 1~2개만, 선택지 강제 금지
-""".strip()
-
-    def _call_ollama(self, prompt: str) -> str:
-        r = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": OLLAMA_MODEL,
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,
-                    "top_p": 0.9,
-                    "num_predict": OLLAMA_NUM_PREDICT,
-                },
+            intent_hint = f"[시스템 힌트]\n- 시스템 추정 intent: {intent} (참고용, 확정 아님)\n\n"
+
+        def turn(ctx_block: str) -> str:
+            return f"{intent_hint}[근거 문서 발췌(Context)]\n{ctx_block}\n\n[사용자 질문]\n{question}"
+
+        used = sum(count_tokens(m["content"]) + 4 for m in messages) + count_tokens(turn("")) + 4
+        packed = pack_contexts(ctxs, PROMPT_TOKEN_BUDGET - used)
+        ctx_block = "\n\n".join(
+            f"[{i}] ({c.get('source')} p.{c.get('page')})\n{c['text']}" for i, c in enumerate(packed, start=1)
+        ).strip() or "(관련 문서 발췌가 충분하지 않음)"
+
+        messages.append({"role": "user", "content": turn(ctx_block)})
+        return messages
+
+    def _ollama_payload(self, messages: List[Dict[str, str]], stream: bool) -> Dict[str, Any]:
+        return {
+            "model": OLLAMA_MODEL,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": 0.3,
+                "top_p": 0.9,
+                "num_predict": OLLAMA_NUM_PREDICT,
+                "num_ctx": OLLAMA_NUM_CTX,
             },
-            timeout=180,
-        )
-        r.raise_for_status()
-        return (r.json().get("response") or "").strip()
+        }
 
-    def answer(
+    async def _call_ollama(self, messages: List[Dict[str, str]], timings: Optional[Dict[str, float]] = None) -> str:
+        async with self._llm_slots:
+            r = await self._http().post(OLLAMA_URL, json=self._ollama_payload(messages, stream=False))
+            r.raise_for_status()
+            data = r.json()
+        self.llm_stats.record(data, timings)
+        return ((data.get("message") or {}).get("content") or "").strip()
+
+    async def _stream_ollama(
+        self,
+        messages: List[Dict[str, str]],
+        timings: Optional[Dict[str, float]] = None,
+    ) -> AsyncIterator[str]:
+        # Ollama 스트리밍: 한 줄에 JSON 하나({"message": {"content": "..."}, "done": false})
+        # 마지막 줄(done=true)에 prompt_eval/eval 소요시간이 들어 있음
+        async with self._llm_slots:
+            async with self._http().stream(
+                "POST", OLLAMA_URL, json=self._ollama_payload(messages, stream=True)
+            ) as r:
+                r.raise_for_status()
+                async for line in r.aiter_lines():
+                    if not line:
+                        continue
+                    data = json.loads(line)
+                    piece = (data.get("message") or {}).get("content") or ""
+                    if piece:
+                        yield piece
+                    if data.get("done"):
+                        self.llm_stats.record(data, timings)
+                        break
+
+    async def plan_answer(
         self,
         question: str,
-        intent: Optional[str],
+        policy_match: Optional[PolicyMatch] = None,
         top_k: int = TOP_K_DEFAULT,
         profile: Optional[Dict[str, Any]] = None,
         followups: Optional[Dict[str, Any]] = None,
         history: Optional[List[Dict[str, str]]] = None,
-    ) -> str:
+    ) -> AnswerPlan:
+        # policy_match: 호출 측(detect_policy)이 이미 매칭한 결과 — 없을 때만 여기서 매칭
+        if policy_match is None:
+            policy_match = get_policy_catalog().match(question)
+        intent = policy_match.intent
+
         # ✅ 5번 요구: 반쪽 키워드 → 정책 확정 질문 선행
-        if _needs_policy_confirmation(question, intent):
-            return _policy_confirmation_message(question)
+        if _needs_policy_confirmation(question, policy_match):
+            return AnswerPlan(messages=None, fallback=_policy_confirmation_message(policy_match), outcome="confirm")
 
         user_context = build_user_context(profile, followups)
         retrieval_query = f"{question}\n\n[사용자 정보]\n{user_context}"
 
-        ctxs = self.retrieve(retrieval_query, top_k)
+        # 임베딩/FAISS는 CPU 작업이라 이벤트 루프를 막지 않도록 스레드풀에서 실행 (요청 ID 컨텍스트 유지)
+        generation = self.index_generation
+        try:
+            ctxs, timings = await run_in_executor(
+                self._executor, self.retrieve_with_timings, retrieval_query, top_k, question
+            )
+        except EmbedderUnavailable as e:
+            # 사이드카 장애 + fallback 모델 로드 중: 기다리지 않고 안내 문구로
+            logger.warning("query embedding unavailable: %s", e)
+            return AnswerPlan(messages=None, fallback=LLM_ERROR_FALLBACK, outcome="embed_unavailable")
+
+        top_score = max((c["score"] for c in ctxs), default=0.0)
 
         # 근거 약하면: LLM이 자연어로 "근거 부족" + 다음 액션 유도하도록
-        if not ctxs or (ctxs and ctxs[0]["score"] < MIN_TOP_SCORE_FOR_LLM):
-            prompt = self._build_prompt(
+        if top_score < MIN_TOP_SCORE_FOR_LLM:
+            if EXTRACTIVE_LOW_SCORE_ENABLED:
+                picked = highlight_sentences(question, ctxs[:1], max_sentences=EXTRACTIVE_LOW_SCORE_SENTENCES)
+                return self._bypass("low_score", low_score_answer(LOW_SCORE_FALLBACK, picked), timings)
+            used, fallback = (ctxs[:1] if ctxs else []), LOW_SCORE_FALLBACK
+        else:
+            # 어떤 에러든 사용자에게 자연어로 안내
+            used, fallback = ctxs, LLM_ERROR_FALLBACK
+
+            # 단순 사실 질문(금액/기한/나이): 근거가 강하고 해당 문장이 있으면 그대로 인용
+            rule = match_fact_rule(question) if EXTRACTIVE_FACTS_ENABLED else None
+            if rule is not None and top_score >= EXTRACTIVE_FACT_MIN_SCORE:
+                picked = highlight_sentences(question, ctxs, rule=rule)
+                if picked:
+                    return self._bypass(f"fact:{rule.name}", fact_answer(rule, picked), timings)
+
+        # 답변 캐시는 이전 대화가 없는 턴만, 프롬프트도 키에 든 정보(나이 구간 프로필)로만 만듦
+        # → 같은 구간의 다른 사용자에게 누군가의 정확한 나이/대화 내용이 담긴 답변이 나가지 않음
+        cache_key = None
+        question_vec = None
+        prompt_context = user_context
+        if ANSWER_CACHE_ENABLED and not _prior_history(history, question):
+            prompt_context = cacheable_user_context(profile, followups)
+            try:
+                question_vec = (await run_in_executor(self._executor, self._embed_query, question))[0]
+            except EmbedderUnavailable:
+                question_vec = None  # 캐시만 건너뜀
+            if question_vec is not None:
+                cache_key = answer_cache_key(intent, prompt_context, used)
+                cached = self.answer_cache.lookup(cache_key, question, question_vec, generation)
+                if cached is not None:
+                    return self._bypass("cache", cached, timings)
+
+        t0 = time.perf_counter()
+        try:
+            messages = self._build_messages(
                 question=question,
-                ctxs=ctxs[:1] if ctxs else [],
-                user_context=user_context,
+                ctxs=used,
+                user_context=prompt_context,
                 history=history,
                 intent=intent,
             )
-            try:
-                return self._call_ollama(prompt)
-            except Exception:
-                return (
-                    "현재 보유 문서에서 질문과 직접 연결되는 근거를 찾기 어렵습니다.\n"
-                    "정확한 안내를 위해 정책명을 조금 더 구체적으로 적어주시거나, 해당 정책 PDF를 데이터에 추가해 주세요."
-                )
+        except Exception:
+            # 프롬프트 조립 실패도 500 대신 안내 문구로
+            logger.exception("prompt build failed")
+            return AnswerPlan(messages=None, fallback=LLM_ERROR_FALLBACK, timings=timings, outcome="prompt_error")
+        timings["prompt_ms"] = (time.perf_counter() - t0) * 1000
+        return AnswerPlan(
+            messages=messages,
+            fallback=fallback,
+            question=question,
+            cache_key=cache_key,
+            question_vec=question_vec,
+            generation=generation,
+            timings=timings,
+        )
 
-        prompt = self._build_prompt(
+    def _bypass(self, reason: str, answer_text: str, timings: Dict[str, float]) -> AnswerPlan:
+        self.llm_stats.record_bypass(reason)
+        return AnswerPlan(messages=None, fallback=answer_text, timings=timings, bypass=reason, outcome=reason)
+
+    def _remember(self, plan: AnswerPlan, answer_text: str) -> None:
+        if plan.cache_key is None or plan.question_vec is None:
+            return
+        self.answer_cache.store(plan.cache_key, plan.question, plan.question_vec, answer_text, plan.generation)
+
+    def short_circuit_answer(self, plan: AnswerPlan) -> str:
+        # LLM 없이 끝나는 plan(messages=None)의 최종 답변 — 지표/로그에도 한 턴으로 기록
+        self._emit_timings(plan, plan.outcome or "fallback")
+        return plan.fallback
+
+    async def answer(
+        self,
+        question: str,
+        policy_match: Optional[PolicyMatch] = None,
+        top_k: int = TOP_K_DEFAULT,
+        profile: Optional[Dict[str, Any]] = None,
+        followups: Optional[Dict[str, Any]] = None,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> str:
+        plan = await self.plan_answer(
             question=question,
-            ctxs=ctxs,
-            user_context=user_context,
+            policy_match=policy_match,
+            top_k=top_k,
+            profile=profile,
+            followups=followups,
             history=history,
-            intent=intent,
         )
-
+        if plan.messages is None:
+            return self.short_circuit_answer(plan)
+        t0 = time.perf_counter()
         try:
-            return self._call_ollama(prompt)
-        except Exception:
-            # 어떤 에러든 사용자에게 자연어로 안내
-            return (
-                "지금은 답변을 만드는 과정에서 오류가 발생했어요.\n"
-                "질문을 조금 더 짧게/구체적으로 다시 보내주시거나, 잠시 후 다시 시도해 주세요."
-            )
+            answer_text = await self._call_ollama(plan.messages, plan.timings)
+        except Exception as e:
+            # 사용자에게는 fallback 안내, 원인은 로그/지표로
+            plan.timings["llm_ms"] = (time.perf_counter() - t0) * 1000
+            logger.warning("ollama call failed: %r", e, exc_info=not isinstance(e, httpx.HTTPError))
+            self._emit_timings(plan, _llm_failure(e))
+            return plan.fallback
+        plan.timings["llm_ms"] = (time.perf_counter() - t0) * 1000
+        self._remember(plan, answer_text)
+        self._emit_timings(plan, "llm")
+        return answer_text
+
+    async def stream_answer(self, plan: AnswerPlan) -> AsyncIterator[str]:
+        """
+        plan을 토큰 단위로 흘려보냄
+        - 단락(short-circuit) plan은 fallback 한 덩어리
+        - 첫 토큰 전에 LLM이 실패하면 fallback 한 덩어리
+        - 중간 실패면 LLMStreamInterrupted → 호출 측이 부분 답변을 기록하지 않도록
+        """
+        if plan.messages is None:
+            yield self.short_circuit_answer(plan)
+            return
+
+        parts: List[str] = []
+        t0 = time.perf_counter()
+        try:
+            async for piece in self._stream_ollama(plan.messages, plan.timings):
+                if not parts:
+                    plan.timings["ttft_ms"] = (time.perf_counter() - t0) * 1000
+                parts.append(piece)
+                yield piece
+        except Exception as e:
+            plan.timings["llm_ms"] = (time.perf_counter() - t0) * 1000
+            logger.warning("ollama stream failed after %d pieces: %r", len(parts), e,
+                           exc_info=not isinstance(e, httpx.HTTPError))
+            self._emit_timings(plan, _llm_failure(e))
+            if parts:
+                raise LLMStreamInterrupted(f"llm stream failed after {len(parts)} pieces") from e
+            yield plan.fallback
+            return
+        plan.timings["llm_ms"] = (time.perf_counter() - t0) * 1000
+        # 끝까지 정상 생성된 답변만 캐시
+        self._remember(plan, "".join(parts).strip())
+        self._emit_timings(plan, "llm")
@@ -0,0 +1,82 @@
+# backend/src/app/services/request_log.py
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Optional
+
+# 요청 ID: X-Request-ID 헤더가 있으면 그대로, 없으면 새로 만들어 응답 헤더/로그에 같이 남김
+REQUEST_ID_HEADER = "X-Request-ID"
+# json(한 줄 JSON, 로그 수집기용) | text(개발용)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord 기본 속성 — 이 밖의 속성은 logger.info(..., extra={...})로 넘긴 필드
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+async def run_in_executor(executor: Optional[Executor], fn: Callable[..., Any], *args: Any) -> Any:
+    """loop.run_in_executor + 현재 contextvars 복사 (기본은 복사 안 함 → 스레드 쪽 로그에 request_id가 빠짐)"""
+    ctx = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(executor, ctx.run, fn, *args)
+
+
+def new_request_id(incoming: Optional[str] = None) -> str:
+    rid = (incoming or "").strip()[:64]
+    return rid or uuid.uuid4().hex[:16]
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out: Dict[str, Any] = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", None),
+            "msg": record.getMessage(),
+        }
+        for k, v in vars(record).items():
+            if k not in _RECORD_ATTRS and not k.startswith("_"):
+                out[k] = v
+        if record.exc_info:
+            out["exc"] = self.formatException(record.exc_info)
+        return json.dumps(out, ensure_ascii=False, default=str)
+
+
+def configure_logging(logger_name: str) -> logging.Logger:
+    """
+    앱 로거(logger_name 이하 전체)에 요청 ID 필터 + 포맷터 연결
+    - uvicorn 자체 로그 설정은 건드리지 않음
+    """
+    logger = logging.getLogger(logger_name)
+    if any(isinstance(f, RequestIdFilter) for h in logger.handlers for f in h.filters):
+        return logger
+
+    handler = logging.StreamHandler()
+    handler.addFilter(RequestIdFilter())
+    if LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+    return logger
+
+
+def elapsed_ms(t0: float) -> float:
+    return round((time.perf_counter() - t0) * 1000, 2)
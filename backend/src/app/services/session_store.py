@@ -1,10 +1,19 @@
 # backend/src/app/services/session_store.py
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, Optional, List
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional, List, Protocol
+import json
+import threading
 import time
 import uuid
+import zlib
+
+# 세션 보관 정책
+SESSION_IDLE_TTL_SEC = 2 * 60 * 60   # 마지막 저장(updated_at) 후 이 시간이 지나면 만료
+SESSION_MAX_SESSIONS = 20000         # 초과 시 가장 오래 저장 안 된 세션부터 제거(LRU)
+SESSION_MAX_MESSAGES = 24            # 세션당 보관 대화 수 (main은 최근 12개만 사용)
 
 
 @dataclass
@@ -56,20 +65,128 @@ class SessionState:
     pending_question_id: Optional[str] = None
     pending_followup_id: Optional[str] = None
 
+    # 저장소가 save마다 올리는 버전 (공유 저장소에서 동시 수정 감지용)
+    version: int = 0
+
+
+class SessionConflictError(Exception):
+    """다른 요청(다른 워커)이 같은 세션을 먼저 저장해서 이번 save가 거절됨"""
+
+
+class SessionStore(Protocol):
+    """
+    세션 저장소 계약 — main은 이 세 메서드만 사용
+    - get_or_create: 없거나 만료된 id면 새 세션(저장은 save 때)
+    - save: 성공 시 state.version 증가, 공유 저장소는 버전이 어긋나면 SessionConflictError
+    """
+
+    def get_or_create(self, session_id: Optional[str]) -> SessionState: ...
+
+    def save(self, state: SessionState) -> None: ...
+
+    def stats(self) -> Dict[str, Any]: ...
+
+
+_STATE_FORMAT = 1
+
+
+def dump_state(state: SessionState) -> bytes:
+    """SessionState → 압축 바이너리 (포맷 바이트 1 + zlib(JSON), 메시지는 [role, content] 배열)"""
+    d = asdict(state)
+    d["messages"] = [[m.role, m.content] for m in state.messages]
+    raw = json.dumps(d, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return bytes([_STATE_FORMAT]) + zlib.compress(raw, 6)
+
+
+def load_state(data: bytes) -> SessionState:
+    assert data[0] == _STATE_FORMAT, f"unknown session format: {data[0]}"
+    d = json.loads(zlib.decompress(data[1:]).decode("utf-8"))
+    d["messages"] = [ChatMessage(role=r, content=c) for r, c in d["messages"]]
+    d["profile"] = UserProfile(**d["profile"])
+    d["followups"] = FollowupAnswers(**d["followups"])
+    return SessionState(**d)
+
+
+def _estimate_bytes(state: SessionState) -> int:
+    # 대략치: 메시지 본문 UTF-8 길이 + 객체 오버헤드
+    return 512 + sum(len(m.content.encode("utf-8")) + 64 for m in state.messages)
+
 
 class InMemorySessionStore:
-    def __init__(self):
-        self._sessions: Dict[str, SessionState] = {}
+    """
+    프로세스 메모리 세션 저장소 (재시작 시 초기화)
+    - updated_at 기준 유휴 TTL 만료 + 최대 세션 수(LRU) + 세션당 대화 수 상한
+    - _sessions는 저장(save) 순서로 유지 → 앞쪽이 가장 오래된 세션이라 만료 정리가 O(만료 수)
+    """
+
+    def __init__(
+        self,
+        idle_ttl_sec: float = SESSION_IDLE_TTL_SEC,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_messages: int = SESSION_MAX_MESSAGES,
+    ):
+        self.idle_ttl_sec = idle_ttl_sec
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def _drop(self, sid: str) -> None:
+        self._sessions.pop(sid, None)
+        self._bytes -= self._sizes.pop(sid, 0)
+
+    def _purge_expired(self, now: float) -> None:
+        while self._sessions:
+            sid, s = next(iter(self._sessions.items()))
+            if now - s.updated_at <= self.idle_ttl_sec:
+                break
+            self._drop(sid)
+            self.expired += 1
 
     def get_or_create(self, session_id: Optional[str]) -> SessionState:
-        if session_id and session_id in self._sessions:
-            return self._sessions[session_id]
-
-        sid = uuid.uuid4().hex
-        s = SessionState(session_id=sid)
-        self._sessions[sid] = s
-        return s
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            if session_id and session_id in self._sessions:
+                return self._sessions[session_id]
+
+            sid = uuid.uuid4().hex
+            s = SessionState(session_id=sid)
+            self.created += 1
+            # 목록에는 save 시점에 들어감 → 저장 없이 버려지는 요청은 메모리를 차지하지 않음
+            return s
 
     def save(self, state: SessionState) -> None:
+        if len(state.messages) > self.max_messages:
+            del state.messages[:-self.max_messages]
         state.updated_at = time.time()
-        self._sessions[state.session_id] = state
+        state.version += 1
+
+        size = _estimate_bytes(state)
+        with self._lock:
+            sid = state.session_id
+            self._bytes += size - self._sizes.get(sid, 0)
+            self._sizes[sid] = size
+            self._sessions[sid] = state
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                self._drop(next(iter(self._sessions)))
+                self.evicted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._purge_expired(time.time())
+            return {
+                "backend": "memory",
+                "live_sessions": len(self._sessions),
+                "bytes_held": self._bytes,
+                "created": self.created,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "max_sessions": self.max_sessions,
+            }
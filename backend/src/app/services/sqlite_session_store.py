@@ -0,0 +1,149 @@
+# backend/src/app/services/sqlite_session_store.py
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .session_store import (
+    SESSION_IDLE_TTL_SEC,
+    SESSION_MAX_MESSAGES,
+    SESSION_MAX_SESSIONS,
+    SessionConflictError,
+    SessionState,
+    dump_state,
+    load_state,
+)
+
+# 만료/초과 세션 정리는 매 요청이 아니라 이 간격으로만
+# (세션 수/바이트 통계도 이때 같이 다시 계산 → /metrics 스크레이프는 캐시된 값만 읽음)
+PURGE_INTERVAL_SEC = 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    version    INTEGER NOT NULL,
+    updated_at REAL    NOT NULL,
+    data       BLOB    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_updated_at ON sessions(updated_at);
+"""
+
+
+class SqliteSessionStore:
+    """
+    SQLite(WAL) 세션 저장소 — 여러 uvicorn 워커/재시작 간 세션 공유
+    - 같은 파일을 여러 프로세스가 열어도 WAL 모드라 읽기는 쓰기를 막지 않음
+    - save는 낙관적 동시성: 읽어 온 version과 DB version이 같을 때만 갱신, 아니면 SessionConflictError
+    - 같은 노드의 여러 워커용 (여러 노드면 같은 계약으로 원격 저장소 구현 필요)
+    - 블로킹 I/O(잠금 대기 최대 5초) → async 코드에서는 스레드에서 호출 (main._store_call)
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        idle_ttl_sec: float = SESSION_IDLE_TTL_SEC,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        max_messages: int = SESSION_MAX_MESSAGES,
+    ):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.idle_ttl_sec = idle_ttl_sec
+        self.max_sessions = max_sessions
+        self.max_messages = max_messages
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self.conflicts = 0
+        self._counts: Dict[str, Any] = {"live_sessions": 0, "bytes_held": 0, "counted_at": 0.0}
+
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self._count_live(time.time())
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 연결은 스레드 간 공유하지 않음 → 스레드마다 하나
+        # fork로 넘어온 부모 프로세스 연결도 쓰지 않음 (serve.py 프리포크 워커)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_or_create(self, session_id: Optional[str]) -> SessionState:
+        now = time.time()
+        if session_id:
+            row = self._conn().execute(
+                "SELECT data FROM sessions WHERE session_id = ? AND updated_at >= ?",
+                (session_id, now - self.idle_ttl_sec),
+            ).fetchone()
+            if row is not None:
+                return load_state(row[0])
+
+        return SessionState(session_id=uuid.uuid4().hex)
+
+    def save(self, state: SessionState) -> None:
+        if len(state.messages) > self.max_messages:
+            del state.messages[:-self.max_messages]
+
+        prev_version = state.version
+        state.version = prev_version + 1
+        state.updated_at = time.time()
+        data = dump_state(state)
+
+        conn = self._conn()
+        if prev_version == 0:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO sessions (session_id, version, updated_at, data) VALUES (?, ?, ?, ?)",
+                (state.session_id, state.version, state.updated_at, data),
+            )
+        else:
+            cur = conn.execute(
+                "UPDATE sessions SET version = ?, updated_at = ?, data = ? WHERE session_id = ? AND version = ?",
+                (state.version, state.updated_at, data, state.session_id, prev_version),
+            )
+        if cur.rowcount != 1:
+            state.version = prev_version
+            self.conflicts += 1
+            raise SessionConflictError(state.session_id)
+
+        self._maybe_purge(state.updated_at)
+
+    def _maybe_purge(self, now: float) -> None:
+        if now - self._last_purge < PURGE_INTERVAL_SEC:
+            return
+        self._last_purge = now
+        conn = self._conn()
+        conn.execute("DELETE FROM sessions WHERE updated_at < ?", (now - self.idle_ttl_sec,))
+        conn.execute(
+            "DELETE FROM sessions WHERE session_id IN ("
+            " SELECT session_id FROM sessions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,),
+        )
+        self._count_live(now)
+
+    def _count_live(self, now: float) -> None:
+        # 전체 테이블을 훑는 쿼리라 정리 주기에만 (다른 워커가 저장한 세션도 포함된 값)
+        count, total = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sessions WHERE updated_at >= ?",
+            (now - self.idle_ttl_sec,),
+        ).fetchone()
+        self._counts = {"live_sessions": int(count), "bytes_held": int(total), "counted_at": now}
+
+    def stats(self) -> Dict[str, Any]:
+        # DB를 읽지 않음 — 마지막 정리(최대 PURGE_INTERVAL_SEC 전, 저장이 없으면 그보다 오래) 시점 값
+        counts = self._counts
+        return {
+            "backend": "sqlite",
+            "live_sessions": counts["live_sessions"],
+            "bytes_held": counts["bytes_held"],
+            "counted_age_sec": round(time.time() - counts["counted_at"], 1),
+            "conflicts": self.conflicts,
+            "max_sessions": self.max_sessions,
+        }